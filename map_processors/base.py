@@ -8,9 +8,14 @@ import collections
 import gzip
 import logging
 import pathlib
-from functools import cached_property
-
-from map_processors.constants import PLAYER_COLORS
+import struct
+import time
+from collections.abc import Iterator
+from functools import cache, cached_property
+from typing import TYPE_CHECKING
+
+from map_processors import tracing
+from map_processors.constants import MAP_SECTIONS, PLAYER_COLORS
 from map_processors.custom_types import PrimarySkills
 from map_processors.encoding import detect_encoding, detect_map_encoding
 from map_processors.enums import (
@@ -23,20 +28,131 @@ from map_processors.enums import (
     RewardType,
 )
 from map_processors.exceptions import H3MapParserException
-from map_processors.schemas import GameMapStructure
+from map_processors.layout import MapLayout
+from map_processors.limits import MIN_ENTRY_SIZES, ParseLimits
+from map_processors.stats import ParseStats, SectionStats
+
+if TYPE_CHECKING:
+    from map_processors.columnar import ObjectTable
+    from map_processors.compact import CompactModel
+    from map_processors.interning import Interner
+    from map_processors.schemas import GameMapStructure, MapObject
+    from map_processors.verify import VerifyReport
+
+# Pydantic schemas (and modules built on them) are imported where a structure is built:
+# header-only calls such as `map_stats()` start without them.
 
 logger = logging.getLogger(__name__)
 
 
+# names of the object classes in the raw data, unknown classes keep their number
+OBJECT_CLASS_NAMES = {object_type.value: object_type.name.lower() for object_type in ObjectType}
+
+# tile bytes in the order of the `TerrainTile` fields
+TERRAIN_TILE = struct.Struct('7B')
+TERRAIN_TILE_FIELDS = (
+    'terrain_type',
+    'view',
+    'river_type',
+    'river_flow',
+    'road_type',
+    'road_flow',
+    'flip_bits',
+)
+
+
+@cache
+def _object_models() -> dict:
+    """Model per `object_class` name, the member of the objects union its tag selects."""
+    from typing import get_args
+
+    from map_processors.schemas import OBJECT_CLASS_TO_TAG, AllMapObjectSchemas
+
+    by_tag = {}
+    for member in get_args(AllMapObjectSchemas):
+        model, tag = get_args(member)
+        by_tag[tag.tag] = model
+    return {object_class: by_tag[tag] for object_class, tag in OBJECT_CLASS_TO_TAG.items()}
+
+
+@cache
+def _terrain_tile_builder():
+    """
+    `TerrainTile` from the unpacked tile bytes, through a validator built once: every field
+    is a uint8 read from the map, so validation is only the int checks.
+    """
+    from pydantic import TypeAdapter
+
+    from map_processors.schemas import TerrainTile
+
+    validate = TypeAdapter(TerrainTile).validate_python
+
+    def build(values: tuple) -> TerrainTile:
+        return validate(dict(zip(TERRAIN_TILE_FIELDS, values)))
+
+    return build
+
+
+@cache
+def _field_adapters() -> dict:
+    """Validator per key of the raw data, built from the fields of `GameMapStructure`."""
+    from typing import Annotated
+
+    from pydantic import TypeAdapter
+
+    from map_processors.schemas import GameMapStructure
+
+    adapters = {}
+    for name, field in GameMapStructure.model_fields.items():
+        annotation = field.annotation
+        if field.metadata:
+            annotation = Annotated[(annotation, *field.metadata)]
+        adapters[field.alias or name] = TypeAdapter(annotation)
+    return adapters
+
+
+class MapVisitor:
+    """
+    Callbacks for `MapParser.visit`. `visit_section` gets the data of every section but
+    objects, `visit_object` gets every object; neither is kept by the parser afterwards.
+    """
+
+    def visit_section(self, section: str, data: dict) -> None:
+        pass
+
+    def visit_object(self, index: int, map_object: 'dict | MapObject') -> None:
+        pass
+
+
 class MapParser:
+    string_count = 0
+    interner: 'Interner | None' = None
+    low_memory = False
+    # readers build final models instead of raw dicts where that skips validation work
+    build_models = False
+    limits: ParseLimits | None = None
+    # `time.monotonic()` the `limits.max_seconds` budget runs out at
+    _deadline: float | None = None
+
     def __init__(
         self,
         filename: str | pathlib.Path,
         encoding: str | None = None,
         fallback_encoding: str | None = 'cp1251',
         *args,
+        collect_stats: bool = False,
+        record_layout: bool = False,
+        intern_values: 'bool | Interner' = False,
+        low_memory: bool = False,
+        limits: ParseLimits | None = None,
         **kwargs,
     ) -> None:
+        """
+        `collect_stats` and `low_memory` cannot be combined: stats time the validation of the
+        whole raw data, which `low_memory` never builds. Passing both raises `ValueError`.
+        """
+        if collect_stats and low_memory:
+            raise ValueError('collect_stats and low_memory cannot be combined')
         self.filename = filename
         self._cursor_position = 0
         self.data = collections.OrderedDict()
@@ -45,6 +161,21 @@ class MapParser:
         self.fallback_encoding = fallback_encoding
         self.string_other_encoding_count = 0
         self.string_exception_count = 0
+        self.collect_stats = collect_stats
+        self.stats: ParseStats | None = None
+        self.record_layout = record_layout
+        self.layout: MapLayout | None = None
+        # validate each section as soon as it is read, free map_binary after parsing
+        self.low_memory = low_memory
+        # length fields are trusted without limits, see `map_processors.limits`
+        self.limits = limits
+        # an Interner instance is shared with other parsers, True starts a new one
+        if intern_values is True:
+            from map_processors.interning import Interner
+
+            self.interner = Interner()
+        elif intern_values:
+            self.interner = intern_values
 
     @staticmethod
     def bytes_to_int(input_bytes: bytes) -> int:
@@ -111,15 +242,20 @@ class MapParser:
         result = self.map_binary[self._cursor_position : self._cursor_position + n]
         self._cursor_position += n
         bits_quantity = n * 8
-        return f'{int(result.hex(), base=16):0{bits_quantity}b}'
+        mask = f'{int(result.hex(), base=16):0{bits_quantity}b}'
+        return mask if self.interner is None else self.interner.string(mask)
 
     def process_n_bytes_to_base64(self, n: int) -> str:
         result = self.map_binary[self._cursor_position : self._cursor_position + n]
         self._cursor_position += n
-        return base64.b64encode(result).decode()
+        blob = base64.b64encode(result).decode()
+        return blob if self.interner is None else self.interner.string(blob)
 
     def base_process_string(self) -> str:
+        self.string_count += 1
         string_len = self.process_uint32()
+        if self.limits is not None:
+            self._check_string_length(string_len)
         string_end = self._cursor_position + string_len
         string_bytes = self.map_binary[self._cursor_position : string_end]
         try:
@@ -152,16 +288,62 @@ class MapParser:
 
     def process_string_to_bytes(self) -> bytes:
         string_len = self.process_uint32()
+        if self.limits is not None:
+            self._check_string_length(string_len)
         string_end = self._cursor_position + string_len
         string_from_map = self.map_binary[self._cursor_position : string_end]
         self._cursor_position = string_end
         return string_from_map
 
     def process_string(self) -> str:
-        return self.base_process_string()
+        value = self.base_process_string()
+        return value if self.interner is None else self.interner.string(value)
 
     def process_def_string(self) -> str:
-        return self.base_process_string()
+        value = self.base_process_string()
+        return value if self.interner is None else self.interner.string(value)
+
+    def process_quantity(self, limit: str) -> int:
+        """uint32 quantity of entries, checked against the `limit` field of the limits."""
+        quantity = self.process_uint32()
+        if self.limits is not None:
+            self._check_quantity(quantity, limit)
+        return quantity
+
+    def _limit_exceeded(self, message: str, offset: int) -> H3MapParserException:
+        logger.error('Limit exceeded in %s at offset %s: %s', self.filename, offset, message)
+        return H3MapParserException(f'{message} in {self.filename} at offset {offset}')
+
+    def _check_string_length(self, string_len: int) -> None:
+        if string_len > self.limits.max_string_length:
+            raise self._limit_exceeded(
+                f'String of {string_len} bytes, the limit is {self.limits.max_string_length}',
+                self._cursor_position - 4,
+            )
+
+    def _check_quantity(self, quantity: int, limit: str) -> None:
+        offset = self._cursor_position - 4
+        what = limit.removeprefix('max_').replace('_', ' ')
+        maximum = getattr(self.limits, limit)
+        if quantity > maximum:
+            raise self._limit_exceeded(f'{quantity} {what}, the limit is {maximum}', offset)
+        left = len(self.map_binary) - self._cursor_position
+        if quantity * MIN_ENTRY_SIZES[limit] > left:
+            raise self._limit_exceeded(
+                f'{quantity} {what} cannot fit in the {left} bytes left', offset
+            )
+
+    def _check_decompressed_size(self, size: int) -> None:
+        if size > self.limits.max_decompressed_size:
+            raise self._limit_exceeded(
+                f'Decompressed map exceeds {self.limits.max_decompressed_size} bytes', 0
+            )
+
+    def _check_deadline(self) -> None:
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            raise self._limit_exceeded(
+                f'Parsing took more than {self.limits.max_seconds} seconds', self._cursor_position
+            )
 
     def process_coordinates(self) -> tuple:
         pos_x = self.process_uint8()
@@ -171,13 +353,31 @@ class MapParser:
 
     @cached_property
     def map_binary(self):
-        with gzip.open(self.filename, 'rb') as f:
-            return f.read()
+        with tracing.span('decompress', 'stage'), gzip.open(self.filename, 'rb') as f:
+            if self.limits is None:
+                return f.read()
+            # one byte over the limit is enough to tell, the rest is never inflated
+            data = f.read(self.limits.max_decompressed_size + 1)
+        self._check_decompressed_size(len(data))
+        return data
+
+    @classmethod
+    def from_bytes(cls, data: bytes, filename: str | pathlib.Path = '<bytes>', *args, **kwargs):
+        """Parser over already decompressed map data, `filename` is only used in messages."""
+        parser = cls(filename, *args, **kwargs)
+        if parser.limits is not None:
+            parser._check_decompressed_size(len(data))
+        parser.map_binary = data
+        return parser
 
     def reset_cursor_position(self):
         self._cursor_position = 0
 
     def detect_encoding_by_header(self):
+        with tracing.span('detect_encoding', 'stage'):
+            self._detect_encoding_by_header()
+
+    def _detect_encoding_by_header(self):
         map_type = self.process_uint32()
         if map_type not in MapType:
             raise H3MapParserException('Unknown map type')
@@ -419,7 +619,7 @@ class MapParser:
 
     def read_rumors(self):
         self.data['rumors'] = []
-        rumors_quantity = self.process_uint32()
+        rumors_quantity = self.process_quantity('max_rumors')
         for _ in range(rumors_quantity):
             rumor_name = self.process_string()
             rumor_text = self.process_string()
@@ -471,10 +671,10 @@ class MapParser:
             return
 
         to_hero['artifacts'] = dict()
-        slot_number = 0
         for slot_number in range(16):
             self.load_artifact_to_slot(to_hero, slot_number)
 
+        slot_number = 16
         if self.map_type >= MapType.SOD:
             # catapult
             self.load_artifact_to_slot(to_hero, slot_number)
@@ -488,7 +688,7 @@ class MapParser:
         self.load_artifact_to_slot(to_hero, slot_number)
         slot_number += 1
 
-        backpack_start = 19
+        backpack_start = slot_number
         backpack_quantity = self.process_uint16()
         for slot_number in range(backpack_start, backpack_start + backpack_quantity):
             self.load_artifact_to_slot(to_hero, slot_number)
@@ -507,30 +707,32 @@ class MapParser:
         to_hero['artifacts'][slot] = artifact_id
 
     def read_terrain(self):
+        header = self.data['header']
+        # `TerrainTile` models when a structure is built, raw dicts otherwise
+        build = _terrain_tile_builder() if self.build_models else None
+        level_size = TERRAIN_TILE.size * header['width'] * header['height']
         self.data['terrain'] = {
             'surface': [],
             'underground': [],
         }
         for level in ('surface', 'underground'):
-            if level == 'underground' and not self.data['header']['has_underground']:
+            if level == 'underground' and not header['has_underground']:
                 break
-            for x in range(self.data['header']['width']):
-                for y in range(self.data['header']['height']):
-                    self.data['terrain'][level].append(
-                        {
-                            'terrain_type': self.process_uint8(),
-                            'view': self.process_uint8(),
-                            'river_type': self.process_uint8(),
-                            'river_flow': self.process_uint8(),
-                            'road_type': self.process_uint8(),
-                            'road_flow': self.process_uint8(),
-                            'flip_bits': self.process_uint8(),
-                        }
-                    )
+            end = self._cursor_position + level_size
+            if end > len(self.map_binary):
+                raise IndexError('terrain is truncated')
+            tiles = TERRAIN_TILE.iter_unpack(self.map_binary[self._cursor_position : end])
+            if build is None:
+                self.data['terrain'][level] = [
+                    dict(zip(TERRAIN_TILE_FIELDS, tile)) for tile in tiles
+                ]
+            else:
+                self.data['terrain'][level] = [build(tile) for tile in tiles]
+            self._cursor_position = end
 
     def read_def_info(self):
         self.data['def'] = []
-        def_quantity = self.process_uint32()
+        def_quantity = self.process_quantity('max_defs')
         for def_obj_number in range(def_quantity):
             self.data['def'].append(
                 {
@@ -728,7 +930,7 @@ class MapParser:
             town['obligatory_spells'] = self.process_n_bytes_to_mask(9)
         town['possible_spells'] = self.process_n_bytes_to_mask(9)
 
-        events_quantity = self.process_uint32()
+        events_quantity = self.process_quantity('max_town_events')
         town['events'] = []
         for _ in range(events_quantity):
             town['events'].append(
@@ -757,347 +959,354 @@ class MapParser:
 
     def read_objects(self):
         self.data['objects'] = []
-        objects_quantity = self.process_uint32()
+        for map_object in self._iter_raw_objects():
+            self.data['objects'].append(map_object)
+
+    def _iter_raw_objects(self) -> Iterator[dict]:
+        objects_quantity = self.process_quantity('max_objects')
         for _ in range(objects_quantity):
-            object_coordinates = self.process_coordinates()
-            object_number = self.process_uint32()
-            pre_body_unknown = self.process_n_bytes_to_base64(5)
-            object_class = self.data['def'][object_number]['object_class']
-            object_subclass = self.data['def'][object_number]['object_number']
-            map_object = {}
-            if object_class == ObjectType.EVENT.value:
-                message, guards, message_unknown = self.read_message_and_guards()
-                experience = self.process_uint32()
-                mana_diff = self.process_int32()
-                morale = self.process_int8()
-                luck = self.process_int8()
-                resources = self.read_resources()
-                primary_skills = self.read_primary_skills()
-                abilities_quantity = self.process_uint8()
-                abilities = [
-                    {
-                        'id': self.process_uint8(),
-                        'level': self.process_uint8(),
-                    }
-                    for _ in range(abilities_quantity)
-                ]
-                artifacts_quantity = self.process_uint8()
-                if self.map_type == MapType.ROE:
-                    artifacts = [self.process_uint8() for _ in range(artifacts_quantity)]
-                else:
-                    artifacts = [self.process_uint16() for _ in range(artifacts_quantity)]
-                spells_quantity = self.process_uint8()
-                spells = [self.process_uint8() for _ in range(spells_quantity)]
-                creatures_quantity = self.process_uint8()
-                creatures = self.read_creature_set(creatures_quantity)
-
-                unknown_mid = self.process_n_bytes_to_base64(8)
-
-                available_for_color = self.process_n_bytes_to_mask(1)
-                can_computer_activate = bool(self.process_uint8())
-                remove_after_visit = bool(self.process_uint8())
-
-                unknown_tail = self.process_n_bytes_to_base64(4)
-                map_object = {
-                    'message': message,
-                    'guards': guards,
-                    'message_unknown': message_unknown,
-                    'experience': experience,
-                    'mana_diff': mana_diff,
-                    'morale': morale,
-                    'luck': luck,
-                    'resources': resources,
-                    'primary_skills': primary_skills,
-                    'abilities': abilities,
-                    'artifacts': artifacts,
-                    'spells': spells,
-                    'creatures': creatures,
-                    'available_for_color': available_for_color,
-                    'can_computer_activate': can_computer_activate,
-                    'remove_after_visit': remove_after_visit,
-                    'unknown_mid': unknown_mid,
-                    'unknown_tail': unknown_tail,
+            if self._deadline is not None:
+                self._check_deadline()
+            object_start = self._cursor_position
+            map_object = self.read_object()
+            if self.layout is not None:
+                self.layout.add_object(object_start, self._cursor_position)
+            yield map_object
+
+    def read_object(self) -> dict:
+        object_coordinates = self.process_coordinates()
+        object_number = self.process_uint32()
+        pre_body_unknown = self.process_n_bytes_to_base64(5)
+        if object_number >= len(self.data['def']):
+            raise IndexError(f'def {object_number} of {len(self.data["def"])} defs')
+        object_class = self.data['def'][object_number]['object_class']
+        object_subclass = self.data['def'][object_number]['object_number']
+        map_object = {}
+        if object_class == ObjectType.EVENT:
+            message, guards, message_unknown = self.read_message_and_guards()
+            experience = self.process_uint32()
+            mana_diff = self.process_int32()
+            morale = self.process_int8()
+            luck = self.process_int8()
+            resources = self.read_resources()
+            primary_skills = self.read_primary_skills()
+            abilities_quantity = self.process_uint8()
+            abilities = [
+                {
+                    'id': self.process_uint8(),
+                    'level': self.process_uint8(),
                 }
+                for _ in range(abilities_quantity)
+            ]
+            artifacts_quantity = self.process_uint8()
+            if self.map_type == MapType.ROE:
+                artifacts = [self.process_uint8() for _ in range(artifacts_quantity)]
+            else:
+                artifacts = [self.process_uint16() for _ in range(artifacts_quantity)]
+            spells_quantity = self.process_uint8()
+            spells = [self.process_uint8() for _ in range(spells_quantity)]
+            creatures_quantity = self.process_uint8()
+            creatures = self.read_creature_set(creatures_quantity)
+
+            unknown_mid = self.process_n_bytes_to_base64(8)
+
+            available_for_color = self.process_n_bytes_to_mask(1)
+            can_computer_activate = bool(self.process_uint8())
+            remove_after_visit = bool(self.process_uint8())
+
+            unknown_tail = self.process_n_bytes_to_base64(4)
+            map_object = {
+                'message': message,
+                'guards': guards,
+                'message_unknown': message_unknown,
+                'experience': experience,
+                'mana_diff': mana_diff,
+                'morale': morale,
+                'luck': luck,
+                'resources': resources,
+                'primary_skills': primary_skills,
+                'abilities': abilities,
+                'artifacts': artifacts,
+                'spells': spells,
+                'creatures': creatures,
+                'available_for_color': available_for_color,
+                'can_computer_activate': can_computer_activate,
+                'remove_after_visit': remove_after_visit,
+                'unknown_mid': unknown_mid,
+                'unknown_tail': unknown_tail,
+            }
+
+        elif object_class in (ObjectType.SIGN, ObjectType.OCEAN_BOTTLE):
+            map_object = {
+                'message': self.process_string(),
+                'message_tail': self.process_n_bytes_to_base64(4),
+            }
+
+        elif object_class in (
+            ObjectType.HERO,
+            ObjectType.RANDOM_HERO,
+            ObjectType.PRISON,
+        ):
+            map_object = self.read_hero()
+        elif object_class in (
+            ObjectType.MONSTER,
+            ObjectType.RANDOM_MONSTER,
+            ObjectType.RANDOM_MONSTER_L1,
+            ObjectType.RANDOM_MONSTER_L2,
+            ObjectType.RANDOM_MONSTER_L3,
+            ObjectType.RANDOM_MONSTER_L4,
+            ObjectType.RANDOM_MONSTER_L5,
+            ObjectType.RANDOM_MONSTER_L6,
+            ObjectType.RANDOM_MONSTER_L7,
+        ):
+            monster = dict()
 
-            elif object_class in (ObjectType.SIGN.value, ObjectType.OCEAN_BOTTLE.value):
-                map_object = {
-                    'message': self.process_string(),
-                    'message_tail': self.process_n_bytes_to_base64(4),
-                }
+            if self.map_type >= MapType.AB:
+                monster['id'] = self.process_uint32()
+
+            monster['quantity'] = self.process_uint16()
 
-            elif object_class in (
-                ObjectType.HERO.value,
-                ObjectType.RANDOM_HERO.value,
-                ObjectType.PRISON.value,
-            ):
-                map_object = self.read_hero()
-            elif object_class in (
-                ObjectType.MONSTER.value,
-                ObjectType.RANDOM_MONSTER.value,
-                ObjectType.RANDOM_MONSTER_L1.value,
-                ObjectType.RANDOM_MONSTER_L2.value,
-                ObjectType.RANDOM_MONSTER_L3.value,
-                ObjectType.RANDOM_MONSTER_L4.value,
-                ObjectType.RANDOM_MONSTER_L5.value,
-                ObjectType.RANDOM_MONSTER_L6.value,
-                ObjectType.RANDOM_MONSTER_L7.value,
-            ):
-                monster = dict()
-
-                if self.map_type >= MapType.AB:
-                    monster['id'] = self.process_uint32()
-
-                monster['quantity'] = self.process_uint16()
-
-                monster['character'] = self.process_uint8()
-
-                has_message = self.process_uint8()
-                if has_message:
-                    monster['message'] = self.process_string()
-                    monster['resources'] = self.read_resources()
+            monster['character'] = self.process_uint8()
 
+            has_message = self.process_uint8()
+            if has_message:
+                monster['message'] = self.process_string()
+                monster['resources'] = self.read_resources()
+
+                if self.map_type == MapType.ROE:
+                    monster['artifact_id'] = self.process_uint8()
+                else:
+                    monster['artifact_id'] = self.process_uint16()
+
+            monster['mood'] = self.process_uint8()
+            monster['not_growing'] = bool(self.process_uint8())
+            monster['unknown_tail'] = self.process_n_bytes_to_base64(2)
+            map_object = monster
+
+        elif object_class == ObjectType.SEER_HUT:
+            quest = dict()
+            if self.map_type >= MapType.AB:
+                quest = self.read_quest()
+            else:
+                quest['mission_type'] = QuestType(5).name.lower()
+                quest['artifacts'] = [self.process_uint8()]
+
+            if quest['mission_type']:
+                reward: dict = {'type': RewardType(self.process_uint8())}
+                if reward['type'] == RewardType.EXPERIENCE:
+                    reward['experience'] = self.process_uint32()
+                elif reward['type'] == RewardType.MANA_POINTS:
+                    reward['mana_points'] = self.process_uint32()
+                elif reward['type'] == RewardType.MORALE_BONUS:
+                    reward['morale'] = self.process_int8()
+                elif reward['type'] == RewardType.LUCK_BONUS:
+                    reward['luck'] = self.process_int8()
+                elif reward['type'] == RewardType.RESOURCES:
+                    reward['resource_type'] = ResourceType(self.process_uint8()).name.lower()
+                    reward['resource_quantity'] = self.process_uint32()
+                elif reward['type'] == RewardType.PRIMARY_SKILL:
+                    reward['skill_id'] = self.process_uint8()
+                    reward['skill_increase'] = self.process_uint8()
+                elif reward['type'] == RewardType.ABILITY:
+                    reward['ability_id'] = self.process_uint8()
+                    reward['ability_increase'] = self.process_uint8()
+                elif reward['type'] == RewardType.ARTIFACT:
+                    if self.map_type == MapType.ROE:
+                        reward['artifact_id'] = self.process_uint8()
+                    else:
+                        reward['artifact_id'] = self.process_uint16()
+                elif reward['type'] == RewardType.SPELL:
+                    reward['spell_id'] = self.process_uint8()
+                elif reward['type'] == RewardType.CREATURE:
                     if self.map_type == MapType.ROE:
-                        monster['artifact_id'] = self.process_uint8()
+                        reward['creature_id'] = self.process_uint8()
+                        reward['creature_quantity'] = self.process_uint16()
                     else:
-                        monster['artifact_id'] = self.process_uint16()
+                        reward['creature_id'] = self.process_uint16()
+                        reward['creature_quantity'] = self.process_uint16()
+                reward['type'] = reward['type'].name.lower()
+                quest['reward'] = reward
 
-                monster['mood'] = self.process_uint8()
-                monster['not_growing'] = bool(self.process_uint8())
-                monster['unknown_tail'] = self.process_n_bytes_to_base64(2)
-                map_object = monster
+                quest['unknown_tail'] = self.process_n_bytes_to_base64(2)
 
-            elif object_class == ObjectType.SEER_HUT.value:
-                quest = dict()
-                if self.map_type >= MapType.AB:
-                    quest = self.read_quest()
-                else:
-                    quest['mission_type'] = QuestType(5).name.lower()
-                    quest['artifacts'] = [self.process_uint8()]
-
-                if quest['mission_type']:
-                    reward: dict = {'type': RewardType(self.process_uint8())}
-                    if reward['type'] == RewardType.EXPERIENCE:
-                        reward['experience'] = self.process_uint32()
-                    elif reward['type'] == RewardType.MANA_POINTS:
-                        reward['mana_points'] = self.process_uint32()
-                    elif reward['type'] == RewardType.MORALE_BONUS:
-                        reward['morale'] = self.process_int8()
-                    elif reward['type'] == RewardType.LUCK_BONUS:
-                        reward['luck'] = self.process_int8()
-                    elif reward['type'] == RewardType.RESOURCES:
-                        reward['resource_type'] = ResourceType(self.process_uint8()).name.lower()
-                        reward['resource_quantity'] = self.process_uint32()
-                    elif reward['type'] == RewardType.PRIMARY_SKILL:
-                        reward['skill_id'] = self.process_uint8()
-                        reward['skill_increase'] = self.process_uint8()
-                    elif reward['type'] == RewardType.ABILITY:
-                        reward['ability_id'] = self.process_uint8()
-                        reward['ability_increase'] = self.process_uint8()
-                    elif reward['type'] == RewardType.ARTIFACT:
-                        if self.map_type == MapType.ROE:
-                            reward['artifact_id'] = self.process_uint8()
-                        else:
-                            reward['artifact_id'] = self.process_uint16()
-                    elif reward['type'] == RewardType.SPELL:
-                        reward['spell_id'] = self.process_uint8()
-                    elif reward['type'] == RewardType.CREATURE:
-                        if self.map_type == MapType.ROE:
-                            reward['creature_id'] = self.process_uint8()
-                            reward['creature_quantity'] = self.process_uint16()
-                        else:
-                            reward['creature_id'] = self.process_uint16()
-                            reward['creature_quantity'] = self.process_uint16()
-                    reward['type'] = reward['type'].name.lower()
-                    quest['reward'] = reward
-
-                    quest['unknown_tail'] = self.process_n_bytes_to_base64(2)
+            else:
+                quest['unknown_tail'] = self.process_n_bytes_to_base64(3)
+            map_object = quest
 
-                else:
-                    quest['unknown_tail'] = self.process_n_bytes_to_base64(3)
-                map_object = quest
-
-            elif object_class == ObjectType.WITCH_HUT.value:
-                if self.map_type >= MapType.AB:
-                    map_object['ability_bits'] = f'{self.process_uint32():032b}'
-
-            elif object_class == ObjectType.SCHOLAR.value:
-                map_object['bonus_type'] = self.process_uint8()
-                map_object['bonus_id'] = self.process_uint8()
-                map_object['unknown_tail'] = self.process_n_bytes_to_base64(6)
-
-            elif object_class in (
-                ObjectType.GARRISON_HORIZONTAL.value,
-                ObjectType.GARRISON_VERTICAL.value,
-            ):
-                map_object['owner'] = ColorEnum(self.process_uint8()).name.lower()
-                map_object['unknown_mid'] = self.process_n_bytes_to_base64(3)
-                map_object['creatures'] = self.read_creature_set(7)
-                if self.map_type >= MapType.AB:
-                    map_object['is_removable'] = self.process_uint8()
-                else:
-                    map_object['is_removable'] = 1
-                map_object['unknown_tail'] = self.process_n_bytes_to_base64(8)
+        elif object_class == ObjectType.WITCH_HUT:
+            if self.map_type >= MapType.AB:
+                map_object['ability_bits'] = f'{self.process_uint32():032b}'
+
+        elif object_class == ObjectType.SCHOLAR:
+            map_object['bonus_type'] = self.process_uint8()
+            map_object['bonus_id'] = self.process_uint8()
+            map_object['unknown_tail'] = self.process_n_bytes_to_base64(6)
+
+        elif object_class in (
+            ObjectType.GARRISON_HORIZONTAL,
+            ObjectType.GARRISON_VERTICAL,
+        ):
+            map_object['owner'] = ColorEnum(self.process_uint8()).name.lower()
+            map_object['unknown_mid'] = self.process_n_bytes_to_base64(3)
+            map_object['creatures'] = self.read_creature_set(7)
+            if self.map_type >= MapType.AB:
+                map_object['is_removable'] = self.process_uint8()
+            else:
+                map_object['is_removable'] = 1
+            map_object['unknown_tail'] = self.process_n_bytes_to_base64(8)
 
-            elif object_class == ObjectType.SPELL_SCROLL.value:
-                (map_object['message'], map_object['guards'], map_object['message_unknown']) = (
-                    self.read_message_and_guards()
-                )
-                map_object['spell_id'] = self.process_uint32()
+        elif object_class == ObjectType.SPELL_SCROLL:
+            (map_object['message'], map_object['guards'], map_object['message_unknown']) = (
+                self.read_message_and_guards()
+            )
+            map_object['spell_id'] = self.process_uint32()
 
-            elif object_class == ObjectType.ARTIFACT.value:
-                (map_object['message'], map_object['guards'], map_object['message_unknown']) = (
-                    self.read_message_and_guards()
-                )
-                map_object['artifact_id'] = self.data['def'][object_number]['object_number']
-
-            elif object_class in (
-                ObjectType.RANDOM_ART.value,
-                ObjectType.RANDOM_TREASURE_ART.value,
-                ObjectType.RANDOM_MINOR_ART.value,
-                ObjectType.RANDOM_MAJOR_ART.value,
-                ObjectType.RANDOM_RELIC_ART.value,
-            ):
-                (map_object['message'], map_object['guards'], map_object['message_unknown']) = (
-                    self.read_message_and_guards()
-                )
-                if object_class == ObjectType.RANDOM_TREASURE_ART.value:
-                    map_object['level'] = '1'
-                if object_class == ObjectType.RANDOM_MINOR_ART.value:
-                    map_object['level'] = '2'
-                if object_class == ObjectType.RANDOM_MAJOR_ART.value:
-                    map_object['level'] = '3'
-                if object_class == ObjectType.RANDOM_RELIC_ART.value:
-                    map_object['level'] = '4'
-                if object_class == ObjectType.RANDOM_ART.value:
-                    map_object['level'] = 'any'
-
-            elif object_class in (ObjectType.RESOURCE.value, ObjectType.RANDOM_RESOURCE.value):
-                (map_object['message'], map_object['guards'], map_object['message_unknown']) = (
-                    self.read_message_and_guards()
-                )
-                map_object['quantity'] = self.process_uint32()
-                if object_class == ObjectType.RESOURCE.value:
-                    map_object['resource_type'] = ResourceType(object_subclass).name.lower()
-                map_object['unknown_tail'] = self.process_n_bytes_to_base64(4)
-
-            elif object_class in (ObjectType.TOWN.value, ObjectType.RANDOM_TOWN.value):
-                map_object = self.read_town()
-
-            elif object_class == ObjectType.ABANDONED_MINE.value or (
-                object_class == ObjectType.MINE.value and object_subclass == 7
-            ):
-                map_object['possible_resources'] = self.process_n_bytes_to_mask(1)
-                map_object['unknown_tail'] = self.process_n_bytes_to_base64(3)
-
-            elif object_class == ObjectType.MINE.value:
-                map_object['owner'] = ColorEnum(self.process_uint8()).name.lower()
-                map_object['unknown_tail'] = self.process_n_bytes_to_base64(3)
-
-            elif object_class in (
-                ObjectType.CREATURE_GENERATOR1.value,
-                ObjectType.CREATURE_GENERATOR2.value,
-                ObjectType.CREATURE_GENERATOR3.value,
-                ObjectType.CREATURE_GENERATOR4.value,
-            ):
-                map_object['owner'] = ColorEnum(self.process_uint8()).name.lower()
-                map_object['unknown_tail'] = self.process_n_bytes_to_base64(3)
-
-            elif object_class in (
-                ObjectType.SHRINE_OF_MAGIC_INCANTATION.value,
-                ObjectType.SHRINE_OF_MAGIC_GESTURE.value,
-                ObjectType.SHRINE_OF_MAGIC_THOUGHT.value,
-            ):
-                map_object['spell_id'] = self.process_uint8()
-                map_object['unknown_tail'] = self.process_n_bytes_to_base64(3)
-
-            elif object_class == ObjectType.PANDORA_BOX.value:
-                (map_object['message'], map_object['guards'], map_object['message_unknown']) = (
-                    self.read_message_and_guards()
-                )
-                map_object['experience'] = self.process_uint32()
-                map_object['mana_diff'] = self.process_int32()
-                map_object['morale_diff'] = self.process_int8()
-                map_object['luck_diff'] = self.process_int8()
-                map_object['resources'] = self.read_resources()
-                map_object['primary_skills'] = self.read_primary_skills()
-                abilities_quantity = self.process_uint8()
-                map_object['abilities'] = [
-                    {
-                        'id': self.process_uint8(),
-                        'level': self.process_uint8(),
-                    }
-                    for _ in range(abilities_quantity)
-                ]
-                artifacts_quantity = self.process_uint8()
-                if self.map_type == MapType.ROE:
-                    map_object['artifacts'] = [
-                        self.process_uint8() for _ in range(artifacts_quantity)
-                    ]
-                else:
-                    map_object['artifacts'] = [
-                        self.process_uint16() for _ in range(artifacts_quantity)
-                    ]
-                spells_quantity = self.process_uint8()
-                map_object['spells'] = [self.process_uint8() for _ in range(spells_quantity)]
-                creatures_quantity = self.process_uint8()
-                map_object['creatures'] = self.read_creature_set(creatures_quantity)
-                map_object['unknown_tail'] = self.process_n_bytes_to_base64(8)
-
-            elif object_class == ObjectType.GRAIL.value:
-                map_object['radius'] = self.process_uint32()
-
-            elif object_class == ObjectType.RANDOM_DWELLING.value:
-                map_object['owner'] = ColorEnum(self.process_uint32()).name.lower()
-                map_object['castle_id'] = self.process_uint32()
-                if not map_object['castle_id']:
-                    map_object['castles'] = (self.process_uint8(), self.process_uint8())
-                map_object['min_lvl'] = self.process_uint8()
-                map_object['max_lvl'] = self.process_uint8()
-
-            elif object_class == ObjectType.RANDOM_DWELLING_LVL.value:
-                map_object['owner'] = ColorEnum(self.process_uint32()).name.lower()
-                map_object['castle_id'] = self.process_uint32()
-                if not map_object['castle_id']:
-                    map_object['castles'] = (self.process_uint8(), self.process_uint8())
-
-            elif object_class == ObjectType.RANDOM_DWELLING_FACTION.value:
-                map_object['owner'] = ColorEnum(self.process_uint32()).name.lower()
-                map_object['min_lvl'] = self.process_uint8()
-                map_object['max_lvl'] = self.process_uint8()
-
-            elif object_class == ObjectType.QUEST_GUARD.value:
-                map_object = self.read_quest()
-
-            elif object_class == ObjectType.SHIPYARD.value:
-                map_object['owner'] = ColorEnum(self.process_uint32()).name.lower()
-
-            elif object_class == ObjectType.HERO_PLACEHOLDER.value:
-                map_object['owner'] = ColorEnum(self.process_uint8()).name.lower()
-                map_object['hero_id'] = self.process_uint8()
-                if map_object['hero_id'] == 0xFF:
-                    map_object['power'] = self.process_uint8()
-
-            elif object_class == ObjectType.LIGHTHOUSE.value:
-                map_object['owner'] = ColorEnum(self.process_uint32()).name.lower()
-
-            map_object.update(
+        elif object_class == ObjectType.ARTIFACT:
+            (map_object['message'], map_object['guards'], map_object['message_unknown']) = (
+                self.read_message_and_guards()
+            )
+            map_object['artifact_id'] = self.data['def'][object_number]['object_number']
+
+        elif object_class in (
+            ObjectType.RANDOM_ART,
+            ObjectType.RANDOM_TREASURE_ART,
+            ObjectType.RANDOM_MINOR_ART,
+            ObjectType.RANDOM_MAJOR_ART,
+            ObjectType.RANDOM_RELIC_ART,
+        ):
+            (map_object['message'], map_object['guards'], map_object['message_unknown']) = (
+                self.read_message_and_guards()
+            )
+            if object_class == ObjectType.RANDOM_TREASURE_ART:
+                map_object['level'] = '1'
+            if object_class == ObjectType.RANDOM_MINOR_ART:
+                map_object['level'] = '2'
+            if object_class == ObjectType.RANDOM_MAJOR_ART:
+                map_object['level'] = '3'
+            if object_class == ObjectType.RANDOM_RELIC_ART:
+                map_object['level'] = '4'
+            if object_class == ObjectType.RANDOM_ART:
+                map_object['level'] = 'any'
+
+        elif object_class in (ObjectType.RESOURCE, ObjectType.RANDOM_RESOURCE):
+            (map_object['message'], map_object['guards'], map_object['message_unknown']) = (
+                self.read_message_and_guards()
+            )
+            map_object['quantity'] = self.process_uint32()
+            if object_class == ObjectType.RESOURCE:
+                map_object['resource_type'] = ResourceType(object_subclass).name.lower()
+            map_object['unknown_tail'] = self.process_n_bytes_to_base64(4)
+
+        elif object_class in (ObjectType.TOWN, ObjectType.RANDOM_TOWN):
+            map_object = self.read_town()
+
+        elif object_class == ObjectType.ABANDONED_MINE or (
+            object_class == ObjectType.MINE and object_subclass == 7
+        ):
+            map_object['possible_resources'] = self.process_n_bytes_to_mask(1)
+            map_object['unknown_tail'] = self.process_n_bytes_to_base64(3)
+
+        elif object_class == ObjectType.MINE:
+            map_object['owner'] = ColorEnum(self.process_uint8()).name.lower()
+            map_object['unknown_tail'] = self.process_n_bytes_to_base64(3)
+
+        elif object_class in (
+            ObjectType.CREATURE_GENERATOR1,
+            ObjectType.CREATURE_GENERATOR2,
+            ObjectType.CREATURE_GENERATOR3,
+            ObjectType.CREATURE_GENERATOR4,
+        ):
+            map_object['owner'] = ColorEnum(self.process_uint8()).name.lower()
+            map_object['unknown_tail'] = self.process_n_bytes_to_base64(3)
+
+        elif object_class in (
+            ObjectType.SHRINE_OF_MAGIC_INCANTATION,
+            ObjectType.SHRINE_OF_MAGIC_GESTURE,
+            ObjectType.SHRINE_OF_MAGIC_THOUGHT,
+        ):
+            map_object['spell_id'] = self.process_uint8()
+            map_object['unknown_tail'] = self.process_n_bytes_to_base64(3)
+
+        elif object_class == ObjectType.PANDORA_BOX:
+            (map_object['message'], map_object['guards'], map_object['message_unknown']) = (
+                self.read_message_and_guards()
+            )
+            map_object['experience'] = self.process_uint32()
+            map_object['mana_diff'] = self.process_int32()
+            map_object['morale_diff'] = self.process_int8()
+            map_object['luck_diff'] = self.process_int8()
+            map_object['resources'] = self.read_resources()
+            map_object['primary_skills'] = self.read_primary_skills()
+            abilities_quantity = self.process_uint8()
+            map_object['abilities'] = [
                 {
-                    'object_class': (
-                        ObjectType(object_class).name.lower()
-                        if object_class in ObjectType
-                        else str(object_class)
-                    ),
-                    'object_subclass': object_subclass,
-                    'object_number': object_number,
-                    'coordinates': object_coordinates,
-                    'pre_body_unknown': pre_body_unknown,
+                    'id': self.process_uint8(),
+                    'level': self.process_uint8(),
                 }
-            )
-            self.data['objects'].append(map_object)
+                for _ in range(abilities_quantity)
+            ]
+            artifacts_quantity = self.process_uint8()
+            if self.map_type == MapType.ROE:
+                map_object['artifacts'] = [self.process_uint8() for _ in range(artifacts_quantity)]
+            else:
+                map_object['artifacts'] = [self.process_uint16() for _ in range(artifacts_quantity)]
+            spells_quantity = self.process_uint8()
+            map_object['spells'] = [self.process_uint8() for _ in range(spells_quantity)]
+            creatures_quantity = self.process_uint8()
+            map_object['creatures'] = self.read_creature_set(creatures_quantity)
+            map_object['unknown_tail'] = self.process_n_bytes_to_base64(8)
+
+        elif object_class == ObjectType.GRAIL:
+            map_object['radius'] = self.process_uint32()
+
+        elif object_class == ObjectType.RANDOM_DWELLING:
+            map_object['owner'] = ColorEnum(self.process_uint32()).name.lower()
+            map_object['castle_id'] = self.process_uint32()
+            if not map_object['castle_id']:
+                map_object['castles'] = (self.process_uint8(), self.process_uint8())
+            map_object['min_lvl'] = self.process_uint8()
+            map_object['max_lvl'] = self.process_uint8()
+
+        elif object_class == ObjectType.RANDOM_DWELLING_LVL:
+            map_object['owner'] = ColorEnum(self.process_uint32()).name.lower()
+            map_object['castle_id'] = self.process_uint32()
+            if not map_object['castle_id']:
+                map_object['castles'] = (self.process_uint8(), self.process_uint8())
+
+        elif object_class == ObjectType.RANDOM_DWELLING_FACTION:
+            map_object['owner'] = ColorEnum(self.process_uint32()).name.lower()
+            map_object['min_lvl'] = self.process_uint8()
+            map_object['max_lvl'] = self.process_uint8()
+
+        elif object_class == ObjectType.QUEST_GUARD:
+            map_object = self.read_quest()
+
+        elif object_class == ObjectType.SHIPYARD:
+            map_object['owner'] = ColorEnum(self.process_uint32()).name.lower()
+
+        elif object_class == ObjectType.HERO_PLACEHOLDER:
+            map_object['owner'] = ColorEnum(self.process_uint8()).name.lower()
+            map_object['hero_id'] = self.process_uint8()
+            if map_object['hero_id'] == 0xFF:
+                map_object['power'] = self.process_uint8()
+
+        elif object_class == ObjectType.LIGHTHOUSE:
+            map_object['owner'] = ColorEnum(self.process_uint32()).name.lower()
+
+        map_object.update(
+            {
+                'object_class': OBJECT_CLASS_NAMES.get(object_class) or str(object_class),
+                'object_subclass': object_subclass,
+                'object_number': object_number,
+                'coordinates': object_coordinates,
+                'pre_body_unknown': pre_body_unknown,
+            }
+        )
+        return map_object
 
     def read_events(self):
         self.data['events'] = []
-        events_quantity = self.process_uint32()
+        events_quantity = self.process_quantity('max_events')
         for _ in range(events_quantity):
             self.data['events'].append(
                 {
@@ -1115,37 +1324,294 @@ class MapParser:
                 }
             )
 
-    def get_structured_data(self) -> GameMapStructure | None:
-        self.data = collections.OrderedDict()
-        if not self.encoding:
-            self.detect_encoding_by_header()
+    def read_trailing_unknown(self):
+        remaining = len(self.map_binary) - self._cursor_position
+        if remaining > 0:
+            self.data['trailing_unknown'] = self.process_n_bytes_to_base64(remaining)
 
-        self.read_header()
-        self.read_players_attributes()
-        self.read_victory_conditions()
-        self.read_loss_conditions()
-        self.read_teams()
-        self.read_heroes_info()
-        self.read_artifacts()
-        self.read_spells()
-        self.read_abilities()
-        self.read_rumors()
-        self.read_predefined_heroes()
-        self.read_terrain()
-        self.read_def_info()
+    def _read_section(self, section: str) -> None:
+        start_position = self._cursor_position
+        if self.limits is not None:
+            if section == MAP_SECTIONS[0]:
+                # the budget covers one walk over the sections
+                self._deadline = (
+                    None
+                    if self.limits.max_seconds is None
+                    else time.monotonic() + self.limits.max_seconds
+                )
+            self._check_deadline()
         try:
-            self.read_objects()
+            with tracing.span(section, 'section'):
+                getattr(self, f'read_{section}')()
         except IndexError as e:
             logger.error(
-                'Failed to parse objects in %s at offset %s', self.filename, self._cursor_position
+                'Failed to parse %s in %s at offset %s',
+                section,
+                self.filename,
+                self._cursor_position,
             )
             raise H3MapParserException(
-                f'Failed to parse objects in {self.filename} at offset {self._cursor_position}'
+                f'Failed to parse {section} in {self.filename} at offset {self._cursor_position}'
             ) from e
-        self.read_events()
+        if self.layout is not None:
+            self.layout.add_section(section, start_position, self._cursor_position)
+
+    def _read_section_with_stats(self, section: str) -> None:
+        start_position = self._cursor_position
+        start_strings = self.string_count
+        start_fallbacks = self.string_other_encoding_count
+        start_errors = self.string_exception_count
+        start = time.perf_counter()
+
+        self._read_section(section)
+
+        section_stats = SectionStats(
+            name=section,
+            seconds=time.perf_counter() - start,
+            bytes=self._cursor_position - start_position,
+            strings=self.string_count - start_strings,
+            string_fallbacks=self.string_other_encoding_count - start_fallbacks,
+            string_errors=self.string_exception_count - start_errors,
+        )
+        if section == 'objects':
+            by_class = collections.Counter(obj['object_class'] for obj in self.data['objects'])
+            section_stats.by_class = dict(by_class.most_common())
+        section_stats.items = self._section_items_quantity(section)
+        self.stats.add(section_stats)
+
+    def _section_items_quantity(self, section: str) -> int:
+        if section == 'terrain':
+            return sum(len(tiles) for tiles in self.data['terrain'].values())
+        if section == 'def_info':
+            return len(self.data['def'])
+        if section == 'heroes_info':
+            return len(self.data.get('configured_heroes', ()))
+        if section == 'predefined_heroes':
+            return sum(1 for hero in self.data.get('predefined_heroes', {}).values() if hero)
+        if section == 'players_attributes':
+            return sum(
+                1
+                for player in self.data['players_attributes']
+                if player['can_human_play'] or player['can_computer_play']
+            )
+        if section in ('rumors', 'objects', 'events'):
+            return len(self.data[section])
+        return 0
 
-        remaining = len(self.map_binary) - self._cursor_position
-        if remaining > 0:
-            self.data['trailing_unknown'] = self.process_n_bytes_to_base64(remaining)
+    def get_structured_data(self) -> 'GameMapStructure | None':
+        self.data = collections.OrderedDict()
+        self.layout = MapLayout() if self.record_layout else None
+        self.build_models = True
+        try:
+            with tracing.span('parse', 'map', filename=str(self.filename)):
+                structure = self._get_structured_data()
+                if self.interner is not None:
+                    self._intern_values(structure)
+                if self.layout is not None:
+                    self.layout.compute_digests(self.map_binary)
+                if self.low_memory:
+                    self.release_buffers()
+                return structure
+        finally:
+            self.build_models = False
+
+    def _get_structured_data(self) -> 'GameMapStructure':
+        from map_processors.schemas import GameMapStructure
+
+        if self.collect_stats:
+            return self._get_structured_data_with_stats()
+        if self.low_memory:
+            return self._get_structured_data_low_memory()
+        if not self.encoding:
+            self.detect_encoding_by_header()
+        for section in MAP_SECTIONS:
+            if section == 'objects':
+                self.data['objects'] = self._read_objects_as_models()
+            else:
+                self._read_section(section)
+        with tracing.span('validate', 'stage'):
+            # terrain and objects are models already, only the rest is validated here
+            return GameMapStructure.model_validate(self.data)
+
+    def _get_structured_data_low_memory(self) -> 'GameMapStructure':
+        from map_processors.schemas import GameMapStructure
+
+        adapters = _field_adapters()
+        validated = {}
+        if not self.encoding:
+            self.detect_encoding_by_header()
+        for section in MAP_SECTIONS:
+            if section == 'objects':
+                # one raw object at a time, the raw objects list is never built
+                validated['objects'] = self._read_objects_as_models()
+                continue
+            self._read_section(section)
+            with tracing.span('validate', 'stage'):
+                for key in list(self.data):
+                    # header and def are still read by the sections after them
+                    if key not in ('header', 'def'):
+                        validated[key] = adapters[key].validate_python(self.data.pop(key))
+        with tracing.span('validate', 'stage'):
+            validated['header'] = adapters['header'].validate_python(self.data['header'])
+            validated['def'] = adapters['def'].validate_python(self.data.pop('def'))
+            # sections are validated already, this only checks the instances
+            return GameMapStructure.model_validate(validated)
+
+    def release_buffers(self) -> None:
+        """Drop the decompressed map and raw section data, the header is kept for map_stats."""
+        self.__dict__.pop('map_binary', None)
+        header = self.data.get('header')
+        self.data = collections.OrderedDict()
+        if header is not None:
+            self.data['header'] = header
+
+    def get_compact_data(self) -> 'CompactModel':
+        """Like `get_structured_data`, but builds compact records instead of pydantic models."""
+        from map_processors.compact import from_raw
+        from map_processors.schemas import GameMapStructure
+
+        self.data = collections.OrderedDict()
+        with tracing.span('parse', 'map', filename=str(self.filename)):
+            if not self.encoding:
+                self.detect_encoding_by_header()
+            for section in MAP_SECTIONS:
+                self._read_section(section)
+            with tracing.span('compact', 'stage'):
+                structure = from_raw(GameMapStructure, self.data)
+            if self.interner is not None:
+                self._intern_values(structure)
+            return structure
+
+    def _intern_values(self, structure: 'GameMapStructure | CompactModel') -> None:
+        with tracing.span('intern', 'stage'):
+            self.interner.intern_values(structure)
+        if logger.isEnabledFor(logging.DEBUG):
+            for line in self.interner.report():
+                logger.debug('intern %s', line)
+
+    def verify(self) -> 'VerifyReport':
+        """
+        Check the structure of the map without parsing it: lengths, enum values and trailing
+        data of every section and object body, see `map_processors.verify`.
+        """
+        from map_processors.verify import MapVerifier
+
+        with tracing.span('verify', 'map', filename=str(self.filename)):
+            return MapVerifier(self.map_binary, self.filename).verify()
+
+    def get_object_table(self) -> 'ObjectTable':
+        """
+        Columnar view of the objects, sections after objects and validation are skipped.
+        Objects go into the columns as they are read, the raw objects list is never built.
+        """
+        from map_processors.columnar import ObjectTable
+
+        self.data = collections.OrderedDict()
+        with tracing.span('parse_objects', 'map', filename=str(self.filename)):
+            if not self.encoding:
+                self.detect_encoding_by_header()
+            for section in MAP_SECTIONS[: MAP_SECTIONS.index('objects')]:
+                if section == 'terrain':
+                    self.skip_terrain()
+                    continue
+                self._read_section(section)
+                self._drop_section_data(keep=('header', 'def'))
+            return ObjectTable.from_raw(self._stream_objects(as_model=False))
+
+    def iter_objects(self, as_model: bool = False) -> 'Iterator[dict | MapObject]':
+        """
+        Yield the map objects one at a time as they are parsed, raw dicts or validated
+        models with `as_model`. Only the header and def info are kept, the objects list is
+        never built and the sections after objects are not read.
+        """
+        self.data = collections.OrderedDict()
+        # the span covers the sections before objects, objects are read at the caller's pace
+        with tracing.span('iter_objects', 'map', filename=str(self.filename)):
+            if not self.encoding:
+                self.detect_encoding_by_header()
+            for section in MAP_SECTIONS[: MAP_SECTIONS.index('objects')]:
+                if section == 'terrain':
+                    self.skip_terrain()
+                    continue
+                self._read_section(section)
+                self._drop_section_data(keep=('header', 'def'))
+        yield from self._stream_objects(as_model)
+
+    def visit(self, visitor: MapVisitor, as_model: bool = False) -> None:
+        """Parse the whole map, handing every section and object to `visitor` as it is read."""
+        self.data = collections.OrderedDict()
+        with tracing.span('visit', 'map', filename=str(self.filename)):
+            if not self.encoding:
+                self.detect_encoding_by_header()
+            for section in MAP_SECTIONS:
+                if section == 'objects':
+                    for index, map_object in enumerate(self._stream_objects(as_model)):
+                        visitor.visit_object(index, map_object)
+                    continue
+                kept = set(self.data)
+                self._read_section(section)
+                visitor.visit_section(
+                    section, {key: value for key, value in self.data.items() if key not in kept}
+                )
+                self._drop_section_data(keep=('header', 'def'))
+
+    def _drop_section_data(self, keep: tuple[str, ...]) -> None:
+        for key in list(self.data):
+            if key not in keep:
+                del self.data[key]
+
+    def skip_terrain(self) -> None:
+        header = self.data['header']
+        levels = 2 if header['has_underground'] else 1
+        self._cursor_position += TERRAIN_TILE.size * header['width'] * header['height'] * levels
+
+    def _stream_objects(self, as_model: bool) -> 'Iterator[dict | MapObject]':
+        if as_model:
+            from map_processors.schemas import MapObject
+
+            models = _object_models()
+        objects = self._iter_raw_objects()
+        while True:
+            try:
+                map_object = next(objects)
+            except StopIteration:
+                return
+            except IndexError as e:
+                raise H3MapParserException(
+                    f'Failed to parse objects in {self.filename} at offset {self._cursor_position}'
+                ) from e
+            if as_model:
+                # the class is known already, no need for the discriminator of the union
+                model = models.get(map_object['object_class'], MapObject)
+                map_object = model.model_validate(map_object)
+            yield map_object
+
+    def _read_objects_as_models(self) -> list:
+        start_position = self._cursor_position
+        with tracing.span('objects', 'section'):
+            objects = list(self._stream_objects(as_model=True))
+        if self.layout is not None:
+            self.layout.add_section('objects', start_position, self._cursor_position)
+        return objects
+
+    def _get_structured_data_with_stats(self) -> 'GameMapStructure':
+        from map_processors.schemas import GameMapStructure
+
+        self.stats = ParseStats(filename=str(self.filename), direction='parse')
+        start = time.perf_counter()
+        self.map_binary  # decompressed lazily, touch it to time it on its own
+        self.stats.decompress_seconds = time.perf_counter() - start
+        if not self.encoding:
+            start = time.perf_counter()
+            self.detect_encoding_by_header()
+            self.stats.detect_encoding_seconds = time.perf_counter() - start
+
+        for section in MAP_SECTIONS:
+            self._read_section_with_stats(section)
 
-        return GameMapStructure.model_validate(self.data)
+        start = time.perf_counter()
+        with tracing.span('validate', 'stage'):
+            structure = GameMapStructure.model_validate(self.data)
+        self.stats.validate_seconds = time.perf_counter() - start
+        self.stats.log(logger, logging.DEBUG)
+        return structure
@@ -0,0 +1,263 @@
+"""
+Benchmark suite for the parser, the writer and the translators.
+
+Times every `read_*` section of `MapParser`, every `write_*` section of `MapWriter`,
+pydantic validation, JSON dump/load and both translators, and records peak memory
+(via `tracemalloc`) for each case. Results are written as JSON and can be compared
+against a stored baseline.
+
+Usage:
+    python -m map_processors.benchmark [MAP ...] [--repeat N] [--output results.json]
+        [--baseline baseline.json] [--threshold 0.15] [--synthetic 252x50000]
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import pathlib
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from map_processors.base import MapParser
+from map_processors.constants import MAP_SECTIONS
+from map_processors.schemas import GameMapStructure
+from map_processors.synthetic import SyntheticMapGenerator
+from map_processors.translations import MapSimpleTranslator, MapTranslationFileGenerator
+from map_processors.writer import MapWriter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAP = pathlib.Path(__file__).resolve().parents[1] / '6424.h3m'
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.15
+
+
+class _CaseTimer:
+    """Collects wall times of named cases across repetitions."""
+
+    def __init__(self) -> None:
+        self.timings: dict[str, list[float]] = {}
+
+    def add(self, case: str, seconds: float) -> None:
+        self.timings.setdefault(case, []).append(seconds)
+
+    def measure(self, case: str, func: Callable):
+        start = time.perf_counter()
+        result = func()
+        self.add(case, time.perf_counter() - start)
+        return result
+
+
+def _run_parser_sections(parser: MapParser, timer: _CaseTimer) -> None:
+    parser.reset_cursor_position()
+    for section in MAP_SECTIONS:
+        timer.measure(f'parse.{section}', getattr(parser, f'read_{section}'))
+
+
+def _run_writer_sections(writer: MapWriter, timer: _CaseTimer) -> None:
+    writer._buffer = bytearray()
+    for section in MAP_SECTIONS:
+        timer.measure(f'write.{section}', getattr(writer, f'write_{section}'))
+
+
+def _write_identity_translations(map_path: pathlib.Path, workdir: pathlib.Path) -> pathlib.Path:
+    generator = MapTranslationFileGenerator(str(map_path), output_filename=str(workdir / 'x.json'))
+    generator.get_structured_data()
+    translations_path = workdir / 'identity_translations.json'
+    # ASCII-escaped, so the file reads back the same whatever encoding the translator uses
+    translations_path.write_text(
+        json.dumps({string: string for string in generator.strings_to_translate}),
+        encoding='ascii',
+    )
+    return translations_path
+
+
+def _benchmark_map(map_path: pathlib.Path, repeat: int) -> dict[str, list[float]]:
+    timer = _CaseTimer()
+    compressed = map_path.read_bytes()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = pathlib.Path(tmp)
+        translations_path = _write_identity_translations(map_path, workdir)
+
+        for _ in range(repeat):
+            map_binary = timer.measure('parse.decompress', lambda: gzip.decompress(compressed))
+
+            parser = MapParser(map_path)
+            parser.map_binary = map_binary
+            timer.measure('parse.detect_encoding', parser.detect_encoding_by_header)
+            _run_parser_sections(parser, timer)
+
+            structure = timer.measure(
+                'validate', lambda: GameMapStructure.model_validate(parser.data)
+            )
+            json_str = timer.measure(
+                'json.dump', lambda: structure.model_dump_json(by_alias=True, exclude_none=True)
+            )
+            timer.measure('json.load', lambda: GameMapStructure.model_validate_json(json_str))
+
+            writer = MapWriter(structure, encoding=parser.encoding)
+            _run_writer_sections(writer, timer)
+            timer.measure('write.gzip', lambda: gzip.compress(bytes(writer._buffer)))
+
+            generator = MapTranslationFileGenerator(
+                str(map_path), output_filename=str(workdir / 'translations.json')
+            )
+            timer.measure('translate.generate', generator.write_output_file)
+
+            translator = MapSimpleTranslator(
+                str(map_path),
+                translations_filename=str(translations_path),
+                output_filename=str(workdir / 'translated.h3m'),
+            )
+            timer.measure('translate.apply', translator.write_output_file)
+
+    return timer.timings
+
+
+def _peak_memory(func: Callable) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _memory_cases(map_path: pathlib.Path) -> dict[str, int]:
+    """Peak memory of the end-to-end stages, measured in separate traced runs."""
+
+    def parse():
+        return MapParser(map_path).get_structured_data()
+
+    parser = MapParser(map_path)
+    structure = parser.get_structured_data()
+    encoding = parser.encoding
+    json_str = structure.model_dump_json(by_alias=True, exclude_none=True)
+
+    return {
+        'parse': _peak_memory(parse),
+        'json.dump': _peak_memory(
+            lambda: structure.model_dump_json(by_alias=True, exclude_none=True)
+        ),
+        'json.load': _peak_memory(lambda: GameMapStructure.model_validate_json(json_str)),
+        'write': _peak_memory(lambda: MapWriter(structure, encoding=encoding).write()),
+    }
+
+
+def run_benchmarks(map_paths: list[pathlib.Path], repeat: int = DEFAULT_REPEAT) -> dict:
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'maps': {},
+    }
+    for map_path in map_paths:
+        logger.info('Benchmarking %s', map_path)
+        timings = _benchmark_map(map_path, repeat)
+        peaks = _memory_cases(map_path)
+        cases = {
+            case: {
+                'min': min(values),
+                'median': statistics.median(values),
+                'max': max(values),
+            }
+            for case, values in timings.items()
+        }
+        for case, peak in peaks.items():
+            cases.setdefault(f'memory.{case}', {})['peak_bytes'] = peak
+        results['maps'][map_path.name] = cases
+
+    return results
+
+
+def compare_with_baseline(
+    results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD
+) -> list[dict]:
+    """Return every case that got slower (median) or hungrier (peak) than `threshold` allows."""
+    regressions = []
+    for map_name, cases in results['maps'].items():
+        baseline_cases = baseline.get('maps', {}).get(map_name, {})
+        for case, values in cases.items():
+            baseline_values = baseline_cases.get(case)
+            if not baseline_values:
+                continue
+            for metric in ('median', 'peak_bytes'):
+                if metric not in values or not baseline_values.get(metric):
+                    continue
+                ratio = values[metric] / baseline_values[metric]
+                if ratio > 1 + threshold:
+                    regressions.append(
+                        {
+                            'map': map_name,
+                            'case': case,
+                            'metric': metric,
+                            'baseline': baseline_values[metric],
+                            'current': values[metric],
+                            'ratio': ratio,
+                        }
+                    )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark tolmach parser, writer, translators')
+    parser.add_argument('maps', nargs='*', type=pathlib.Path, default=[DEFAULT_MAP])
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--output', type=pathlib.Path, help='write JSON results to this file')
+    parser.add_argument('--baseline', type=pathlib.Path, help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        '--synthetic',
+        action='append',
+        default=[],
+        metavar='SIZExOBJECTS',
+        help='also benchmark a generated map, e.g. 252x50000 (underground included)',
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    # string decode fallbacks are expected on real maps and only add noise here
+    logging.getLogger('map_processors.base').setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        map_paths = list(args.maps)
+        for spec in args.synthetic:
+            size, objects_quantity = (int(value) for value in spec.lower().split('x'))
+            map_path = pathlib.Path(tmp) / f'synthetic_{size}x{objects_quantity}.h3m'
+            SyntheticMapGenerator(
+                size=size, has_underground=True, objects_quantity=objects_quantity
+            ).write_to_file(map_path)
+            map_paths.append(map_path)
+
+        results = run_benchmarks(map_paths, repeat=args.repeat)
+    results_json = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(results_json, encoding='utf-8')
+    else:
+        sys.stdout.write(results_json + '\n')
+
+    if not args.baseline:
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    regressions = compare_with_baseline(results, baseline, threshold=args.threshold)
+    for regression in regressions:
+        logger.error(
+            'Regression in %(map)s %(case)s %(metric)s: %(baseline)s -> %(current)s (x%(ratio).2f)',
+            regression,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
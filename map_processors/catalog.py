@@ -0,0 +1,316 @@
+"""
+SQLite catalog of map archives for search without touching the map files.
+
+Only the header, players and victory/loss conditions are read (`map_processors.header`).
+Refreshing is incremental: a file whose mtime and size are unchanged is skipped, a file
+whose content hash is unchanged only gets its mtime updated, removed files are dropped:
+
+    with MapCatalog('catalog.sqlite') as catalog:
+        catalog.refresh('maps/')
+        catalog.search('dragon', size=144, has_underground=True)
+
+Usage:
+    python -m map_processors.catalog DATABASE MAP_OR_DIR [...] [--workers N]
+"""
+
+import argparse
+import concurrent.futures
+import dataclasses
+import hashlib
+import logging
+import os
+import pathlib
+import sqlite3
+import sys
+
+from map_processors.exceptions import H3MapParserException
+from map_processors.header import read_map_header
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    file_size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    name TEXT,
+    description TEXT,
+    encoding TEXT,
+    map_type TEXT,
+    size INTEGER,
+    has_underground INTEGER,
+    difficulty TEXT,
+    players INTEGER,
+    human_players INTEGER,
+    teams INTEGER,
+    victory_condition INTEGER,
+    loss_condition INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS catalog_size ON catalog (size, has_underground);
+CREATE INDEX IF NOT EXISTS catalog_players ON catalog (players, human_players);
+"""
+
+COLUMNS = (
+    'path',
+    'mtime_ns',
+    'file_size',
+    'hash',
+    'name',
+    'description',
+    'encoding',
+    'map_type',
+    'size',
+    'has_underground',
+    'difficulty',
+    'players',
+    'human_players',
+    'teams',
+    'victory_condition',
+    'loss_condition',
+    'error',
+)
+
+# search() filters compared with `=`, the rest of its arguments are ranges or text
+EQUAL_FILTERS = ('map_type', 'size', 'has_underground', 'difficulty', 'encoding', 'teams')
+
+
+@dataclasses.dataclass
+class RefreshResult:
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    failed: int = 0
+
+
+def file_hash(path: str | pathlib.Path) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+
+def _read_entry(task: tuple[str, int, int, str | None]) -> tuple[dict, bool]:
+    """Catalog row of a file and whether its content changed, runs in the workers."""
+    path, mtime_ns, file_size, known_hash = task
+    row = dict.fromkeys(COLUMNS)
+    # no hash when the file is gone or unreadable since the scan, it is read again next time
+    row.update(path=path, mtime_ns=mtime_ns, file_size=file_size, hash='')
+    try:
+        row['hash'] = file_hash(path)
+        if row['hash'] == known_hash:
+            return row, False
+        info = read_map_header(path, conditions=True)
+    except (H3MapParserException, OSError, EOFError, ValueError, UnicodeError) as e:
+        row['error'] = f'{type(e).__name__}: {e}'
+        return row, True
+
+    active = [
+        player
+        for player in info['players']
+        if player['can_human_play'] or player['can_computer_play']
+    ]
+    row.update(
+        name=info['map_name'],
+        description=info['map_description'],
+        encoding=info['encoding'],
+        map_type=info['map_type'],
+        size=int(info['size'].split('x')[0]),
+        has_underground=info['has_underground'],
+        difficulty=info['difficulty'],
+        players=len(active),
+        human_players=sum(1 for player in active if player['can_human_play']),
+        teams=info['teams']['quantity'],
+        victory_condition=info['victory']['special_victory_condition'],
+        loss_condition=info['loss']['special_loss_condition'],
+    )
+    return row, True
+
+
+def _expand(paths: tuple[str | pathlib.Path, ...]) -> list[pathlib.Path]:
+    files = []
+    for path in map(pathlib.Path, paths):
+        files.extend(sorted(path.rglob('*.h3m')) if path.is_dir() else [path])
+    return files
+
+
+def scan(
+    paths: tuple[str | pathlib.Path, ...], known: dict[str, tuple[int, int, str]]
+) -> tuple[list[tuple[str, int, int, str | None]], int, list[str]]:
+    """
+    Compare the files of `paths` (maps or directories) with `known` (path -> mtime_ns,
+    size, hash): (path, mtime_ns, size, known hash or None) of new or touched files, the
+    number of untouched files and the known paths under a directory of `paths` that are gone.
+    """
+    tasks = []
+    unchanged = 0
+    seen = set()
+    for file in _expand(paths):
+        path = str(file)
+        seen.add(path)
+        try:
+            stat = file.stat()
+        except OSError as e:
+            logger.error('%s: %s', path, e)
+            continue
+        entry = known.get(path)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            unchanged += 1
+            continue
+        tasks.append((path, stat.st_mtime_ns, stat.st_size, entry[2] if entry else None))
+
+    directories = [pathlib.Path(path) for path in paths if pathlib.Path(path).is_dir()]
+    removed = [
+        path
+        for path in known
+        if path not in seen
+        and any(pathlib.Path(path).is_relative_to(directory) for directory in directories)
+    ]
+    return tasks, unchanged, removed
+
+
+class MapCatalog:
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> 'MapCatalog':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute('SELECT count(*) FROM catalog').fetchone()[0]
+
+    def refresh(self, *paths: str | pathlib.Path, workers: int | None = 1) -> RefreshResult:
+        """
+        Bring the entries of `paths` (maps or directories) up to date. Entries under a
+        directory of `paths` whose file is gone are removed. `workers` above 1 reads the
+        changed files in a process pool.
+        """
+        result = RefreshResult()
+        known = {
+            row['path']: (row['mtime_ns'], row['file_size'], row['hash'])
+            for row in self.connection.execute(
+                'SELECT path, mtime_ns, file_size, hash FROM catalog'
+            )
+        }
+        tasks, result.unchanged, removed = scan(paths, known)
+
+        with self.connection:
+            self.connection.executemany(
+                'DELETE FROM catalog WHERE path = ?', ((path,) for path in removed)
+            )
+            result.removed = len(removed)
+            for row, changed in self._read_entries(tasks, workers):
+                if not changed:
+                    self.connection.execute(
+                        'UPDATE catalog SET mtime_ns = ?, file_size = ? WHERE path = ?',
+                        (row['mtime_ns'], row['file_size'], row['path']),
+                    )
+                    result.unchanged += 1
+                    continue
+                self.connection.execute(
+                    f'INSERT OR REPLACE INTO catalog VALUES ({", ".join("?" * len(COLUMNS))})',
+                    tuple(row[column] for column in COLUMNS),
+                )
+                if row['error'] is not None:
+                    logger.error('%s: %s', row['path'], row['error'])
+                    result.failed += 1
+                elif row['path'] in known:
+                    result.updated += 1
+                else:
+                    result.added += 1
+        return result
+
+    @staticmethod
+    def _read_entries(tasks: list[tuple], workers: int | None):
+        if workers == 1 or len(tasks) < 2:
+            yield from map(_read_entry, tasks)
+            return
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(_read_entry, tasks, chunksize=16)
+
+    def get(self, path: str | pathlib.Path) -> dict | None:
+        row = self.connection.execute(
+            'SELECT * FROM catalog WHERE path = ?', (str(path),)
+        ).fetchone()
+        return None if row is None else dict(row)
+
+    def search(
+        self,
+        text: str | None = None,
+        *,
+        min_players: int | None = None,
+        max_players: int | None = None,
+        min_human_players: int | None = None,
+        limit: int | None = None,
+        **filters,
+    ) -> list[dict]:
+        """
+        Entries whose name or description contains `text` (case-insensitive for ASCII)
+        matching `filters` (`EQUAL_FILTERS` columns) and player ranges, ordered by name.
+        Files that failed to parse are not returned.
+        """
+        unknown = filters.keys() - set(EQUAL_FILTERS)
+        if unknown:
+            raise ValueError(f'Unknown filters: {", ".join(sorted(unknown))}')
+
+        conditions = ['error IS NULL']
+        parameters = []
+        if text:
+            conditions.append("(name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')")
+            pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            parameters += [pattern + '%'] * 2
+        for column, value in filters.items():
+            conditions.append(f'{column} = ?')
+            parameters.append(value)
+        for column, operator, value in (
+            ('players', '>=', min_players),
+            ('players', '<=', max_players),
+            ('human_players', '>=', min_human_players),
+        ):
+            if value is not None:
+                conditions.append(f'{column} {operator} ?')
+                parameters.append(value)
+
+        query = f'SELECT * FROM catalog WHERE {" AND ".join(conditions)} ORDER BY name, path'
+        if limit is not None:
+            query += ' LIMIT ?'
+            parameters.append(limit)
+        return [dict(row) for row in self.connection.execute(query, parameters)]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Build or refresh a SQLite map catalog')
+    parser.add_argument('database', type=pathlib.Path)
+    parser.add_argument('paths', nargs='+', type=pathlib.Path, help='maps or directories')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    logging.getLogger('map_processors.base').setLevel(logging.CRITICAL)
+
+    with MapCatalog(args.database) as catalog:
+        result = catalog.refresh(*args.paths, workers=args.workers)
+        logger.info(
+            '%d added, %d updated, %d unchanged, %d removed, %d failed; %d maps in %s',
+            result.added,
+            result.updated,
+            result.unchanged,
+            result.removed,
+            result.failed,
+            len(catalog),
+            args.database,
+        )
+    return 0 if not result.failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Columnar view of map objects for filtering and aggregation.
+
+The common object fields are stored in parallel `array.array` columns (object classes and
+owners as small integer codes), filters run over whole columns with `map`/`compress`:
+
+    table = MapParser('6424.h3m').get_object_table()
+    towns = table.select(object_class='town', owner='red')
+    big_stacks = table.select(object_class='monster', quantity=lambda quantity: quantity > 100)
+    table.count_by('object_class', rows=big_stacks)
+
+`select` returns row numbers, which are also indices into `GameMapStructure.objects`.
+"""
+
+import array
+import collections
+import itertools
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from map_processors.enums import ColorEnum
+from map_processors.schemas import GameMapStructure
+
+# owner and quantity of objects that have none
+MISSING = -1
+
+_INTEGER_COLUMNS = {
+    'object_subclass': 'I',
+    'object_number': 'I',
+    'x': 'B',
+    'y': 'B',
+    'z': 'B',
+    'owner': 'h',
+    'quantity': 'q',
+}
+COLUMNS = ('object_class', *_INTEGER_COLUMNS)
+
+
+def _owner_code(owner: str | int | None) -> int:
+    if owner is None:
+        return MISSING
+    if isinstance(owner, str):
+        return ColorEnum[owner.upper()].value
+    return owner
+
+
+def _owner_name(code: int) -> str | int | None:
+    if code == MISSING:
+        return None
+    try:
+        return ColorEnum(code).name.lower()
+    except ValueError:
+        return code
+
+
+class ObjectTable:
+    def __init__(self) -> None:
+        # code -> object class, codes are assigned in order of appearance
+        self.classes: list[str] = []
+        self._class_codes: dict[str, int] = {}
+        self.object_class = array.array('H')
+        for name, typecode in _INTEGER_COLUMNS.items():
+            setattr(self, name, array.array(typecode))
+
+    def __len__(self) -> int:
+        return len(self.object_class)
+
+    def append(
+        self,
+        object_class: str,
+        object_subclass: int,
+        object_number: int,
+        coordinates: tuple[int, int, int],
+        owner: str | int | None = None,
+        quantity: int | None = None,
+    ) -> None:
+        class_code = self._class_codes.get(object_class)
+        if class_code is None:
+            class_code = self._class_codes[object_class] = len(self.classes)
+            self.classes.append(object_class)
+        self.object_class.append(class_code)
+        self.object_subclass.append(object_subclass)
+        self.object_number.append(object_number)
+        x, y, z = coordinates
+        self.x.append(x)
+        self.y.append(y)
+        self.z.append(z)
+        self.owner.append(_owner_code(owner))
+        self.quantity.append(MISSING if quantity is None else quantity)
+
+    @classmethod
+    def from_raw(cls, objects: Iterable[dict]) -> 'ObjectTable':
+        """Build from raw object dicts, `MapParser.data['objects']` or a stream of them."""
+        table = cls()
+        for map_object in objects:
+            table.append(
+                map_object['object_class'],
+                map_object['object_subclass'],
+                map_object['object_number'],
+                map_object['coordinates'],
+                map_object.get('owner'),
+                map_object.get('quantity'),
+            )
+        return table
+
+    @classmethod
+    def from_structure(cls, structure: GameMapStructure) -> 'ObjectTable':
+        table = cls()
+        for map_object in structure.objects:
+            table.append(
+                map_object.object_class,
+                map_object.object_subclass,
+                map_object.object_number,
+                map_object.coordinates,
+                getattr(map_object, 'owner', None),
+                getattr(map_object, 'quantity', None),
+            )
+        return table
+
+    def _encode(self, column: str, value: Any) -> Any:
+        """Turn a filter value of `select` into a test on the raw column values."""
+        if callable(value):
+            if column == 'object_class':
+                return lambda code: value(self.classes[code])
+            if column == 'owner':
+                return lambda code: value(_owner_name(code))
+            return value
+        if isinstance(value, set | frozenset | list | tuple):
+            return {self._encode_scalar(column, item) for item in value}.__contains__
+        return self._encode_scalar(column, value).__eq__
+
+    def _encode_scalar(self, column: str, value: Any) -> int:
+        if column == 'object_class':
+            return self._class_codes.get(value, MISSING)
+        if column == 'owner':
+            return _owner_code(value)
+        if value is None:
+            return MISSING
+        return value
+
+    def select(
+        self,
+        rows: Iterable[int] | None = None,
+        **conditions: Any | Callable[[Any], bool],
+    ) -> array.array:
+        """
+        Row numbers matching every condition.
+
+        A condition is a value (equality), a set/list/tuple of values (membership) or
+        a predicate. Class and owner predicates get names, other columns raw integers
+        (`MISSING` for objects without owner or quantity).
+        """
+        for column, value in conditions.items():
+            if column not in COLUMNS:
+                raise ValueError(f'Unknown column: {column}')
+            test = self._encode(column, value)
+            values = getattr(self, column)
+            if rows is None:
+                rows = itertools.compress(range(len(values)), map(test, values))
+            else:
+                rows = list(rows)
+                rows = itertools.compress(rows, map(test, map(values.__getitem__, rows)))
+        if rows is None:
+            rows = range(len(self))
+        return array.array('I', rows)
+
+    def values(self, column: str, rows: Iterable[int] | None = None) -> list:
+        """Decoded values of a column (class names, owner colors)."""
+        raw = getattr(self, column)
+        if rows is not None:
+            raw = map(raw.__getitem__, rows)
+        if column == 'object_class':
+            return [self.classes[code] for code in raw]
+        if column == 'owner':
+            return [_owner_name(code) for code in raw]
+        return list(raw)
+
+    def count_by(self, *columns: str, rows: Iterable[int] | None = None) -> collections.Counter:
+        """Quantity of rows per value (or per tuple of values for several columns)."""
+        if rows is not None:
+            rows = array.array('I', rows)
+        decoded = [self.values(column, rows) for column in columns]
+        if len(decoded) == 1:
+            return collections.Counter(decoded[0])
+        return collections.Counter(zip(*decoded, strict=True))
@@ -0,0 +1,218 @@
+"""
+Compact `__slots__` records mirroring the models of `schemas`.
+
+A pydantic model instance carries a `__dict__` plus fields-set and private/extra slots,
+which dominates memory on maps with tens of thousands of tiles and objects. A compact
+record only has one slot per field. Record classes are generated from the models (named
+`Compact<Model>`), so they follow `schemas` automatically:
+
+    structure = MapParser('6424.h3m').get_compact_data()  # no pydantic on the way
+    MapWriter(structure, encoding='GB18030').write()
+    model = structure.to_model()  # validated GameMapStructure at the API boundary
+
+Records are not validated; `to_model()` is where validation happens.
+"""
+
+import types
+from collections.abc import Callable
+from typing import Annotated, Any, Union, get_args, get_origin
+
+from pydantic import BaseModel, Tag
+from pydantic.fields import FieldInfo
+
+_REQUIRED = object()
+_compact_classes: dict[type[BaseModel], type['CompactModel']] = {}
+
+
+class CompactModel:
+    __slots__ = ()
+    # the pydantic model the record mirrors
+    __model__: type[BaseModel]
+    # (name, key in raw data, converter, default) per field, built on first use
+    _plan: tuple | None = None
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+    def __reduce__(self) -> tuple:
+        # record classes are generated, pickle refers to the model instead
+        return _restore, (self.__model__, tuple(getattr(self, name) for name in self.__slots__))
+
+    def to_dict(self) -> dict:
+        return {name: _plain(getattr(self, name)) for name in self.__slots__}
+
+    def to_model(self) -> BaseModel:
+        return self.__model__.model_validate(self.to_dict())
+
+
+def _restore(model: type[BaseModel], values: tuple) -> CompactModel:
+    record = object.__new__(compact_class(model))
+    for name, value in zip(record.__slots__, values, strict=True):
+        setattr(record, name, value)
+    return record
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, CompactModel):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+def compact_class(model: type[BaseModel]) -> type[CompactModel]:
+    compact = _compact_classes.get(model)
+    if compact is None:
+        compact = type(
+            f'Compact{model.__name__}',
+            (CompactModel,),
+            {'__slots__': tuple(model.model_fields), '__model__': model},
+        )
+        _compact_classes[model] = compact
+    return compact
+
+
+def _unwrap_annotated(annotation: Any) -> tuple[Any, list]:
+    metadata = []
+    while get_origin(annotation) is Annotated:
+        annotation, *extra = get_args(annotation)
+        metadata.extend(extra)
+    return annotation, metadata
+
+
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _model_converter(model: type[BaseModel]) -> Callable:
+    return lambda value: _convert(model, value)
+
+
+def _union_converter(members: list, discriminator: Callable | None) -> Callable:
+    tags = {}
+    models = []
+    for member in members:
+        member, metadata = _unwrap_annotated(member)
+        models.append(member)
+        for item in metadata:
+            if isinstance(item, Tag):
+                tags[item.tag] = member
+
+    def choose(value: dict) -> type[BaseModel]:
+        if discriminator is not None:
+            return tags[discriminator(value)]
+        # like pydantic's smart mode for the models in `schemas`: the first model that
+        # has every key of the data and gets every required field
+        for model in models:
+            fields = model.model_fields
+            if value.keys() <= fields.keys() and all(
+                name in value for name, field in fields.items() if field.is_required()
+            ):
+                return model
+        raise ValueError(f'No model of {[model.__name__ for model in models]} fits {value!r}')
+
+    def convert(value: Any) -> Any:
+        if isinstance(value, BaseModel | CompactModel):
+            return _convert(type(value), value)
+        return _convert(choose(value), value)
+
+    return convert
+
+
+def _converter(annotation: Any) -> Callable | None:
+    """Function turning raw data (or a model) of `annotation` into compact records."""
+    annotation, metadata = _unwrap_annotated(annotation)
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        members = [member for member in get_args(annotation) if member is not type(None)]
+        if len(members) == 1:
+            inner = _converter(members[0])
+            if inner is None:
+                return None
+            return lambda value: None if value is None else inner(value)
+        if all(_is_model(_unwrap_annotated(member)[0]) for member in members):
+            discriminator = next(
+                (
+                    item.discriminator.discriminator
+                    for item in metadata
+                    if isinstance(item, FieldInfo) and item.discriminator is not None
+                ),
+                None,
+            )
+            return _union_converter(members, discriminator)
+        return None
+    if origin is list:
+        inner = _converter(get_args(annotation)[0])
+        if inner is None:
+            return list
+        return lambda value: [inner(item) for item in value]
+    if origin is tuple:
+        return tuple
+    if origin is dict:
+        key_type, value_type = get_args(annotation)
+        inner = _converter(value_type) or (lambda value: value)
+        key = int if key_type is int else (lambda key: key)
+        return lambda value: {key(name): inner(item) for name, item in value.items()}
+    if annotation is bool:
+        return bool
+    if _is_model(annotation):
+        return _model_converter(annotation)
+    return None
+
+
+def _plan(compact: type[CompactModel]) -> tuple:
+    if compact._plan is None:
+        plan = []
+        for name, field in compact.__model__.model_fields.items():
+            converter = _converter(field.annotation)
+            # defaults go through the converter too, records never share mutable defaults
+            default = (
+                _REQUIRED if field.is_required() else field.get_default(call_default_factory=True)
+            )
+            plan.append((name, field.alias or name, converter, default))
+        compact._plan = tuple(plan)
+    return compact._plan
+
+
+def _convert(model: type[BaseModel], value: Any) -> CompactModel:
+    if isinstance(value, CompactModel):
+        return value
+    compact = compact_class(model)
+    record = object.__new__(compact)
+    if isinstance(value, BaseModel):
+        attributes = value.__dict__
+        for name, _, converter, _ in _plan(compact):
+            item = attributes[name]
+            setattr(record, name, item if converter is None or item is None else converter(item))
+        return record
+
+    for name, key, converter, default in _plan(compact):
+        item = value.get(key, _REQUIRED)
+        if item is _REQUIRED and key != name:
+            item = value.get(name, _REQUIRED)
+        if item is _REQUIRED:
+            if default is _REQUIRED:
+                raise ValueError(f'{model.__name__}.{name} is required')
+            item = default
+        setattr(record, name, item if converter is None or item is None else converter(item))
+    return record
+
+
+def to_compact(model: BaseModel) -> CompactModel:
+    """Compact copy of a pydantic model instance."""
+    return _convert(type(model), model)
+
+
+def from_raw(model: type[BaseModel], data: dict) -> CompactModel:
+    """Compact records of `model` from raw (parser) data, without validation."""
+    return _convert(model, data)
@@ -1 +1,22 @@
 PLAYER_COLORS = ('red', 'blue', 'tan', 'green', 'orange', 'purple', 'teal', 'pink')
+
+# Binary sections of a map in file order, read by `MapParser.read_<section>`
+# and written by `MapWriter.write_<section>`
+MAP_SECTIONS = (
+    'header',
+    'players_attributes',
+    'victory_conditions',
+    'loss_conditions',
+    'teams',
+    'heroes_info',
+    'artifacts',
+    'spells',
+    'abilities',
+    'rumors',
+    'predefined_heroes',
+    'terrain',
+    'def_info',
+    'objects',
+    'events',
+    'trailing_unknown',
+)
@@ -0,0 +1,304 @@
+"""
+Structural diff of two `GameMapStructure`s.
+
+Objects are matched by coordinates and the content of their def (not the def index, so
+reordered or extended def lists do not show up as changed objects), terrain changes are
+reported per level as a bit mask of the changed tiles of every changed row, and as runs of
+changed tiles:
+
+    map_diff = diff(old_structure, new_structure)
+    for line in map_diff.summary():
+        ...
+
+Usage:
+    python -m map_processors.diff OLD NEW [--output diff.json]
+
+OLD and NEW are .h3m maps or JSON dumps of `GameMapStructure`.
+"""
+
+import argparse
+import array
+import collections
+import dataclasses
+import itertools
+import json
+import operator
+import pathlib
+import re
+import sys
+from typing import Any, Iterator
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from map_processors.base import TERRAIN_TILE_FIELDS, MapParser
+from map_processors.schemas import DefFile, GameMapStructure, TerrainTile
+
+# compared separately by `diff`, every other field of the structure is compared field by field
+_STRUCTURED_FIELDS = ('terrain', 'def_objects', 'objects', 'events', 'rumors')
+
+_tile_values = operator.attrgetter(*TERRAIN_TILE_FIELDS)
+_NONZERO = re.compile(rb'[^\x00]+')
+
+
+@dataclasses.dataclass
+class FieldChange:
+    path: str
+    old: Any
+    new: Any
+
+
+@dataclasses.dataclass
+class TerrainChange:
+    level: str
+    changed_tiles: int
+    # y -> mask of the changed tiles of the row, bit x set for the tile at x
+    masks: dict[int, int]
+    # (y, x_start, x_end) with x_end exclusive
+    runs: list[tuple[int, int, int]]
+
+
+@dataclasses.dataclass
+class ObjectChange:
+    object_class: str
+    coordinates: tuple[int, int, int]
+    sprite_filename: str
+    # index in the objects of the old / new structure, None for added / removed objects
+    old_index: int | None
+    new_index: int | None
+    changes: list[FieldChange] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class MapDiff:
+    fields: list[FieldChange] = dataclasses.field(default_factory=list)
+    terrain: list[TerrainChange] = dataclasses.field(default_factory=list)
+    defs_added: list[str] = dataclasses.field(default_factory=list)
+    defs_removed: list[str] = dataclasses.field(default_factory=list)
+    objects_added: list[ObjectChange] = dataclasses.field(default_factory=list)
+    objects_removed: list[ObjectChange] = dataclasses.field(default_factory=list)
+    objects_modified: list[ObjectChange] = dataclasses.field(default_factory=list)
+    events: list[FieldChange] = dataclasses.field(default_factory=list)
+    rumors: list[FieldChange] = dataclasses.field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, field.name) for field in dataclasses.fields(self))
+
+    def as_dict(self) -> dict:
+        return to_jsonable_python(dataclasses.asdict(self))
+
+    def summary(self) -> list[str]:
+        lines = [f'{change.path}: {change.old!r} -> {change.new!r}' for change in self.fields]
+        for change in self.terrain:
+            lines.append(f'terrain.{change.level}: {change.changed_tiles} tiles changed')
+        if self.defs_added or self.defs_removed:
+            lines.append(f'defs: +{len(self.defs_added)} -{len(self.defs_removed)}')
+        for prefix, changes in (
+            ('+', self.objects_added),
+            ('-', self.objects_removed),
+            ('~', self.objects_modified),
+        ):
+            for change in changes:
+                lines.append(f'{prefix} {change.object_class} at {change.coordinates}')
+                lines.extend(
+                    f'    {field.path}: {field.old!r} -> {field.new!r}' for field in change.changes
+                )
+        lines.extend(
+            f'{change.path}: {change.old!r} -> {change.new!r}'
+            for change in (*self.events, *self.rumors)
+        )
+        return lines
+
+
+def compare_values(path: str, old: Any, new: Any, changes: list[FieldChange]) -> None:
+    """Append the leaf differences of two values (models, lists, dicts) to `changes`."""
+    if old == new:
+        return
+    if isinstance(old, BaseModel) and type(old) is type(new):
+        for name in type(old).model_fields:
+            compare_values(f'{path}.{name}', getattr(old, name), getattr(new, name), changes)
+    elif isinstance(old, list | tuple) and isinstance(new, list | tuple) and len(old) == len(new):
+        for index, (old_item, new_item) in enumerate(zip(old, new, strict=True)):
+            compare_values(f'{path}[{index}]', old_item, new_item, changes)
+    elif isinstance(old, dict) and isinstance(new, dict) and old.keys() == new.keys():
+        for key in old:
+            compare_values(f'{path}[{key}]', old[key], new[key], changes)
+    else:
+        changes.append(FieldChange(path, old, new))
+
+
+def _compare_sequences(path: str, old: list, new: list, changes: list[FieldChange]) -> None:
+    for index, (old_item, new_item) in enumerate(zip(old, new, strict=False)):
+        compare_values(f'{path}[{index}]', old_item, new_item, changes)
+    for index in range(len(new), len(old)):
+        changes.append(FieldChange(f'{path}[{index}]', old[index], None))
+    for index in range(len(old), len(new)):
+        changes.append(FieldChange(f'{path}[{index}]', None, new[index]))
+
+
+def _pack_tiles(old: list[TerrainTile], new: list[TerrainTile]) -> tuple[bytes, bytes, int]:
+    """Tile values of both levels as bytes, and the size of a tile in them."""
+    try:
+        # one byte per value, what the map format stores
+        return (
+            bytes(itertools.chain.from_iterable(map(_tile_values, old))),
+            bytes(itertools.chain.from_iterable(map(_tile_values, new))),
+            len(TERRAIN_TILE_FIELDS),
+        )
+    except ValueError:
+        # edited out of the byte range, compare them as 64-bit values
+        old_values = array.array('q', itertools.chain.from_iterable(map(_tile_values, old)))
+        new_values = array.array('q', itertools.chain.from_iterable(map(_tile_values, new)))
+        return old_values.tobytes(), new_values.tobytes(), len(TERRAIN_TILE_FIELDS) * 8
+
+
+def _changed_tiles(old: bytes, new: bytes, tile_size: int) -> Iterator[int]:
+    """Indices of the tiles that differ, in order; tiles only one level has are changed."""
+    common = min(len(old), len(new))
+    # the XOR of the common part has a non-zero byte for every changed value
+    changes = (int.from_bytes(old[:common]) ^ int.from_bytes(new[:common])).to_bytes(common)
+    last = -1
+    for match in _NONZERO.finditer(changes):
+        # a tile may hold the end of one match and the start of the next
+        first = max(match.start() // tile_size, last + 1)
+        last = (match.end() - 1) // tile_size
+        yield from range(first, last + 1)
+    yield from range(common // tile_size, max(len(old), len(new)) // tile_size)
+
+
+def _mask_runs(y: int, mask: int) -> Iterator[tuple[int, int, int]]:
+    while mask:
+        start = (mask & -mask).bit_length() - 1
+        # length of the run of set bits from start
+        length = (~mask >> start & (mask >> start) + 1).bit_length() - 1
+        yield y, start, start + length
+        mask &= ~((1 << start + length) - 1)
+
+
+def _diff_terrain_level(
+    level: str, old: list[TerrainTile], new: list[TerrainTile], width: int
+) -> TerrainChange | None:
+    old_tiles, new_tiles, tile_size = _pack_tiles(old, new)
+    if old_tiles == new_tiles:
+        return None
+
+    masks = {}
+    changed_tiles = 0
+    for index in _changed_tiles(old_tiles, new_tiles, tile_size):
+        y, x = divmod(index, width)
+        masks[y] = masks.get(y, 0) | 1 << x
+        changed_tiles += 1
+    runs = [run for y, mask in masks.items() for run in _mask_runs(y, mask)]
+    return TerrainChange(level=level, changed_tiles=changed_tiles, masks=masks, runs=runs)
+
+
+def _def_key(def_file: DefFile) -> tuple:
+    return tuple(def_file.__dict__.values())
+
+
+def _object_change(
+    map_object, sprite_filename: str, old_index: int | None, new_index: int | None
+) -> ObjectChange:
+    return ObjectChange(
+        object_class=map_object.object_class,
+        coordinates=tuple(map_object.coordinates),
+        sprite_filename=sprite_filename,
+        old_index=old_index,
+        new_index=new_index,
+    )
+
+
+def _diff_objects(old: GameMapStructure, new: GameMapStructure, map_diff: MapDiff) -> None:
+    old_keys = [_def_key(def_file) for def_file in old.def_objects]
+    new_keys = [_def_key(def_file) for def_file in new.def_objects]
+
+    # (coordinates, def content) -> indices of the objects, several objects may share a tile
+    old_index: dict[tuple, collections.deque] = collections.defaultdict(collections.deque)
+    for index, map_object in enumerate(old.objects):
+        key = (tuple(map_object.coordinates), old_keys[map_object.object_number])
+        old_index[key].append(index)
+
+    for new_number, new_object in enumerate(new.objects):
+        def_key = new_keys[new_object.object_number]
+        candidates = old_index.get((tuple(new_object.coordinates), def_key))
+        if not candidates:
+            map_diff.objects_added.append(_object_change(new_object, def_key[0], None, new_number))
+            continue
+
+        old_number = candidates.popleft()
+        old_object = old.objects[old_number]
+        changes = []
+        if type(old_object) is type(new_object):
+            for name in type(new_object).model_fields:
+                # the def index, defs are already matched by their content
+                if name != 'object_number':
+                    compare_values(
+                        name, getattr(old_object, name), getattr(new_object, name), changes
+                    )
+        else:
+            changes.append(FieldChange('object', old_object, new_object))
+        if changes:
+            modified = _object_change(new_object, def_key[0], old_number, new_number)
+            modified.changes = changes
+            map_diff.objects_modified.append(modified)
+
+    for (_, def_key), indices in old_index.items():
+        for old_number in indices:
+            map_diff.objects_removed.append(
+                _object_change(old.objects[old_number], def_key[0], old_number, None)
+            )
+    map_diff.objects_removed.sort(key=lambda change: change.old_index)
+
+    old_defs, new_defs = collections.Counter(old_keys), collections.Counter(new_keys)
+    map_diff.defs_added = [key[0] for key in (new_defs - old_defs).elements()]
+    map_diff.defs_removed = [key[0] for key in (old_defs - new_defs).elements()]
+
+
+def diff(old: GameMapStructure, new: GameMapStructure) -> MapDiff:
+    map_diff = MapDiff()
+    for name in GameMapStructure.model_fields:
+        if name not in _STRUCTURED_FIELDS:
+            compare_values(name, getattr(old, name), getattr(new, name), map_diff.fields)
+
+    for level in ('surface', 'underground'):
+        terrain_change = _diff_terrain_level(
+            level,
+            getattr(old.terrain, level),
+            getattr(new.terrain, level),
+            new.header.width,
+        )
+        if terrain_change is not None:
+            map_diff.terrain.append(terrain_change)
+
+    _diff_objects(old, new, map_diff)
+    _compare_sequences('events', old.events, new.events, map_diff.events)
+    _compare_sequences('rumors', old.rumors, new.rumors, map_diff.rumors)
+    return map_diff
+
+
+def load_structure(path: str | pathlib.Path) -> GameMapStructure:
+    path = pathlib.Path(path)
+    if path.suffix.lower() == '.json':
+        return GameMapStructure.model_validate_json(path.read_text(encoding='utf-8'))
+    return MapParser(path).get_structured_data()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Structural diff of two maps')
+    parser.add_argument('old', type=pathlib.Path)
+    parser.add_argument('new', type=pathlib.Path)
+    parser.add_argument('--output', type=pathlib.Path, help='write the JSON diff to this file')
+    args = parser.parse_args(argv)
+
+    map_diff = diff(load_structure(args.old), load_structure(args.new))
+    if args.output:
+        args.output.write_text(
+            json.dumps(map_diff.as_dict(), indent=2, ensure_ascii=False), encoding='utf-8'
+        )
+    else:
+        sys.stdout.write(''.join(f'{line}\n' for line in map_diff.summary()))
+    return 1 if map_diff else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Incremental saving of edited maps for editor-style tools.
+
+Only modified objects and sections are serialized again and spliced into the original
+decompressed map, everything else is copied byte for byte, so saving one edit does not
+re-write the whole map:
+
+    editable = EditableMap.open('map.h3m')
+    objects = editable.structure.objects
+    objects[42] = objects[42].model_copy(update={'quantity': 10})
+    objects[7].message = 'Hello'  # changed in place: has to be marked
+    editable.mark_dirty(7)
+    editable.save('edited.h3m')
+
+Replaced objects are found by identity. Objects changed in place are marked with
+`mark_dirty`, other sections with `mark_section_dirty`. Adding or removing objects falls
+back to a full `MapWriter.write()`.
+"""
+
+import bisect
+import gzip
+import itertools
+import pathlib
+
+from map_processors import tracing
+from map_processors.base import MapParser
+from map_processors.constants import MAP_SECTIONS
+from map_processors.layout import ByteRange, MapLayout, digest
+from map_processors.schemas import GameMapStructure
+from map_processors.writer import MapWriter
+
+
+class EditableMap:
+    def __init__(
+        self,
+        structure: GameMapStructure,
+        binary: bytes,
+        layout: MapLayout,
+        encoding: str,
+        fallback_encoding: str | None = 'cp1251',
+    ) -> None:
+        """`binary` is the decompressed map `structure` was parsed from with its `layout`."""
+        self.structure = structure
+        self.encoding = encoding
+        self.fallback_encoding = fallback_encoding
+        self.binary = binary
+        self.layout = layout
+        # objects as of the last save, replaced ones are found by identity
+        self._saved_objects = list(structure.objects)
+        self._dirty_objects: set[int] = set()
+        self._dirty_sections: set[str] = set()
+
+    @classmethod
+    def open(
+        cls,
+        filename: str | pathlib.Path,
+        encoding: str | None = None,
+        fallback_encoding: str | None = 'cp1251',
+    ) -> 'EditableMap':
+        parser = MapParser(filename, encoding, fallback_encoding, record_layout=True)
+        structure = parser.get_structured_data()
+        return cls(structure, parser.map_binary, parser.layout, parser.encoding, fallback_encoding)
+
+    def mark_dirty(self, index: int) -> None:
+        """Object `index` was changed in place."""
+        if not 0 <= index < len(self.structure.objects):
+            raise ValueError(f'No object {index}, the map has {len(self.structure.objects)}')
+        self._dirty_objects.add(index)
+
+    def mark_section_dirty(self, section: str) -> None:
+        """Section `section` of `MAP_SECTIONS` (any field it is written from) was changed."""
+        if section not in MAP_SECTIONS:
+            raise ValueError(f'Unknown section: {section}')
+        self._dirty_sections.add(section)
+
+    def dirty_objects(self) -> list[int]:
+        """Indexes of the objects serialized again by the next save."""
+        replaced = (
+            index
+            for index, (current, saved) in enumerate(
+                zip(self.structure.objects, self._saved_objects)
+            )
+            if current is not saved
+        )
+        return sorted(self._dirty_objects.union(replaced))
+
+    def to_bytes(self) -> bytes:
+        """The decompressed edited map, it becomes the base of the next save."""
+        with tracing.span('save', 'map'):
+            if len(self.structure.objects) != len(self._saved_objects) or (
+                'objects' in self._dirty_sections
+            ):
+                writer = MapWriter(
+                    self.structure,
+                    encoding=self.encoding,
+                    fallback_encoding=self.fallback_encoding,
+                    record_layout=True,
+                )
+                self.binary, self.layout = writer.write(), writer.layout
+            else:
+                self._splice()
+        self._saved_objects = list(self.structure.objects)
+        self._dirty_objects.clear()
+        self._dirty_sections.clear()
+        return self.binary
+
+    def save(self, filename: str | pathlib.Path, compresslevel: int = 9) -> None:
+        data = self.to_bytes()
+        with tracing.span('gzip', 'stage'), gzip.open(filename, 'wb', compresslevel) as f:
+            f.write(data)
+
+    def _splice(self) -> None:
+        writer = MapWriter(
+            self.structure, encoding=self.encoding, fallback_encoding=self.fallback_encoding
+        )
+        # (byte range, its new bytes), ranges never overlap: objects is never spliced whole
+        replacements = [
+            (self.layout.sections[section], writer.section_bytes(section))
+            for section in self._dirty_sections
+        ]
+        replacements.extend(
+            (self.layout.objects[index], writer.object_bytes(self.structure.objects[index]))
+            for index in self.dirty_objects()
+        )
+        if not replacements:
+            return
+        replacements.sort(key=lambda replacement: replacement[0].start)
+
+        view = memoryview(self.binary)
+        parts, position = [], 0
+        for byte_range, data in replacements:
+            parts.append(view[position : byte_range.start])
+            parts.append(data)
+            position = byte_range.end
+        parts.append(view[position:])
+        binary = b''.join(parts)
+        view.release()
+
+        _shift_layout(self.layout, replacements)
+        self.layout.size = len(binary)
+        self.binary = binary
+
+
+def _shift_layout(layout: MapLayout, replacements: list[tuple[ByteRange, bytes]]) -> None:
+    """Move the ranges of `layout` by the size changes of the sorted `replacements`."""
+    starts = [byte_range.start for byte_range, _ in replacements]
+    ends = [byte_range.end for byte_range, _ in replacements]
+    shifts = list(
+        itertools.accumulate(len(data) - byte_range.size for byte_range, data in replacements)
+    )
+    replaced = {id(byte_range): data for byte_range, data in replacements}
+
+    def move(offset: int) -> int:
+        # by the replacements ending at or before the offset
+        index = bisect.bisect_right(ends, offset)
+        return offset + (shifts[index - 1] if index else 0)
+
+    def shift(byte_range: ByteRange) -> None:
+        byte_range.start, byte_range.end = move(byte_range.start), move(byte_range.end)
+        if id(byte_range) in replaced:
+            byte_range.digest = digest(replaced[id(byte_range)])
+
+    for byte_range in layout.sections.values():
+        if byte_range.end <= starts[0]:
+            continue
+        if id(byte_range) not in replaced and any(
+            byte_range.start <= start < byte_range.end for start in starts
+        ):
+            # bytes inside changed (objects around a dirty object), not hashed again
+            byte_range.digest = ''
+        shift(byte_range)
+    # the object spans are sorted, the ones before the first replacement stay where they are
+    first = bisect.bisect_left(layout.objects, starts[0], key=lambda span: span.start)
+    for byte_range in layout.objects[first:]:
+        shift(byte_range)
@@ -9,8 +9,6 @@ Supported encodings (detected via chardet):
 - Any other encoding chardet detects with high confidence
 """
 
-import chardet
-
 ENCODING_ALIASES: dict[str, str] = {
     'MacCyrillic': 'cp1251',
 }
@@ -42,6 +40,9 @@ def detect_encoding(unknown_bytes: bytes, *, confidence_threshold: float) -> str
     if not unknown_bytes:
         return None
 
+    # imported on first use, callers passing an explicit encoding never need it
+    import chardet
+
     result = chardet.detect(unknown_bytes, prefer_superset=True)
     detected_encoding: str | None = result['encoding']
     confidence: float = result['confidence']
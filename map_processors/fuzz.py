@@ -0,0 +1,325 @@
+"""
+Coverage-guided mutation fuzzing of `MapParser` and `MapWriter`.
+
+Seed maps (files and seeded synthetic maps) are mutated at the decompressed-byte level,
+parsed with `get_structured_data` under `ParseLimits` and written back. Inputs reaching
+lines of `map_processors` no input reached before join the queue of inputs to mutate.
+Findings are saved as gzipped maps, so `MapParser(path)` reproduces them, and described
+in `findings.jsonl` of the corpus directory:
+
+    crashes/  any exception but `H3MapParserException`, the first input per signature
+    hangs/    inputs running out of the `--timeout` budget
+    slow/     inputs taking over `--slow-factor` times the median time of their seed
+    queue/    inputs that reached new lines, loaded again as seeds by the next run
+
+Only local resources are used. Mutations are drawn from one generator seeded with
+`--seed`, so a run is reproducible (slow inputs aside, being measured).
+
+Usage:
+    python -m map_processors.fuzz CORPUS_DIR [MAP ...] [--synthetic 2]
+        [--iterations 1000] [--seed 0] [--slow-factor 10] [--timeout 5]
+"""
+
+import argparse
+import dataclasses
+import gzip
+import hashlib
+import json
+import logging
+import pathlib
+import random
+import statistics
+import struct
+import sys
+import time
+import traceback
+
+from map_processors.base import MapParser
+from map_processors.exceptions import H3MapParserException
+from map_processors.limits import ParseLimits
+from map_processors.verify import MapVerifier
+from map_processors.writer import MapWriter
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_DIR = str(pathlib.Path(__file__).resolve().parent)
+
+# values overwritten into quantities, lengths, indexes and enums
+INTERESTING_VALUES = (0, 1, 7, 0x7F, 0x80, 0xFF, 0x100, 0x7FFF, 0xFFFF, 0x10000, 0xFFFFFFFF)
+# parse times of a seed measured before slow inputs are told apart
+MIN_TIMING_SAMPLES = 5
+MAX_STACKED_MUTATIONS = 4
+MAX_CHUNK = 64
+# corpus subdirectory of each kind of finding
+FINDING_DIRECTORIES = {'crash': 'crashes', 'hang': 'hangs', 'slow': 'slow'}
+
+
+@dataclasses.dataclass
+class Finding:
+    # 'crash', 'hang' or 'slow'
+    kind: str
+    iteration: int
+    # the mutations applied to the parent input
+    mutation: str
+    message: str
+    seconds: float
+    path: str
+
+
+@dataclasses.dataclass
+class FuzzStats:
+    iterations: int = 0
+    # parsed and written back
+    passed: int = 0
+    # refused by the parser with `H3MapParserException`
+    rejected: int = 0
+    crashes: int = 0
+    hangs: int = 0
+    slow: int = 0
+    # lines of `map_processors` reached so far
+    lines: int = 0
+    queue: int = 0
+    seconds: float = 0.0
+
+
+@dataclasses.dataclass
+class _Input:
+    data: bytes
+    # index of the seed the input descends from, parse times are compared per seed
+    origin: int
+    # (start, end) of the objects section, most mutations go into object bodies
+    objects: tuple[int, int] | None
+
+
+class LineCoverage:
+    """Lines of `map_processors` executed, through `sys.monitoring` line events."""
+
+    TOOL = sys.monitoring.COVERAGE_ID
+
+    def __init__(self) -> None:
+        self.lines: set[tuple[str, int]] = set()
+
+    def __enter__(self) -> 'LineCoverage':
+        monitoring = sys.monitoring
+        monitoring.use_tool_id(self.TOOL, 'map_processors.fuzz')
+        monitoring.register_callback(self.TOOL, monitoring.events.LINE, self._line)
+        # lines disabled by a previous run report again
+        monitoring.restart_events()
+        monitoring.set_events(self.TOOL, monitoring.events.LINE)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        sys.monitoring.set_events(self.TOOL, 0)
+        sys.monitoring.register_callback(self.TOOL, sys.monitoring.events.LINE, None)
+        sys.monitoring.free_tool_id(self.TOOL)
+
+    def _line(self, code, line: int):
+        if code.co_filename.startswith(PACKAGE_DIR):
+            self.lines.add((code.co_filename, line))
+        # every line reports once, a reached line costs nothing afterwards
+        return sys.monitoring.DISABLE
+
+
+class Fuzzer:
+    def __init__(
+        self,
+        corpus: str | pathlib.Path,
+        seeds: list[bytes],
+        seed: int = 0,
+        slow_factor: float = 10.0,
+        timeout: float = 5.0,
+    ) -> None:
+        """`seeds` are decompressed maps, the queue saved in `corpus` is added to them."""
+        self.corpus = pathlib.Path(corpus)
+        self.rng = random.Random(seed)
+        self.slow_factor = slow_factor
+        self.limits = ParseLimits(max_seconds=timeout)
+        self.stats = FuzzStats()
+        self.findings: list[Finding] = []
+        self.queue: list[_Input] = []
+        self._signatures: set[str] = set()
+        self._timings: dict[int, list[float]] = {}
+
+        saved = sorted((self.corpus / 'queue').glob('*.h3m'))
+        for origin, data in enumerate([*seeds, *(gzip.decompress(p.read_bytes()) for p in saved)]):
+            self.queue.append(_Input(data, origin, _objects_span(data)))
+        if not self.queue:
+            raise ValueError('At least one seed map is needed')
+
+    def run(self, iterations: int) -> FuzzStats:
+        start = time.perf_counter()
+        with LineCoverage() as coverage:
+            # the seeds go first: their lines are not new, their times are the baseline
+            for entry in list(self.queue):
+                kind, seconds, message = self._execute(entry.data, entry.origin)
+                if kind is not None:
+                    self._record(kind, entry.data, 'seed', message, seconds)
+            for _ in range(iterations):
+                self.stats.iterations += 1
+                parent = self.rng.choice(self.queue)
+                data, mutation = self.mutate(parent)
+                reached = len(coverage.lines)
+                kind, seconds, message = self._execute(data, parent.origin)
+                if kind is not None:
+                    self._record(kind, data, mutation, message, seconds)
+                if len(coverage.lines) > reached:
+                    self.queue.append(_Input(data, parent.origin, _objects_span(data)))
+                    self._save('queue', data, f'{self.stats.iterations:06d}')
+                if self.stats.iterations % 100 == 0:
+                    self._update_stats(coverage, start)
+                    logger.info('%s', self.stats)
+        self._update_stats(coverage, start)
+        return self.stats
+
+    def _update_stats(self, coverage: LineCoverage, start: float) -> None:
+        self.stats.lines = len(coverage.lines)
+        self.stats.queue = len(self.queue)
+        self.stats.seconds = time.perf_counter() - start
+
+    def mutate(self, parent: _Input) -> tuple[bytes, str]:
+        data = bytearray(parent.data)
+        applied = []
+        for _ in range(self.rng.randint(1, MAX_STACKED_MUTATIONS)):
+            if not data:
+                break
+            if parent.objects is not None and self.rng.random() < 0.5:
+                start, end = parent.objects
+                offset = self.rng.randrange(start, max(start + 1, min(end, len(data))))
+                offset = min(offset, len(data) - 1)
+            else:
+                offset = self.rng.randrange(len(data))
+            applied.append(self._mutate_at(data, offset))
+        return bytes(data), ', '.join(applied)
+
+    def _mutate_at(self, data: bytearray, offset: int) -> str:
+        operation = self.rng.randrange(6)
+        if operation == 0:
+            bit = self.rng.randrange(8)
+            data[offset] ^= 1 << bit
+            return f'flip bit {bit} at {offset}'
+        if operation == 1:
+            data[offset] = self.rng.randrange(256)
+            return f'set byte {data[offset]} at {offset}'
+        if operation == 2:
+            value = self.rng.choice(INTERESTING_VALUES)
+            size = self.rng.choice((1, 2, 4))
+            packed = struct.pack('<I', value & 0xFFFFFFFF)[:size]
+            data[offset : offset + size] = packed
+            return f'set uint{size * 8} {value & ((1 << size * 8) - 1)} at {offset}'
+        length = self.rng.randint(1, MAX_CHUNK)
+        if operation == 3:
+            del data[offset : offset + length]
+            return f'delete {length} bytes at {offset}'
+        if operation == 4:
+            source = self.rng.randrange(len(data))
+            data[offset:offset] = data[source : source + length]
+            return f'insert {length} bytes from {source} at {offset}'
+        del data[offset:]
+        return f'truncate at {offset}'
+
+    def _execute(self, data: bytes, origin: int) -> tuple[str | None, float, str]:
+        """Parse and write `data`, the kind of finding (None for none), seconds and error."""
+        start = time.perf_counter()
+        try:
+            parser = MapParser.from_bytes(data, '<fuzz>', limits=self.limits)
+            structure = parser.get_structured_data()
+            MapWriter(structure, encoding=parser.encoding).write()
+        except H3MapParserException as e:
+            seconds = time.perf_counter() - start
+            if seconds >= self.limits.max_seconds:
+                self.stats.hangs += 1
+                return 'hang', seconds, str(e)
+            self.stats.rejected += 1
+            return None, seconds, str(e)
+        except Exception as e:
+            seconds = time.perf_counter() - start
+            signature = _signature(e)
+            if signature in self._signatures:
+                return None, seconds, signature
+            self._signatures.add(signature)
+            self.stats.crashes += 1
+            return 'crash', seconds, f'{signature}: {e}'
+
+        seconds = time.perf_counter() - start
+        self.stats.passed += 1
+        timings = self._timings.setdefault(origin, [])
+        timings.append(seconds)
+        if len(timings) > MIN_TIMING_SAMPLES and seconds > self.slow_factor * statistics.median(
+            timings
+        ):
+            self.stats.slow += 1
+            return 'slow', seconds, f'{seconds / statistics.median(timings):.1f}x the median'
+        return None, seconds, ''
+
+    def _record(self, kind: str, data: bytes, mutation: str, message: str, seconds: float):
+        path = self._save(FINDING_DIRECTORIES[kind], data, f'{self.stats.iterations:06d}')
+        finding = Finding(kind, self.stats.iterations, mutation, message, seconds, str(path))
+        self.findings.append(finding)
+        logger.warning('%s at iteration %s: %s', kind, finding.iteration, message)
+        with open(self.corpus / 'findings.jsonl', 'a') as f:
+            f.write(json.dumps(dataclasses.asdict(finding)) + '\n')
+
+    def _save(self, directory: str, data: bytes, name: str) -> pathlib.Path:
+        path = self.corpus / directory / f'{name}-{hashlib.sha1(data).hexdigest()[:12]}.h3m'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # mtime=0: the same input always makes the same file
+        path.write_bytes(gzip.compress(data, mtime=0))
+        return path
+
+
+def _objects_span(data: bytes) -> tuple[int, int] | None:
+    return MapVerifier(data).verify().sections.get('objects')
+
+
+def _signature(error: Exception) -> str:
+    """Exception type and the innermost line of `map_processors` raising it."""
+    frames = traceback.extract_tb(error.__traceback__)
+    ours = [frame for frame in frames if frame.filename.startswith(PACKAGE_DIR)]
+    frame = (ours or frames)[-1]
+    return f'{type(error).__name__} at {pathlib.Path(frame.filename).name}:{frame.lineno}'
+
+
+def synthetic_seeds(quantity: int, seed: int = 0) -> list[bytes]:
+    """Small synthetic maps covering every object class the generator builds."""
+    from map_processors.synthetic import SyntheticMapGenerator
+
+    seeds = []
+    for index in range(quantity):
+        generator = SyntheticMapGenerator(
+            size=36, has_underground=bool(index % 2), objects_quantity=200, seed=seed + index
+        )
+        seeds.append(MapWriter(generator.generate(), encoding=generator.encoding).write())
+    return seeds
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Fuzz the map parser and writer')
+    parser.add_argument('corpus', type=pathlib.Path, help='directory for findings and queue')
+    parser.add_argument('maps', nargs='*', type=pathlib.Path, help='seed maps')
+    parser.add_argument('--synthetic', type=int, default=2, help='synthetic seed maps')
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--slow-factor', type=float, default=10.0)
+    parser.add_argument('--timeout', type=float, default=5.0, help='seconds per input')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    # mutated strings and sections fail all the time, findings are logged on their own
+    logging.getLogger('map_processors.base').setLevel(logging.CRITICAL)
+
+    seeds = [gzip.open(path).read() for path in args.maps]
+    seeds.extend(synthetic_seeds(args.synthetic, args.seed))
+    fuzzer = Fuzzer(
+        args.corpus,
+        seeds,
+        seed=args.seed,
+        slow_factor=args.slow_factor,
+        timeout=args.timeout,
+    )
+    stats = fuzzer.run(args.iterations)
+    logger.info('%s', stats)
+    return 1 if fuzzer.findings else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
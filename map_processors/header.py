@@ -0,0 +1,129 @@
+"""
+Header-only reading of maps, decompressing just the start of the gzip stream.
+
+`MapParser.map_binary` inflates the whole file before the first byte is read, while the
+header, players and victory/loss conditions live in the first few hundred bytes.
+`MapHeaderParser` reads from a `PartialGzipBuffer` instead, which inflates the stream
+chunk by chunk as the readers index past what is decompressed so far:
+
+    info = read_map_header('6424.h3m', conditions=True)
+    info['map_name'], info['size'], info['victory']['special_victory_condition']
+
+Meant for catalogs of thousands of maps, see `map_processors.catalog`.
+"""
+
+import collections
+import gzip
+import pathlib
+import zlib
+from functools import cached_property
+from typing import BinaryIO
+
+from map_processors import tracing
+from map_processors.base import MapParser
+from map_processors.constants import MAP_SECTIONS
+
+# sections read with `conditions=True`, everything up to the hero/artifact tables
+CONDITION_SECTIONS = MAP_SECTIONS[1 : MAP_SECTIONS.index('teams') + 1]
+
+
+class PartialGzipBuffer:
+    """Read-only bytes-like view of a gzip file that is decompressed on demand."""
+
+    def __init__(self, file: BinaryIO, chunk_size: int = 1024) -> None:
+        self._file = file
+        self._chunk_size = chunk_size
+        # 16 + MAX_WBITS: gzip header and trailer, like gzip.open
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._data = bytearray()
+        self._finished = False
+        self.compressed_read = 0
+
+    @property
+    def decompressed(self) -> int:
+        return len(self._data)
+
+    def _fill(self, size: int | None) -> None:
+        while not self._finished and (size is None or len(self._data) < size):
+            chunk = self._file.read(self._chunk_size)
+            self.compressed_read += len(chunk)
+            if not chunk:
+                self._finished = True
+                if self.compressed_read:
+                    # same as gzip.open on a truncated file
+                    raise EOFError(
+                        'Compressed file ended before the end-of-stream marker was reached'
+                    )
+                break
+            try:
+                self._data += self._decompressor.decompress(chunk)
+            except zlib.error as e:
+                # callers see the exceptions of the `gzip.open` read path
+                self._finished = True
+                raise gzip.BadGzipFile(str(e)) from e
+            if self._decompressor.eof:
+                self._finished = True
+
+    def __getitem__(self, key: int | slice) -> int | bytes:
+        if isinstance(key, slice):
+            if key.stop is None or key.stop < 0 or (key.start or 0) < 0:
+                self._fill(None)
+            else:
+                self._fill(key.stop)
+            return bytes(self._data[key])
+        self._fill(None if key < 0 else key + 1)
+        return self._data[key]
+
+    def __len__(self) -> int:
+        self._fill(None)
+        return len(self._data)
+
+    def __bytes__(self) -> bytes:
+        self._fill(None)
+        return bytes(self._data)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class MapHeaderParser(MapParser):
+    def __init__(self, *args, chunk_size: int = 1024, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.chunk_size = chunk_size
+
+    @cached_property
+    def map_binary(self) -> PartialGzipBuffer:
+        return PartialGzipBuffer(open(self.filename, 'rb'), chunk_size=self.chunk_size)
+
+    def read_map_header(self, conditions: bool = False) -> dict:
+        """
+        `map_stats()` of the map, with `conditions` also the raw players, victory, loss
+        and teams data. Only the bytes these sections span are decompressed.
+        """
+        self.data = collections.OrderedDict()
+        try:
+            with tracing.span('parse_header', 'map', filename=str(self.filename)):
+                if not self.encoding:
+                    self.detect_encoding_by_header()
+                self._read_section('header')
+                info = self.map_stats()
+                if conditions:
+                    for section in CONDITION_SECTIONS:
+                        self._read_section(section)
+                    info['players'] = self.data['players_attributes']
+                    info['victory'] = self.data['victory']
+                    info['loss'] = self.data['loss']
+                    info['teams'] = self.data['teams']
+        finally:
+            self.map_binary.close()
+        return info
+
+
+def read_map_header(
+    path: str | pathlib.Path,
+    conditions: bool = False,
+    encoding: str | None = None,
+    fallback_encoding: str | None = 'cp1251',
+) -> dict:
+    parser = MapHeaderParser(path, encoding, fallback_encoding)
+    return parser.read_map_header(conditions=conditions)
@@ -0,0 +1,154 @@
+"""
+Flyweight interning of repeated strings, blobs and value objects.
+
+Opt-in with `MapParser(..., intern_values=True)`: every decoded string, base64 blob and
+bit mask goes through `Interner.string`, after validation identical value objects
+(`VALUE_MODELS`) are replaced by one shared instance. Both `GameMapStructure` and compact
+records (`get_compact_data`) are supported.
+
+Shared value models are frozen (`schemas.ValueSchema.freeze`), so they cannot be changed
+in place: assign a `model_copy(update=...)` instead of changing `resources.gold`. Models
+of a parse without interning stay mutable. Compact records are not frozen and must not be
+modified in place either. Pass the same `Interner` to several parsers to share instances
+between maps kept in one process.
+"""
+
+import collections
+import dataclasses
+import sys
+from typing import Any
+
+from pydantic import BaseModel
+
+from map_processors.compact import CompactModel
+from map_processors.schemas import (
+    Ability,
+    Creature,
+    Guard,
+    PredefinedHeroNonConfigured,
+    PrimarySkills,
+    Resources,
+    TerrainTile,
+    ValueSchema,
+)
+
+# models made of scalars only, frozen once shared
+VALUE_MODELS = (
+    Resources,
+    PrimarySkills,
+    Creature,
+    Guard,
+    Ability,
+    TerrainTile,
+    PredefinedHeroNonConfigured,
+)
+
+
+@dataclasses.dataclass
+class InternStats:
+    seen: int = 0
+    unique: int = 0
+    # estimated size of the instances replaced by a shared one
+    bytes_saved: int = 0
+
+
+def _size(value: Any) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, BaseModel):
+        size += sys.getsizeof(value.__dict__) + sys.getsizeof(value.__pydantic_fields_set__)
+    return size
+
+
+_CONTAINERS = (BaseModel, CompactModel, list, dict)
+
+
+class Interner:
+    def __init__(self, value_models: tuple[type[BaseModel], ...] = VALUE_MODELS) -> None:
+        self.value_models = value_models
+        self._strings: dict[str, str] = {}
+        self._values: dict[tuple, Any] = {}
+        # type -> whether its instances are value objects
+        self._value_types: dict[type, bool] = {}
+        # instances of one model have the same size, measured once per type
+        self._sizes: dict[type, int] = {}
+        self.stats: dict[str, InternStats] = collections.defaultdict(InternStats)
+
+    def string(self, value: str) -> str:
+        stats = self.stats['str']
+        stats.seen += 1
+        shared = self._strings.get(value)
+        if shared is None:
+            self._strings[value] = value
+            stats.unique += 1
+            return value
+        if shared is not value:
+            stats.bytes_saved += sys.getsizeof(value)
+        return shared
+
+    def _is_value(self, value_type: type) -> bool:
+        is_value = self._value_types.get(value_type)
+        if is_value is None:
+            model = getattr(value_type, '__model__', value_type)
+            is_value = self._value_types[value_type] = model in self.value_models
+        return is_value
+
+    def _value(self, value: Any) -> Any:
+        value_type = type(value)
+        if isinstance(value, CompactModel):
+            key = (value_type, *(getattr(value, name) for name in value.__slots__))
+        else:
+            key = (value_type, *value.__dict__.values())
+        stats = self.stats[getattr(value_type, '__model__', value_type).__name__]
+        stats.seen += 1
+        shared = self._values.get(key)
+        if shared is None:
+            if isinstance(value, ValueSchema):
+                value.freeze()
+            self._values[key] = value
+            stats.unique += 1
+            return value
+        if shared is not value:
+            size = self._sizes.get(value_type)
+            if size is None:
+                size = self._sizes[value_type] = _size(value)
+            stats.bytes_saved += size
+        return shared
+
+    def _intern_item(self, item: Any) -> Any:
+        if self._is_value(type(item)):
+            return self._value(item)
+        self.intern_values(item)
+        return item
+
+    def intern_values(self, value: Any) -> None:
+        """Replace value objects nested in `value` (a model, record, list or dict) in place."""
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                if isinstance(item, _CONTAINERS):
+                    value[index] = self._intern_item(item)
+        elif isinstance(value, CompactModel):
+            for name in value.__slots__:
+                item = getattr(value, name)
+                if isinstance(item, _CONTAINERS):
+                    setattr(value, name, self._intern_item(item))
+        elif isinstance(value, BaseModel | dict):
+            # models: bypass pydantic __setattr__, the field keeps its validated type
+            attributes = value.__dict__ if isinstance(value, BaseModel) else value
+            for name, item in attributes.items():
+                if isinstance(item, _CONTAINERS):
+                    attributes[name] = self._intern_item(item)
+
+    @property
+    def bytes_saved(self) -> int:
+        return sum(stats.bytes_saved for stats in self.stats.values())
+
+    def report(self) -> list[str]:
+        lines = [
+            f'{name:<28} {stats.seen:>8} seen {stats.unique:>8} unique '
+            f'{stats.bytes_saved / 1024:>10.1f} KiB saved'
+            for name, stats in sorted(
+                self.stats.items(), key=lambda item: item[1].bytes_saved, reverse=True
+            )
+        ]
+        lines.append(f'{"total":<28} {self.bytes_saved / 1024:>46.1f} KiB saved')
+        return lines
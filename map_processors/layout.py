@@ -0,0 +1,56 @@
+"""
+Opt-in byte layout of the decompressed map binary for `MapParser` and `MapWriter`.
+
+Enabled with `record_layout=True`: every section of `MAP_SECTIONS` and every object of
+the objects section gets its [start, end) offset range and a short digest of its bytes.
+The layouts of an original map and of its re-written copy are compared by
+`map_processors.roundtrip`.
+"""
+
+import dataclasses
+import hashlib
+
+
+def digest(data: bytes | memoryview) -> str:
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+@dataclasses.dataclass
+class ByteRange:
+    start: int
+    end: int
+    digest: str = ''
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+
+@dataclasses.dataclass
+class MapLayout:
+    sections: dict[str, ByteRange] = dataclasses.field(default_factory=dict)
+    objects: list[ByteRange] = dataclasses.field(default_factory=list)
+    size: int = 0
+
+    def add_section(self, name: str, start: int, end: int) -> None:
+        self.sections[name] = ByteRange(start, end)
+
+    def add_object(self, start: int, end: int) -> None:
+        self.objects.append(ByteRange(start, end))
+
+    def compute_digests(self, binary: bytes) -> None:
+        view = memoryview(binary)
+        for byte_range in (*self.sections.values(), *self.objects):
+            byte_range.digest = digest(view[byte_range.start : byte_range.end])
+        self.size = len(binary)
+
+    def as_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MapLayout':
+        return cls(
+            sections={name: ByteRange(**value) for name, value in data['sections'].items()},
+            objects=[ByteRange(**value) for value in data['objects']],
+            size=data['size'],
+        )
@@ -0,0 +1,52 @@
+"""
+Opt-in resource limits for parsing untrusted maps.
+
+Enabled with `MapParser(..., limits=ParseLimits())`; without limits the length fields of
+a map are trusted. A crafted map claiming a huge string, a billion objects or inflating
+to gigabytes is rejected with `H3MapParserException` before the allocation or the loop
+it asks for:
+
+    parser = MapParser(upload, limits=ParseLimits(max_seconds=2.0))
+    try:
+        structure = parser.get_structured_data()
+    except H3MapParserException as e:
+        ...
+
+Quantities are also checked against the bytes left in the map, by the smallest size an
+entry can take.
+"""
+
+import dataclasses
+
+from map_processors.verify import (
+    DEF_MIN_SIZE,
+    EVENT_MIN_SIZE,
+    OBJECT_MIN_SIZE,
+    RUMOR_MIN_SIZE,
+    TOWN_EVENT_MIN_SIZE,
+)
+
+# smallest size of an entry of each limited quantity, by `ParseLimits` field
+MIN_ENTRY_SIZES = {
+    'max_rumors': RUMOR_MIN_SIZE,
+    'max_defs': DEF_MIN_SIZE,
+    'max_objects': OBJECT_MIN_SIZE,
+    'max_events': EVENT_MIN_SIZE,
+    'max_town_events': TOWN_EVENT_MIN_SIZE,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class ParseLimits:
+    # defaults are well above the largest maps the game and the editor produce
+    max_string_length: int = 1 << 16
+    max_rumors: int = 1_000
+    max_defs: int = 10_000
+    # 256x256 with underground, one object per tile
+    max_objects: int = 131_072
+    max_events: int = 1_000
+    max_town_events: int = 1_000
+    # gzip bomb guard, the largest maps inflate to a few megabytes
+    max_decompressed_size: int = 64 << 20
+    # wall clock budget from the first byte of the header, None for no budget
+    max_seconds: float | None = 10.0
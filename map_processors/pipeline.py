@@ -0,0 +1,229 @@
+"""
+Overlapped read -> parse -> transform -> write pipeline for batch jobs over map packs.
+
+I/O-bound stages run in threads (file reads, gzip, file writes; zlib releases the GIL),
+the CPU-bound ones (encoding detection, parsing, the transform, serialization) in a
+process pool. Stages are linked by bounded queues, so at most `queue_size` maps are in
+memory per stage while every core stays busy:
+
+    pipeline = MapPipeline(transform=StructureTranslator(), workers=8)
+    results = pipeline.run([('maps/a.h3m', 'out/a.h3m'), ...])
+
+A transform is a picklable callable `(structure, source path, encoding) -> structure`,
+e.g. `translations.StructureTranslator`. It is sent to every worker process once.
+
+Usage:
+    python -m map_processors.pipeline OUTPUT_DIR MAP_OR_DIR [...] [--workers N]
+        [--translate] [--translations FILE] [--output-encoding ENCODING]
+"""
+
+import argparse
+import concurrent.futures
+import dataclasses
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import pathlib
+import queue
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+from map_processors.base import MapParser
+from map_processors.exceptions import H3MapParserException, H3MapWriterException
+from map_processors.writer import MapWriter
+
+logger = logging.getLogger(__name__)
+
+# end of a queue
+_DONE = object()
+
+# state of a worker process, set once by the pool initializer
+_worker_transform: Callable | None = None
+_worker_output_encoding: str | None = None
+
+
+@dataclasses.dataclass
+class PipelineResult:
+    source: str
+    destination: str
+    encoding: str | None = None
+    error: str | None = None
+    seconds: float = 0.0
+
+
+def _init_worker(transform: Callable | None, output_encoding: str | None) -> None:
+    global _worker_transform, _worker_output_encoding
+    _worker_transform, _worker_output_encoding = transform, output_encoding
+
+
+def _process(source: str, data: bytes) -> tuple[bytes, str | None]:
+    """Parse, transform and serialize one decompressed map, runs in the workers."""
+    parser = MapParser.from_bytes(data, source, low_memory=True)
+    structure = parser.get_structured_data()
+    if _worker_transform is not None:
+        structure = _worker_transform(structure, source, parser.encoding)
+    writer = MapWriter(structure, encoding=_worker_output_encoding or parser.encoding)
+    return writer.write(), parser.encoding
+
+
+class MapPipeline:
+    def __init__(
+        self,
+        transform: Callable | None = None,
+        workers: int | None = None,
+        io_threads: int = 2,
+        queue_size: int | None = None,
+        output_encoding: str | None = None,
+        compresslevel: int = 9,
+    ) -> None:
+        self.transform = transform
+        self.workers = workers or os.cpu_count()
+        self.io_threads = io_threads
+        # enough maps in flight to keep every worker busy while others are read or written
+        self.queue_size = queue_size or 2 * self.workers
+        self.output_encoding = output_encoding
+        self.compresslevel = compresslevel
+
+    def run(self, jobs: Iterable[tuple[str | pathlib.Path, str | pathlib.Path]]) -> list:
+        """Process (source, destination) pairs, return a `PipelineResult` per job in order."""
+        jobs = [(str(source), str(destination)) for source, destination in jobs]
+        results = [PipelineResult(source, destination) for source, destination in jobs]
+        started = [0.0] * len(jobs)
+
+        pending_jobs = queue.Queue()
+        for index in range(len(jobs)):
+            pending_jobs.put(index)
+        for _ in range(self.io_threads):
+            pending_jobs.put(_DONE)
+        decompressed = queue.Queue(maxsize=self.queue_size)
+        processing = queue.Queue(maxsize=self.queue_size)
+        # set when the main thread fails, loaders take no more jobs
+        stop = threading.Event()
+
+        def load() -> None:
+            while not stop.is_set() and (index := pending_jobs.get()) is not _DONE:
+                started[index] = time.perf_counter()
+                try:
+                    with open(jobs[index][0], 'rb') as f:
+                        data = gzip.decompress(f.read())
+                # anything, see store()
+                except Exception as e:
+                    results[index].error = f'{type(e).__name__}: {e}'
+                    continue
+                decompressed.put((index, data))
+            decompressed.put(_DONE)
+
+        def store() -> None:
+            while (item := processing.get()) is not _DONE:
+                index, future = item
+                result = results[index]
+                try:
+                    data, result.encoding = future.result()
+                    data = gzip.compress(data, compresslevel=self.compresslevel)
+                    pathlib.Path(result.destination).parent.mkdir(parents=True, exist_ok=True)
+                    with open(result.destination, 'wb') as f:
+                        f.write(data)
+                # anything, a store thread that dies would stall the whole pipeline
+                except (H3MapParserException, H3MapWriterException, Exception) as e:
+                    result.error = f'{type(e).__name__}: {e}'
+                result.seconds = time.perf_counter() - started[index]
+
+        loaders = [threading.Thread(target=load) for _ in range(self.io_threads)]
+        storers = [threading.Thread(target=store) for _ in range(self.io_threads)]
+        for thread in loaders + storers:
+            thread.start()
+
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                # the I/O threads are already running, forking them is unsafe
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.transform, self.output_encoding),
+            ) as executor:
+                try:
+                    finished_loaders = 0
+                    while finished_loaders < len(loaders):
+                        item = decompressed.get()
+                        if item is _DONE:
+                            finished_loaders += 1
+                            continue
+                        index, data = item
+                        # blocks while `queue_size` maps are being processed or written
+                        processing.put((index, executor.submit(_process, jobs[index][0], data)))
+                except BaseException:
+                    # queued maps are dropped, storers see their futures cancelled
+                    stop.set()
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+        finally:
+            # loaders blocked on a full queue are released by taking what they put
+            while any(thread.is_alive() for thread in loaders):
+                try:
+                    decompressed.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            for _ in storers:
+                processing.put(_DONE)
+            for thread in loaders + storers:
+                thread.join()
+        return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Re-write (and translate) maps in parallel')
+    parser.add_argument('output', type=pathlib.Path, help='output directory')
+    parser.add_argument('paths', nargs='+', type=pathlib.Path, help='maps or directories')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument(
+        '--translate', action='store_true', help="apply every map's *_translations.json"
+    )
+    parser.add_argument('--translations', type=pathlib.Path, help='shared JSON translations')
+    parser.add_argument('--output-encoding')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    logging.getLogger('map_processors.base').setLevel(logging.CRITICAL)
+
+    transform = None
+    if args.translate or args.translations:
+        from map_processors.translations import StructureTranslator
+
+        translations = None
+        if args.translations:
+            translations = json.loads(args.translations.read_text(encoding='utf-8'))
+        transform = StructureTranslator(translations)
+
+    jobs = []
+    for path in args.paths:
+        if path.is_dir():
+            jobs.extend(
+                (source, args.output / source.relative_to(path))
+                for source in sorted(path.rglob('*.h3m'))
+            )
+        else:
+            jobs.append((path, args.output / path.name))
+
+    start = time.perf_counter()
+    pipeline = MapPipeline(
+        transform=transform, workers=args.workers, output_encoding=args.output_encoding
+    )
+    results = pipeline.run(jobs)
+    failed = [result for result in results if result.error]
+    for result in failed:
+        logger.error('%s: %s', result.source, result.error)
+    logger.info(
+        'Wrote %d of %d maps in %.1fs',
+        len(results) - len(failed),
+        len(results),
+        time.perf_counter() - start,
+    )
+    return 0 if not failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+H3M -> model -> H3M byte-for-byte verification.
+
+Both sides are recorded with `record_layout=True`, so locating a mismatch only compares
+section digests (then object digests inside the objects section) and scans the bytes of
+the single diverging range:
+
+    report = verify_round_trip('6424.h3m')
+    if not report.ok:
+        print(report.divergence)
+
+Usage:
+    python -m map_processors.roundtrip MAP_OR_DIR [...] [--workers N] [--output report.json]
+"""
+
+import argparse
+import concurrent.futures
+import dataclasses
+import json
+import logging
+import os
+import pathlib
+import sys
+import time
+
+from map_processors.base import MapParser
+from map_processors.exceptions import H3MapParserException, H3MapWriterException
+from map_processors.layout import ByteRange, MapLayout
+from map_processors.schemas import GameMapStructure
+from map_processors.writer import MapWriter
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 7
+# bytes of each side shown around the first difference
+CONTEXT_SIZE = 8
+
+
+@dataclasses.dataclass
+class Divergence:
+    section: str
+    # absolute offsets of the first differing byte in the decompressed binaries
+    original_offset: int
+    written_offset: int
+    # offset of the first differing byte from the start of the section
+    section_offset: int
+    object_index: int | None = None
+    # offset of the first differing byte from the start of the object (the "field offset")
+    object_offset: int | None = None
+    object_class: str | None = None
+    coordinates: tuple[int, int, int] | None = None
+    original_bytes: str = ''
+    written_bytes: str = ''
+
+    def __str__(self) -> str:
+        location = f'section {self.section} +{self.section_offset}'
+        if self.object_index is not None:
+            location += f', object #{self.object_index} +{self.object_offset}'
+            if self.object_class is not None:
+                location += f' ({self.object_class} at {self.coordinates})'
+        elif self.coordinates is not None:
+            location += f', tile {self.coordinates}'
+        return (
+            f'{location}: original[{self.original_offset}]={self.original_bytes or "<end>"} '
+            f'written[{self.written_offset}]={self.written_bytes or "<end>"}'
+        )
+
+
+@dataclasses.dataclass
+class RoundTripReport:
+    filename: str
+    encoding: str | None = None
+    original_size: int = 0
+    written_size: int = 0
+    seconds: float = 0.0
+    divergence: Divergence | None = None
+    # parse or write failure, no byte comparison was made
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.divergence is None
+
+
+def first_difference(original: bytes | memoryview, written: bytes | memoryview) -> int:
+    """Index of the first differing byte, or the shorter length if one is a prefix."""
+    original, written = memoryview(original), memoryview(written)
+    common = min(len(original), len(written))
+    if original[:common] == written[:common]:
+        return common
+
+    # slice comparisons run in C, bisect on the length of the equal prefix
+    low, high = 0, common
+    while high - low > 1:
+        middle = (low + high) // 2
+        if original[:middle] == written[:middle]:
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def _context(binary: memoryview, offset: int, end: int) -> str:
+    return bytes(binary[offset : min(offset + CONTEXT_SIZE, end)]).hex(' ')
+
+
+def _divergence_in_range(
+    section: str,
+    original_binary: memoryview,
+    original_range: ByteRange,
+    written_binary: memoryview,
+    written_range: ByteRange,
+    section_start: int | None = None,
+) -> Divergence:
+    offset = first_difference(
+        original_binary[original_range.start : original_range.end],
+        written_binary[written_range.start : written_range.end],
+    )
+    original_offset = original_range.start + offset
+    written_offset = written_range.start + offset
+    if section_start is None:
+        section_start = original_range.start
+    return Divergence(
+        section=section,
+        original_offset=original_offset,
+        written_offset=written_offset,
+        section_offset=original_offset - section_start,
+        original_bytes=_context(original_binary, original_offset, original_range.end),
+        written_bytes=_context(written_binary, written_offset, written_range.end),
+    )
+
+
+def _divergence_in_objects(
+    original: MapLayout,
+    original_binary: memoryview,
+    written: MapLayout,
+    written_binary: memoryview,
+) -> Divergence:
+    original_section = original.sections['objects']
+    written_section = written.sections['objects']
+
+    # objects quantity precedes the first object
+    original_head = ByteRange(
+        original_section.start,
+        original.objects[0].start if original.objects else original_section.end,
+    )
+    written_head = ByteRange(
+        written_section.start,
+        written.objects[0].start if written.objects else written_section.end,
+    )
+    original_quantity = original_binary[original_head.start : original_head.end]
+    if original_quantity != written_binary[written_head.start : written_head.end]:
+        return _divergence_in_range(
+            'objects', original_binary, original_head, written_binary, written_head
+        )
+
+    for index, (original_object, written_object) in enumerate(
+        zip(original.objects, written.objects, strict=False)
+    ):
+        if original_object.digest != written_object.digest:
+            divergence = _divergence_in_range(
+                'objects',
+                original_binary,
+                original_object,
+                written_binary,
+                written_object,
+                original_section.start,
+            )
+            divergence.object_index = index
+            divergence.object_offset = divergence.original_offset - original_object.start
+            return divergence
+
+    # every common object matches, one side has extra bytes after them
+    return _divergence_in_range(
+        'objects', original_binary, original_section, written_binary, written_section
+    )
+
+
+def find_first_divergence(
+    original: MapLayout,
+    original_binary: bytes,
+    written: MapLayout,
+    written_binary: bytes,
+) -> Divergence | None:
+    """
+    Compare two recorded layouts (with digests) and locate the first differing byte.
+
+    Only the digests of the sections are compared, then the digests of the objects if the
+    objects section differs; the binaries are scanned inside one range only.
+    """
+    original_view, written_view = memoryview(original_binary), memoryview(written_binary)
+    for name, original_range in original.sections.items():
+        missing = ByteRange(written.size, written.size)
+        written_range = written.sections.get(name, missing)
+        if original_range.digest == written_range.digest:
+            continue
+        if name == 'objects':
+            return _divergence_in_objects(original, original_view, written, written_view)
+        return _divergence_in_range(
+            name, original_view, original_range, written_view, written_range
+        )
+    return None
+
+
+def _annotate(divergence: Divergence, structure: GameMapStructure) -> None:
+    if divergence.object_index is not None and divergence.object_index < len(structure.objects):
+        map_object = structure.objects[divergence.object_index]
+        divergence.object_class = map_object.object_class
+        divergence.coordinates = tuple(map_object.coordinates)
+    elif divergence.section == 'terrain':
+        size = structure.header.width
+        tile = divergence.section_offset // TILE_SIZE
+        divergence.coordinates = (tile % size, tile // size % size, tile // (size * size))
+
+
+def verify_round_trip(filename: str | pathlib.Path, encoding: str | None = None) -> RoundTripReport:
+    report = RoundTripReport(filename=str(filename))
+    start = time.perf_counter()
+    try:
+        parser = MapParser(filename, encoding=encoding, record_layout=True)
+        structure = parser.get_structured_data()
+        writer = MapWriter(structure, encoding=parser.encoding, record_layout=True)
+        written_binary = writer.write()
+    except (
+        H3MapParserException,
+        H3MapWriterException,
+        OSError,
+        EOFError,
+        ValueError,
+        UnicodeError,
+    ) as e:
+        report.error = f'{type(e).__name__}: {e}'
+        report.seconds = time.perf_counter() - start
+        return report
+
+    report.encoding = parser.encoding
+    report.original_size = len(parser.map_binary)
+    report.written_size = len(written_binary)
+    report.divergence = find_first_divergence(
+        parser.layout, parser.map_binary, writer.layout, written_binary
+    )
+    if report.divergence is not None:
+        _annotate(report.divergence, structure)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def verify_archive(
+    paths: list[str | pathlib.Path], workers: int | None = None
+) -> list[RoundTripReport]:
+    """Verify many maps in worker processes, reports keep the order of `paths`."""
+    if workers == 1 or len(paths) < 2:
+        return [verify_round_trip(path) for path in paths]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(verify_round_trip, paths, chunksize=4))
+
+
+def _collect_maps(paths: list[pathlib.Path]) -> list[pathlib.Path]:
+    maps = []
+    for path in paths:
+        if path.is_dir():
+            maps.extend(sorted(path.rglob('*.h3m')))
+        else:
+            maps.append(path)
+    return maps
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Verify byte-for-byte H3M round trip')
+    parser.add_argument('paths', nargs='+', type=pathlib.Path, help='maps or directories')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--output', type=pathlib.Path, help='write JSON reports to this file')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    logging.getLogger('map_processors.base').setLevel(logging.CRITICAL)
+
+    reports = verify_archive(_collect_maps(args.paths), workers=args.workers)
+    for report in reports:
+        if report.error is not None:
+            logger.error('%s: %s', report.filename, report.error)
+        elif report.divergence is not None:
+            logger.error('%s: %s', report.filename, report.divergence)
+        else:
+            logger.info('%s: ok (%.2fs)', report.filename, report.seconds)
+    failed = sum(1 for report in reports if not report.ok)
+    logger.info('%d maps, %d failed', len(reports), failed)
+
+    if args.output:
+        args.output.write_text(
+            json.dumps([dataclasses.asdict(report) for report in reports], indent=2),
+            encoding='utf-8',
+        )
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
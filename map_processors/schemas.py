@@ -1,8 +1,9 @@
 import json
 import pathlib
+import weakref
 from typing import Annotated, Dict, List, Literal, Optional, Tuple, Union
 
-from pydantic import BaseModel, ConfigDict, Discriminator, Field, Tag, conint
+from pydantic import BaseModel, ConfigDict, Discriminator, Field, Tag, ValidationError, conint
 
 UPPER_LIMIT_1_BYTE = 255
 UPPER_LIMIT_2_BYTES = 65535
@@ -21,11 +22,42 @@ class Translatable:
     pass
 
 
-class Empty(BaseModel):
+class Schema(BaseModel):
+    """Base of every schema: core schemas are built on first validation, not on import."""
+
+    model_config = ConfigDict(defer_build=True)
+
+
+class Empty(Schema):
     model_config = ConfigDict(extra='forbid')
 
 
-class Coordinates(BaseModel):
+# ids of the `ValueSchema` instances frozen with `freeze`
+_frozen_ids: set[int] = set()
+
+
+class ValueSchema(Schema):
+    """
+    Made of scalars only, so equal instances can be shared (`interning`). Instances are
+    mutable until `freeze`, the interner freezes the ones it shares.
+    """
+
+    def freeze(self) -> None:
+        """Make assignments raise like on a frozen model, `model_copy` gives a mutable copy."""
+        if id(self) not in _frozen_ids:
+            _frozen_ids.add(id(self))
+            weakref.finalize(self, _frozen_ids.discard, id(self))
+
+    def __setattr__(self, name: str, value) -> None:
+        if id(self) in _frozen_ids:
+            raise ValidationError.from_exception_data(
+                type(self).__name__,
+                [{'type': 'frozen_instance', 'loc': (name,), 'input': value}],
+            )
+        super().__setattr__(name, value)
+
+
+class Coordinates(Schema):
     x: int
     y: int
     z: int
@@ -35,7 +67,7 @@ class Coordinates(BaseModel):
         return cls(x=coords[0], y=coords[1], z=coords[2])
 
 
-class Resources(BaseModel):
+class Resources(ValueSchema):
     wood: int = 0
     mercury: int = 0
     ore: int = 0
@@ -45,30 +77,30 @@ class Resources(BaseModel):
     gold: int = 0
 
 
-class PrimarySkills(BaseModel):
+class PrimarySkills(ValueSchema):
     attack: int = 0
     defence: int = 0
     power: int = 0
     knowledge: int = 0
 
 
-class Ability(BaseModel):
+class Ability(ValueSchema):
     id: int
     level: int
 
 
-class Creature(BaseModel):
+class Creature(ValueSchema):
     id: int
     quantity: int
 
 
-class Guard(BaseModel):
+class Guard(ValueSchema):
     id: int
     quantity: int
 
 
 # Header Schema
-class Header(BaseModel):
+class Header(Schema):
     map_type: conint(ge=0, le=UPPER_LIMIT_1_BYTE)
     are_any_players: bool
     height: int
@@ -81,12 +113,12 @@ class Header(BaseModel):
 
 
 # Player-related Schemas
-class Hero(BaseModel):
+class Hero(Schema):
     hero_id: int
     hero_name: str
 
 
-class PlayerAttributes(BaseModel):
+class PlayerAttributes(Schema):
     can_human_play: bool
     can_computer_play: bool
     computer_playstyle: Optional[str] = None
@@ -108,7 +140,7 @@ class PlayerAttributes(BaseModel):
 
 
 # Victory and Loss Conditions
-class Victory(BaseModel):
+class Victory(Schema):
     special_victory_condition: int
     standard_win_available: Optional[int] = None
     applies_to_computer: Optional[int] = None
@@ -130,7 +162,7 @@ class Victory(BaseModel):
     unit_unknown: Optional[str] = None
 
 
-class Loss(BaseModel):
+class Loss(Schema):
     special_loss_condition: int
     loss_town_coordinates: Optional[Tuple[int, int, int]] = None
     loss_hero_coordinates: Optional[Tuple[int, int, int]] = None
@@ -138,7 +170,7 @@ class Loss(BaseModel):
 
 
 # Team Configuration
-class Teams(BaseModel):
+class Teams(Schema):
     quantity: int
     red_team_number: int | None = None
     blue_team_number: int | None = None
@@ -151,14 +183,14 @@ class Teams(BaseModel):
 
 
 # Hero Configuration
-class ConfiguredHero(BaseModel):
+class ConfiguredHero(Schema):
     id: int
     portrait: int
     name: Annotated[str, Translatable()]
     players_access: int
 
 
-class PredefinedHero(BaseModel):
+class PredefinedHero(Schema):
     experience: Optional[int] = None
     abilities: Optional[List[Ability]] = None
     artifacts: Optional[Dict[int, int]] = None
@@ -168,18 +200,18 @@ class PredefinedHero(BaseModel):
     primary_skills: Optional[PrimarySkills] = None
 
 
-class PredefinedHeroNonConfigured(Empty):
-    pass
+class PredefinedHeroNonConfigured(ValueSchema):
+    model_config = ConfigDict(extra='forbid')
 
 
 # Rumors
-class Rumor(BaseModel):
+class Rumor(Schema):
     name: Annotated[str, Translatable()]
     text: Annotated[str, Translatable()]
 
 
 # Terrain
-class TerrainTile(BaseModel):
+class TerrainTile(ValueSchema):
     terrain_type: int
     view: int
     river_type: int
@@ -189,13 +221,13 @@ class TerrainTile(BaseModel):
     flip_bits: int
 
 
-class Terrain(BaseModel):
+class Terrain(Schema):
     surface: List[TerrainTile] = []
     underground: List[TerrainTile] = []
 
 
 # Definition Files
-class DefFile(BaseModel):
+class DefFile(Schema):
     sprite_filename: str
     unpassable_tiles: str
     active_tiles: str
@@ -217,7 +249,7 @@ class DefFile(BaseModel):
 
 
 # Main Object Schema
-class MapObject(BaseModel):
+class MapObject(Schema):
     object_class: str
     object_subclass: int
     object_number: int
@@ -302,7 +334,7 @@ class MapMonster(MapObject):
     unknown_tail: Optional[str] = None
 
 
-class Reward(BaseModel):
+class Reward(Schema):
     type: str
     experience: Optional[int] = None
     mana_points: Optional[int] = None
@@ -400,7 +432,7 @@ class MapRandomResource(MessageAndGuards):
     unknown_tail: Optional[str] = None
 
 
-class TownEvent(BaseModel):
+class TownEvent(Schema):
     name: Annotated[str, Translatable()]
     message: Annotated[str, Translatable()]
     resources: Resources = Resources()
@@ -535,7 +567,7 @@ class MapLighthouse(MapObject):
     owner: str
 
 
-class MapTimedEvent(BaseModel):
+class MapTimedEvent(Schema):
     name: Annotated[str, Translatable()]
     message: Annotated[str, Translatable()]
     resources: Resources = Resources()
@@ -644,7 +676,7 @@ def map_object_discriminator(value) -> str:
 
 
 # Main Structure Schema
-class GameMapStructure(BaseModel):
+class GameMapStructure(Schema):
     header: Header
     players_attributes: List[PlayerAttributes] = []
     victory: Victory
@@ -0,0 +1,149 @@
+"""
+Spatial index over map objects.
+
+An object occupies the tiles of its def footprint: the blocked (`unpassable_tiles`) and
+visitable (`active_tiles`) cells of the 8x6 def masks, anchored at the object coordinates
+(its bottom right tile). The index keeps the objects in per-level grid buckets:
+
+    index = SpatialIndex.from_structure(structure)
+    index.at(10, 20, 0)
+    index.within_radius(town.coordinates, 12)
+
+Objects are tracked by identity, after moving an object or changing its def call
+`index.update(map_object)`.
+"""
+
+import functools
+import itertools
+import math
+
+from map_processors.schemas import DefFile, GameMapStructure, MapObject
+
+MASK_WIDTH = 8
+MASK_HEIGHT = 6
+DEFAULT_BUCKET_SIZE = 8
+
+Tile = tuple[int, int, int]
+
+
+@functools.lru_cache(maxsize=4096)
+def footprint_offsets(unpassable_tiles: str, active_tiles: str) -> tuple[tuple[int, int], ...]:
+    """(dx, dy) offsets (both <= 0) of the tiles covered by a def, relative to the object."""
+    offsets = []
+    for row in range(MASK_HEIGHT):
+        for column in range(MASK_WIDTH):
+            bit = row * MASK_WIDTH + column
+            # '0' in the unpassable mask is a blocked tile, '1' in the active mask is visitable
+            if unpassable_tiles[bit] == '0' or active_tiles[bit] == '1':
+                offsets.append((-column, row - MASK_HEIGHT + 1))
+    return tuple(offsets) or ((0, 0),)
+
+
+def object_footprint(map_object: MapObject, def_file: DefFile) -> list[Tile]:
+    x, y, z = map_object.coordinates
+    return [
+        (x + dx, y + dy, z)
+        for dx, dy in footprint_offsets(def_file.unpassable_tiles, def_file.active_tiles)
+        if x + dx >= 0 and y + dy >= 0
+    ]
+
+
+class SpatialIndex:
+    def __init__(self, def_objects: list[DefFile], bucket_size: int = DEFAULT_BUCKET_SIZE) -> None:
+        self.def_objects = def_objects
+        self.bucket_size = bucket_size
+        # (z, bucket x, bucket y) -> ids of objects with a footprint tile in the bucket
+        self._buckets: dict[Tile, set[int]] = {}
+        # object id -> (insertion order, object, footprint)
+        self._entries: dict[int, tuple[int, MapObject, frozenset[Tile]]] = {}
+        self._counter = itertools.count()
+
+    @classmethod
+    def from_structure(
+        cls, structure: GameMapStructure, bucket_size: int = DEFAULT_BUCKET_SIZE
+    ) -> 'SpatialIndex':
+        index = cls(structure.def_objects, bucket_size=bucket_size)
+        for map_object in structure.objects:
+            index.add(map_object)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, map_object: MapObject) -> bool:
+        return id(map_object) in self._entries
+
+    def _bucket(self, x: int, y: int, z: int) -> Tile:
+        return z, x // self.bucket_size, y // self.bucket_size
+
+    def footprint(self, map_object: MapObject) -> frozenset[Tile]:
+        return frozenset(object_footprint(map_object, self.def_objects[map_object.object_number]))
+
+    def add(self, map_object: MapObject) -> None:
+        if id(map_object) in self._entries:
+            raise ValueError(f'{map_object.object_class} at {map_object.coordinates} already added')
+        footprint = self.footprint(map_object)
+        self._entries[id(map_object)] = (next(self._counter), map_object, footprint)
+        for bucket in {self._bucket(*tile) for tile in footprint}:
+            self._buckets.setdefault(bucket, set()).add(id(map_object))
+
+    def remove(self, map_object: MapObject) -> None:
+        _, _, footprint = self._entries.pop(id(map_object))
+        for bucket in {self._bucket(*tile) for tile in footprint}:
+            objects = self._buckets[bucket]
+            objects.discard(id(map_object))
+            if not objects:
+                del self._buckets[bucket]
+
+    def update(self, map_object: MapObject) -> None:
+        """Re-index an object after its coordinates or def changed, keeps its position in results."""
+        order, _, _ = self._entries[id(map_object)]
+        self.remove(map_object)
+        self.add(map_object)
+        _, _, footprint = self._entries[id(map_object)]
+        self._entries[id(map_object)] = (order, map_object, footprint)
+
+    def _candidates(self, x0: int, y0: int, x1: int, y1: int, z: int) -> set[int]:
+        candidates = set()
+        _, bucket_x0, bucket_y0 = self._bucket(x0, y0, z)
+        _, bucket_x1, bucket_y1 = self._bucket(x1, y1, z)
+        for bucket_x in range(bucket_x0, bucket_x1 + 1):
+            for bucket_y in range(bucket_y0, bucket_y1 + 1):
+                candidates |= self._buckets.get((z, bucket_x, bucket_y), set())
+        return candidates
+
+    def _sorted(self, object_ids) -> list[MapObject]:
+        entries = sorted(self._entries[object_id] for object_id in object_ids)
+        return [map_object for _, map_object, _ in entries]
+
+    def at(self, x: int, y: int, z: int) -> list[MapObject]:
+        """Objects covering the tile."""
+        return self._sorted(
+            object_id
+            for object_id in self._candidates(x, y, x, y, z)
+            if (x, y, z) in self._entries[object_id][2]
+        )
+
+    def in_rect(self, x0: int, y0: int, x1: int, y1: int, z: int) -> list[MapObject]:
+        """Objects covering any tile of the rectangle, both corners included."""
+        x0, x1 = sorted((max(x0, 0), max(x1, 0)))
+        y0, y1 = sorted((max(y0, 0), max(y1, 0)))
+        return self._sorted(
+            object_id
+            for object_id in self._candidates(x0, y0, x1, y1, z)
+            if any(x0 <= x <= x1 and y0 <= y <= y1 for x, y, _ in self._entries[object_id][2])
+        )
+
+    def within_radius(self, center: Tile, radius: float) -> list[MapObject]:
+        """Objects with a footprint tile within euclidean `radius` of `center`."""
+        center_x, center_y, z = center
+        reach = math.floor(radius)
+        x0, y0 = max(center_x - reach, 0), max(center_y - reach, 0)
+        return self._sorted(
+            object_id
+            for object_id in self._candidates(x0, y0, center_x + reach, center_y + reach, z)
+            if any(
+                math.hypot(x - center_x, y - center_y) <= radius
+                for x, y, _ in self._entries[object_id][2]
+            )
+        )
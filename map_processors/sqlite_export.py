@@ -0,0 +1,413 @@
+"""
+Bulk export of parsed maps into a SQLite database for analytics.
+
+Every map is loaded with one `executemany` per table inside a single transaction, indexes
+are created once after the load:
+
+    with SqliteExporter('maps.sqlite') as exporter:
+        exporter.export(structure, filename='6424.h3m', encoding='GB18030')
+
+Tables: maps, players, defs, objects (every object, with owner and quantity where present)
+and its typed children towns, heroes, monsters, seer_huts, plus events and rumors.
+Children reference their parent by (map_id, object_index).
+
+Usage:
+    python -m map_processors.sqlite_export DATABASE MAP_OR_DIR [...] [--workers N]
+"""
+
+import argparse
+import concurrent.futures
+import itertools
+import logging
+import os
+import pathlib
+import sqlite3
+import sys
+
+from map_processors.base import MapParser
+from map_processors.columnar import ObjectTable
+from map_processors.enums import ColorEnum, MapType
+from map_processors.exceptions import H3MapParserException
+from map_processors.schemas import GameMapStructure, MapHero, MapMonster, MapSeerHut, MapTown
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS maps (
+    id INTEGER PRIMARY KEY,
+    filename TEXT,
+    encoding TEXT,
+    name TEXT,
+    description TEXT,
+    map_type TEXT,
+    width INTEGER,
+    height INTEGER,
+    has_underground INTEGER,
+    difficulty INTEGER,
+    hero_level_limit INTEGER,
+    objects_quantity INTEGER
+);
+CREATE TABLE IF NOT EXISTS players (
+    map_id INTEGER NOT NULL REFERENCES maps (id),
+    color TEXT NOT NULL,
+    can_human_play INTEGER,
+    can_computer_play INTEGER,
+    computer_playstyle TEXT,
+    allowed_factions INTEGER,
+    has_main_town INTEGER,
+    main_custom_hero_name TEXT,
+    PRIMARY KEY (map_id, color)
+);
+CREATE TABLE IF NOT EXISTS defs (
+    map_id INTEGER NOT NULL REFERENCES maps (id),
+    def_number INTEGER NOT NULL,
+    sprite_filename TEXT,
+    object_class INTEGER,
+    object_subclass INTEGER,
+    object_group INTEGER,
+    z_index INTEGER,
+    allowed_terrain INTEGER,
+    terrain_group INTEGER,
+    PRIMARY KEY (map_id, def_number)
+);
+CREATE TABLE IF NOT EXISTS objects (
+    map_id INTEGER NOT NULL REFERENCES maps (id),
+    object_index INTEGER NOT NULL,
+    object_class TEXT,
+    object_subclass INTEGER,
+    def_number INTEGER,
+    x INTEGER,
+    y INTEGER,
+    z INTEGER,
+    owner TEXT,
+    quantity INTEGER,
+    PRIMARY KEY (map_id, object_index)
+);
+CREATE TABLE IF NOT EXISTS towns (
+    map_id INTEGER NOT NULL,
+    object_index INTEGER NOT NULL,
+    name TEXT,
+    owner TEXT,
+    formation INTEGER,
+    has_fort INTEGER,
+    alignment INTEGER,
+    events_quantity INTEGER,
+    PRIMARY KEY (map_id, object_index),
+    FOREIGN KEY (map_id, object_index) REFERENCES objects (map_id, object_index)
+);
+CREATE TABLE IF NOT EXISTS heroes (
+    map_id INTEGER NOT NULL,
+    object_index INTEGER NOT NULL,
+    hero_sub_id INTEGER,
+    owner TEXT,
+    name TEXT,
+    experience INTEGER,
+    patrol_radius INTEGER,
+    creatures_quantity INTEGER,
+    PRIMARY KEY (map_id, object_index),
+    FOREIGN KEY (map_id, object_index) REFERENCES objects (map_id, object_index)
+);
+CREATE TABLE IF NOT EXISTS monsters (
+    map_id INTEGER NOT NULL,
+    object_index INTEGER NOT NULL,
+    quantity INTEGER,
+    character INTEGER,
+    mood INTEGER,
+    not_growing INTEGER,
+    artifact_id INTEGER,
+    message TEXT,
+    PRIMARY KEY (map_id, object_index),
+    FOREIGN KEY (map_id, object_index) REFERENCES objects (map_id, object_index)
+);
+CREATE TABLE IF NOT EXISTS seer_huts (
+    map_id INTEGER NOT NULL,
+    object_index INTEGER NOT NULL,
+    mission_type TEXT,
+    reward_type TEXT,
+    first_visit_text TEXT,
+    next_visit_text TEXT,
+    completed_text TEXT,
+    PRIMARY KEY (map_id, object_index),
+    FOREIGN KEY (map_id, object_index) REFERENCES objects (map_id, object_index)
+);
+CREATE TABLE IF NOT EXISTS events (
+    map_id INTEGER NOT NULL REFERENCES maps (id),
+    event_index INTEGER NOT NULL,
+    name TEXT,
+    message TEXT,
+    players TEXT,
+    is_human_affected INTEGER,
+    is_computer_affected INTEGER,
+    first_occurrence INTEGER,
+    next_occurrence INTEGER,
+    PRIMARY KEY (map_id, event_index)
+);
+CREATE TABLE IF NOT EXISTS rumors (
+    map_id INTEGER NOT NULL REFERENCES maps (id),
+    rumor_index INTEGER NOT NULL,
+    name TEXT,
+    text TEXT,
+    PRIMARY KEY (map_id, rumor_index)
+);
+"""
+
+# created after the bulk load, filling indexed tables is slower
+INDEXES = (
+    'CREATE INDEX IF NOT EXISTS objects_class ON objects (object_class, map_id)',
+    'CREATE INDEX IF NOT EXISTS objects_coordinates ON objects (map_id, z, x, y)',
+    'CREATE INDEX IF NOT EXISTS objects_owner ON objects (owner) WHERE owner IS NOT NULL',
+    'CREATE INDEX IF NOT EXISTS defs_sprite ON defs (sprite_filename)',
+    'CREATE INDEX IF NOT EXISTS maps_filename ON maps (filename)',
+)
+
+
+def _owner_name(owner: str | int) -> str:
+    if isinstance(owner, str):
+        return owner
+    try:
+        return ColorEnum(owner).name.lower()
+    except ValueError:
+        return str(owner)
+
+
+class SqliteExporter:
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> 'SqliteExporter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.create_indexes()
+        self.connection.close()
+
+    def create_indexes(self) -> None:
+        with self.connection:
+            for statement in INDEXES:
+                self.connection.execute(statement)
+
+    def export(
+        self,
+        structure: GameMapStructure,
+        filename: str | None = None,
+        encoding: str | None = None,
+    ) -> int:
+        """Insert one map in a single transaction, return its id in `maps`."""
+        with self.connection:
+            return self._insert(structure, filename, encoding)
+
+    def export_many(self, maps: list[tuple[GameMapStructure, str | None, str | None]]) -> list[int]:
+        """Insert (structure, filename, encoding) entries in a single transaction."""
+        with self.connection:
+            return [self._insert(*entry) for entry in maps]
+
+    def _insert(
+        self, structure: GameMapStructure, filename: str | None, encoding: str | None
+    ) -> int:
+        header = structure.header
+        cursor = self.connection.execute(
+            'INSERT INTO maps (filename, encoding, name, description, map_type, width, height, '
+            'has_underground, difficulty, hero_level_limit, objects_quantity) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                filename,
+                encoding,
+                header.map_name,
+                header.map_description,
+                MapType(header.map_type).name,
+                header.width,
+                header.height,
+                header.has_underground,
+                header.map_difficulty,
+                header.hero_level_limit,
+                len(structure.objects),
+            ),
+        )
+        map_id = cursor.lastrowid
+        self.connection.executemany(
+            'INSERT INTO players VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                (
+                    map_id,
+                    _owner_name(index),
+                    player.can_human_play,
+                    player.can_computer_play,
+                    player.computer_playstyle,
+                    player.allowed_factions,
+                    player.town_coordinates is not None,
+                    player.main_custom_hero_name,
+                )
+                for index, player in enumerate(structure.players_attributes)
+            ),
+        )
+        self.connection.executemany(
+            'INSERT INTO defs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                (
+                    map_id,
+                    def_number,
+                    def_file.sprite_filename,
+                    def_file.object_class,
+                    def_file.object_number,
+                    def_file.object_group,
+                    def_file.z_index,
+                    def_file.allowed_terrain,
+                    def_file.terrain_group,
+                )
+                for def_number, def_file in enumerate(structure.def_objects)
+            ),
+        )
+        self._insert_objects(map_id, structure)
+        self.connection.executemany(
+            'INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                (
+                    map_id,
+                    event_index,
+                    event.name,
+                    event.message,
+                    event.players,
+                    event.is_human_affected,
+                    event.is_computer_affected,
+                    event.first_occurrence,
+                    event.next_occurrence,
+                )
+                for event_index, event in enumerate(structure.events)
+            ),
+        )
+        self.connection.executemany(
+            'INSERT INTO rumors VALUES (?, ?, ?, ?)',
+            (
+                (map_id, rumor_index, rumor.name, rumor.text)
+                for rumor_index, rumor in enumerate(structure.rumors)
+            ),
+        )
+        return map_id
+
+    def _insert_objects(self, map_id: int, structure: GameMapStructure) -> None:
+        table = ObjectTable.from_structure(structure)
+        quantities = [None if value < 0 else value for value in table.quantity]
+        self.connection.executemany(
+            'INSERT INTO objects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            zip(
+                itertools.repeat(map_id),
+                range(len(table)),
+                table.values('object_class'),
+                table.object_subclass,
+                table.object_number,
+                table.x,
+                table.y,
+                table.z,
+                [None if owner is None else _owner_name(owner) for owner in table.values('owner')],
+                quantities,
+                strict=False,
+            ),
+        )
+
+        towns, heroes, monsters, seer_huts = [], [], [], []
+        for object_index, map_object in enumerate(structure.objects):
+            if isinstance(map_object, MapTown):
+                towns.append(
+                    (
+                        map_id,
+                        object_index,
+                        map_object.name,
+                        map_object.owner,
+                        map_object.formation,
+                        map_object.has_fort,
+                        map_object.alignment,
+                        len(map_object.events),
+                    )
+                )
+            elif isinstance(map_object, MapHero):
+                heroes.append(
+                    (
+                        map_id,
+                        object_index,
+                        map_object.hero_sub_id,
+                        _owner_name(map_object.owner),
+                        map_object.name,
+                        map_object.experience,
+                        map_object.patrol_radius,
+                        len(map_object.creatures or ()),
+                    )
+                )
+            elif isinstance(map_object, MapMonster):
+                monsters.append(
+                    (
+                        map_id,
+                        object_index,
+                        map_object.quantity,
+                        map_object.character,
+                        map_object.mood,
+                        map_object.not_growing,
+                        map_object.artifact_id,
+                        map_object.message,
+                    )
+                )
+            elif isinstance(map_object, MapSeerHut):
+                seer_huts.append(
+                    (
+                        map_id,
+                        object_index,
+                        map_object.mission_type,
+                        map_object.reward.type if map_object.reward else None,
+                        map_object.first_visit_text,
+                        map_object.next_visit_text,
+                        map_object.completed_text,
+                    )
+                )
+        self.connection.executemany('INSERT INTO towns VALUES (?, ?, ?, ?, ?, ?, ?, ?)', towns)
+        self.connection.executemany('INSERT INTO heroes VALUES (?, ?, ?, ?, ?, ?, ?, ?)', heroes)
+        self.connection.executemany(
+            'INSERT INTO monsters VALUES (?, ?, ?, ?, ?, ?, ?, ?)', monsters
+        )
+        self.connection.executemany('INSERT INTO seer_huts VALUES (?, ?, ?, ?, ?, ?, ?)', seer_huts)
+
+
+def _parse(path: pathlib.Path) -> tuple[GameMapStructure, str, str | None] | None:
+    parser = MapParser(path)
+    try:
+        structure = parser.get_structured_data()
+    except (H3MapParserException, OSError, EOFError, ValueError, UnicodeError) as e:
+        logger.error('%s: %s', path, e)
+        return None
+    return structure, str(path), parser.encoding
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Export parsed maps into a SQLite database')
+    parser.add_argument('database', type=pathlib.Path)
+    parser.add_argument('paths', nargs='+', type=pathlib.Path, help='maps or directories')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    logging.getLogger('map_processors.base').setLevel(logging.CRITICAL)
+
+    paths = []
+    for path in args.paths:
+        paths.extend(sorted(path.rglob('*.h3m')) if path.is_dir() else [path])
+
+    exported = 0
+    with (
+        SqliteExporter(args.database) as exporter,
+        concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor,
+    ):
+        # parsing runs in the workers, the database is written by this process only
+        for parsed in executor.map(_parse, paths, chunksize=4):
+            if parsed is not None:
+                exporter.export(*parsed)
+                exported += 1
+    logger.info('Exported %d of %d maps into %s', exported, len(paths), args.database)
+    return 0 if exported == len(paths) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Opt-in per-section instrumentation for `MapParser` and `MapWriter`.
+
+Enabled with `collect_stats=True`; when disabled nothing is measured at all.
+"""
+
+import dataclasses
+import logging
+
+
+@dataclasses.dataclass
+class SectionStats:
+    name: str
+    seconds: float = 0.0
+    # consumed by the parser or produced by the writer
+    bytes: int = 0
+    # entries of the section: tiles, defs, objects, rumors, events, configured heroes...
+    items: int = 0
+    strings: int = 0
+    # strings decoded (parser) or encoded (writer) with another encoding than the map one
+    string_fallbacks: int = 0
+    # strings that could not be decoded, replaced by a placeholder; None in writer stats,
+    # where a string that cannot be encoded raises instead
+    string_errors: int | None = 0
+    # objects section only: object class -> quantity
+    by_class: dict[str, int] = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class ParseStats:
+    filename: str | None = None
+    # 'parse' or 'write'
+    direction: str = 'parse'
+    sections: dict[str, SectionStats] = dataclasses.field(default_factory=dict)
+    decompress_seconds: float = 0.0
+    detect_encoding_seconds: float = 0.0
+    validate_seconds: float = 0.0
+
+    def add(self, section: SectionStats) -> None:
+        self.sections[section.name] = section
+
+    @property
+    def sections_seconds(self) -> float:
+        return sum(section.seconds for section in self.sections.values())
+
+    @property
+    def total_seconds(self) -> float:
+        return (
+            self.decompress_seconds
+            + self.detect_encoding_seconds
+            + self.sections_seconds
+            + self.validate_seconds
+        )
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(section.bytes for section in self.sections.values())
+
+    def slowest(self, n: int = 3) -> list[SectionStats]:
+        return sorted(self.sections.values(), key=lambda section: section.seconds, reverse=True)[:n]
+
+    def as_dict(self) -> dict:
+        return dataclasses.asdict(self) | {
+            'total_seconds': self.total_seconds,
+            'total_bytes': self.total_bytes,
+        }
+
+    def log(self, logger: logging.Logger, level: int = logging.INFO) -> None:
+        if not logger.isEnabledFor(level):
+            return
+
+        logger.log(
+            level,
+            '%s %s: %.4fs total, %d bytes',
+            self.direction,
+            self.filename,
+            self.total_seconds,
+            self.total_bytes,
+        )
+        for section in self.sections.values():
+            errors = '' if section.string_errors is None else f', {section.string_errors} errors'
+            logger.log(
+                level,
+                '  %-20s %.4fs %8d bytes %6d items %5d strings (%d fallbacks%s)',
+                section.name,
+                section.seconds,
+                section.bytes,
+                section.items,
+                section.strings,
+                section.string_fallbacks,
+                errors,
+            )
@@ -0,0 +1,242 @@
+"""
+Full-text index of the translatable strings of a map archive, in SQLite FTS5.
+
+Every `Translatable` field (`translations.extract_strings`) is stored with its map, field
+path and the coordinates of its object. The trigram tokenizer matches any substring, which
+works for CJK texts without word boundaries; queries shorter than 3 characters fall back
+to a scan with LIKE. Refreshing is incremental like `catalog.MapCatalog.refresh`:
+
+    with StringIndex('strings.sqlite') as index:
+        index.refresh('maps/', workers=8)
+        index.search('dragon utopia')
+
+Usage:
+    python -m map_processors.string_index DATABASE [MAP_OR_DIR ...] [--workers N]
+        [--search PHRASE]
+"""
+
+import argparse
+import concurrent.futures
+import logging
+import os
+import pathlib
+import sqlite3
+import sys
+
+from map_processors.base import MapParser
+from map_processors.catalog import RefreshResult, file_hash, scan
+from map_processors.exceptions import H3MapParserException
+from map_processors.translations import MapString, extract_strings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS maps (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    file_size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    encoding TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS strings (
+    id INTEGER PRIMARY KEY,
+    map_id INTEGER NOT NULL REFERENCES maps (id),
+    path TEXT NOT NULL,
+    text TEXT NOT NULL,
+    object_class TEXT,
+    x INTEGER,
+    y INTEGER,
+    z INTEGER
+);
+CREATE INDEX IF NOT EXISTS strings_map ON strings (map_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS strings_fts USING fts5 (
+    text, content = 'strings', content_rowid = 'id', tokenize = 'trigram'
+);
+CREATE TRIGGER IF NOT EXISTS strings_insert AFTER INSERT ON strings BEGIN
+    INSERT INTO strings_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS strings_delete AFTER DELETE ON strings BEGIN
+    INSERT INTO strings_fts (strings_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# trigram tokenizer: shorter queries cannot use the index
+MIN_MATCH_LENGTH = 3
+
+
+def _extract(task: tuple[str, int, int, str | None]) -> tuple:
+    """(path, mtime_ns, size, hash, changed, encoding, strings, error), runs in the workers."""
+    path, mtime_ns, file_size, known_hash = task
+    digest = file_hash(path)
+    if digest == known_hash:
+        return path, mtime_ns, file_size, digest, False, None, [], None
+
+    parser = MapParser(path)
+    try:
+        structure = parser.get_structured_data()
+    except (H3MapParserException, OSError, EOFError, ValueError, UnicodeError) as e:
+        return path, mtime_ns, file_size, digest, True, None, [], f'{type(e).__name__}: {e}'
+    strings = [
+        (string.path, string.text, string.object_class, *(string.coordinates or (None,) * 3))
+        for string in extract_strings(structure)
+    ]
+    return path, mtime_ns, file_size, digest, True, parser.encoding, strings, None
+
+
+def _match(row: sqlite3.Row) -> dict:
+    coordinates = None if row['x'] is None else (row['x'], row['y'], row['z'])
+    return {
+        'map': row['map'],
+        'path': row['path'],
+        'text': row['text'],
+        'object_class': row['object_class'],
+        'coordinates': coordinates,
+    }
+
+
+class StringIndex:
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> 'StringIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def refresh(self, *paths: str | pathlib.Path, workers: int | None = 1) -> RefreshResult:
+        """Re-extract new and changed maps of `paths`, drop maps removed from directories."""
+        result = RefreshResult()
+        known = {
+            row['path']: (row['mtime_ns'], row['file_size'], row['hash'])
+            for row in self.connection.execute('SELECT path, mtime_ns, file_size, hash FROM maps')
+        }
+        tasks, result.unchanged, removed = scan(paths, known)
+
+        with self.connection:
+            for path in removed:
+                self._delete_strings(path)
+                self.connection.execute('DELETE FROM maps WHERE path = ?', (path,))
+            result.removed = len(removed)
+            for entry in self._extract_all(tasks, workers):
+                path, mtime_ns, file_size, digest, changed, encoding, strings, error = entry
+                if not changed:
+                    self.connection.execute(
+                        'UPDATE maps SET mtime_ns = ?, file_size = ? WHERE path = ?',
+                        (mtime_ns, file_size, path),
+                    )
+                    result.unchanged += 1
+                    continue
+                self._delete_strings(path)
+                map_id = self.connection.execute(
+                    'INSERT INTO maps (path, mtime_ns, file_size, hash, encoding, error) '
+                    'VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (path) DO UPDATE SET '
+                    'mtime_ns = excluded.mtime_ns, file_size = excluded.file_size, '
+                    'hash = excluded.hash, encoding = excluded.encoding, error = excluded.error '
+                    'RETURNING id',
+                    (path, mtime_ns, file_size, digest, encoding, error),
+                ).fetchone()[0]
+                self.connection.executemany(
+                    'INSERT INTO strings (map_id, path, text, object_class, x, y, z) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    ((map_id, *string) for string in strings),
+                )
+                if error is not None:
+                    logger.error('%s: %s', path, error)
+                    result.failed += 1
+                elif path in known:
+                    result.updated += 1
+                else:
+                    result.added += 1
+        return result
+
+    @staticmethod
+    def _extract_all(tasks: list[tuple], workers: int | None):
+        if workers == 1 or len(tasks) < 2:
+            yield from map(_extract, tasks)
+            return
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(_extract, tasks, chunksize=4)
+
+    def _delete_strings(self, path: str) -> None:
+        self.connection.execute(
+            'DELETE FROM strings WHERE map_id = (SELECT id FROM maps WHERE path = ?)', (path,)
+        )
+
+    def search(self, phrase: str, limit: int | None = None) -> list[dict]:
+        """Strings containing `phrase` (case-insensitive) with map, field path and coordinates."""
+        if len(phrase) >= MIN_MATCH_LENGTH:
+            condition = 'strings.id IN (SELECT rowid FROM strings_fts WHERE strings_fts MATCH ?)'
+            parameter = '"' + phrase.replace('"', '""') + '"'
+        else:
+            condition = "strings.text LIKE ? ESCAPE '\\'"
+            escaped = phrase.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            parameter = f'%{escaped}%'
+        query = (
+            'SELECT maps.path AS map, strings.* FROM strings JOIN maps ON maps.id = strings.map_id '
+            f'WHERE {condition} ORDER BY maps.path, strings.id'
+        )
+        parameters = [parameter]
+        if limit is not None:
+            query += ' LIMIT ?'
+            parameters.append(limit)
+        return [_match(row) for row in self.connection.execute(query, parameters)]
+
+    def map_strings(self, path: str | pathlib.Path) -> list[MapString]:
+        """Indexed strings of one map in map order, empty for unknown or unparsable maps."""
+        return [
+            MapString(
+                row['path'],
+                row['text'],
+                row['object_class'],
+                None if row['x'] is None else (row['x'], row['y'], row['z']),
+            )
+            for row in self.connection.execute(
+                'SELECT strings.* FROM strings JOIN maps ON maps.id = strings.map_id '
+                'WHERE maps.path = ? ORDER BY strings.id',
+                (str(path),),
+            )
+        ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Index or search translatable map strings')
+    parser.add_argument('database', type=pathlib.Path)
+    parser.add_argument('paths', nargs='*', type=pathlib.Path, help='maps or directories')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--search', metavar='PHRASE')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    logging.getLogger('map_processors.base').setLevel(logging.CRITICAL)
+
+    failed = 0
+    with StringIndex(args.database) as index:
+        if args.paths:
+            result = index.refresh(*args.paths, workers=args.workers)
+            failed = result.failed
+            logger.info(
+                '%d added, %d updated, %d unchanged, %d removed, %d failed',
+                result.added,
+                result.updated,
+                result.unchanged,
+                result.removed,
+                result.failed,
+            )
+        if args.search:
+            for match in index.search(args.search):
+                location = '' if match['coordinates'] is None else f' {match["coordinates"]}'
+                sys.stdout.write(f'{match["map"]}: {match["path"]}{location}: {match["text"]}\n')
+    return 0 if not failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
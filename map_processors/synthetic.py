@@ -0,0 +1,511 @@
+"""
+Synthetic map generator for scale and load testing.
+
+Builds valid `GameMapStructure` instances (SoD format) of arbitrary size and object count
+and writes them with `MapWriter`. Generation is seeded, so the same parameters always
+produce the same map.
+
+Usage:
+    python -m map_processors.synthetic OUTPUT.h3m [--size 252] [--underground]
+        [--objects 50000] [--string-length 64] [--encoding GB18030] [--seed 1]
+"""
+
+import argparse
+import base64
+import logging
+import pathlib
+import random
+
+from map_processors.enums import ColorEnum, MapType, ObjectType, ResourceType
+from map_processors.schemas import (
+    Creature,
+    DefFile,
+    GameMapStructure,
+    Guard,
+    Header,
+    Loss,
+    MapArtifact,
+    MapCreatureGenerator,
+    MapEvent,
+    MapGarrison,
+    MapHero,
+    MapMineAbandonedMine,
+    MapMonster,
+    MapObject,
+    MapPandoraBox,
+    MapResource,
+    MapSeerHut,
+    MapSign,
+    MapTimedEvent,
+    MapTown,
+    PlayerAttributes,
+    PredefinedHeroNonConfigured,
+    PrimarySkills,
+    Resources,
+    Reward,
+    Rumor,
+    Teams,
+    Terrain,
+    TerrainTile,
+    Victory,
+)
+from map_processors.writer import MapWriter
+
+logger = logging.getLogger(__name__)
+
+MAX_MAP_SIZE = 252
+
+# Characters typical for maps in each encoding; every one of them is encodable there.
+ALPHABETS: dict[str, str] = {
+    'cp1251': (
+        'абвгдеёжзийклмнопрстуфхцчшщъыьэюяАБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ'
+        'abcdefghijklmnopqrstuvwxyz0123456789'
+    ),
+    'GB18030': (
+        '的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动'
+        '同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自'
+        '二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日'
+        '那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变'
+        '英雄城堡魔法宝物怪兽金矿木材水晶宝石硫磺水银'
+    ),
+}
+
+# Object class names (as in `schemas.OBJECT_CLASS_TO_TAG`) with their relative weights.
+# `decoration` stands for the bodyless decorative objects that dominate real maps.
+DEFAULT_OBJECT_MIX: dict[str, float] = {
+    'decoration': 60,
+    'resource': 8,
+    'monster': 8,
+    'artifact': 3,
+    'event': 3,
+    'mine': 2,
+    'creature_generator1': 2,
+    'seer_hut': 1,
+    'sign': 1,
+    'pandora_box': 1,
+    'garrison_horizontal': 1,
+    'town': 0.5,
+    'hero': 0.5,
+}
+
+DECORATION_CLASSES = (116, 118, 119, 120, 127, 134, 135, 137, 147, 150, 155, 161)
+
+TERRAIN_TYPES = 10
+PREDEFINED_HEROES_QUANTITY = 156
+
+
+def _zeros(n: int) -> str:
+    return base64.b64encode(bytes(n)).decode()
+
+
+def _mask(rng: random.Random, bits: int) -> str:
+    return ''.join(rng.choice('01') for _ in range(bits))
+
+
+class SyntheticMapGenerator:
+    def __init__(
+        self,
+        size: int = 72,
+        has_underground: bool = False,
+        objects_quantity: int = 1000,
+        object_mix: dict[str, float] | None = None,
+        string_length: int = 32,
+        encoding: str = 'cp1251',
+        rumors_quantity: int = 10,
+        events_quantity: int = 10,
+        seed: int = 0,
+    ) -> None:
+        if not 1 <= size <= MAX_MAP_SIZE:
+            raise ValueError(f'Map size must be within 1..{MAX_MAP_SIZE}, got {size}')
+        if encoding not in ALPHABETS:
+            raise ValueError(f'Unsupported encoding {encoding}, expected one of {list(ALPHABETS)}')
+        object_mix = object_mix or DEFAULT_OBJECT_MIX
+        unknown_classes = set(object_mix) - set(self._object_builders())
+        if unknown_classes:
+            raise ValueError(f'Unsupported object classes: {sorted(unknown_classes)}')
+
+        self.size = size
+        self.has_underground = has_underground
+        self.objects_quantity = objects_quantity
+        self.object_mix = object_mix
+        self.string_length = string_length
+        self.encoding = encoding
+        self.rumors_quantity = rumors_quantity
+        self.events_quantity = events_quantity
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self._defs: list[DefFile] = []
+        self._def_numbers: dict[tuple[int, int], int] = {}
+
+    def _object_builders(self) -> dict:
+        return {
+            'decoration': self._decoration,
+            'resource': self._resource,
+            'monster': self._monster,
+            'artifact': self._artifact,
+            'event': self._event,
+            'mine': self._mine,
+            'creature_generator1': self._creature_generator,
+            'seer_hut': self._seer_hut,
+            'sign': self._sign,
+            'pandora_box': self._pandora_box,
+            'garrison_horizontal': self._garrison,
+            'town': self._town,
+            'hero': self._hero,
+        }
+
+    def _string(self, length: int | None = None) -> str:
+        alphabet = ALPHABETS[self.encoding]
+        length = self.string_length if length is None else length
+        return ''.join(self.rng.choice(alphabet) for _ in range(length))
+
+    def _owner(self) -> str:
+        return self.rng.choice(list(ColorEnum)).name.lower()
+
+    def _creatures(self, quantity: int, model: type[Creature | Guard] = Creature) -> list:
+        return [
+            model(id=self.rng.randrange(0, 145), quantity=self.rng.randrange(1, 1000))
+            for _ in range(quantity)
+        ]
+
+    def _resources(self) -> Resources:
+        return Resources(
+            **{name.lower(): self.rng.randrange(0, 20) for name in ResourceType.__members__}
+        )
+
+    def _def_number(self, object_class: int, object_subclass: int) -> int:
+        key = (object_class, object_subclass)
+        if key not in self._def_numbers:
+            self._def_numbers[key] = len(self._defs)
+            self._defs.append(
+                DefFile(
+                    sprite_filename=f'SYN{object_class:03d}{object_subclass:03d}.def',
+                    unpassable_tiles='1' * 40 + '01111111',
+                    active_tiles='0' * 40 + '10000000',
+                    allowed_terrain=0xFF,
+                    terrain_group=1,
+                    object_class=object_class,
+                    object_number=object_subclass,
+                    object_group=2,
+                    z_index=0,
+                    unknown_base64=_zeros(16),
+                )
+            )
+        return self._def_numbers[key]
+
+    def _base_fields(self, object_class: int, object_subclass: int = 0) -> dict:
+        levels = 2 if self.has_underground else 1
+        return {
+            'object_subclass': object_subclass,
+            'object_number': self._def_number(object_class, object_subclass),
+            'coordinates': (
+                self.rng.randrange(self.size),
+                self.rng.randrange(self.size),
+                self.rng.randrange(levels),
+            ),
+            'pre_body_unknown': _zeros(5),
+        }
+
+    def _decoration(self) -> MapObject:
+        object_class = self.rng.choice(DECORATION_CLASSES)
+        return MapObject(
+            object_class=str(object_class),
+            **self._base_fields(object_class, self.rng.randrange(4)),
+        )
+
+    def _resource(self) -> MapResource:
+        resource_type = self.rng.choice(list(ResourceType))
+        return MapResource(
+            object_class='resource',
+            resource_type=resource_type.name.lower(),
+            quantity=self.rng.randrange(1, 30),
+            unknown_tail=_zeros(4),
+            **self._base_fields(ObjectType.RESOURCE, resource_type.value),
+        )
+
+    def _monster(self) -> MapMonster:
+        has_message = self.rng.random() < 0.1
+        return MapMonster(
+            object_class='monster',
+            id=self.rng.getrandbits(32),
+            quantity=self.rng.randrange(1, 500),
+            character=self.rng.randrange(5),
+            message=self._string() if has_message else None,
+            resources=self._resources() if has_message else None,
+            artifact_id=0xFFFF if has_message else None,
+            mood=self.rng.randrange(3),
+            not_growing=self.rng.random() < 0.5,
+            unknown_tail=_zeros(2),
+            **self._base_fields(ObjectType.MONSTER, self.rng.randrange(145)),
+        )
+
+    def _artifact(self) -> MapArtifact:
+        artifact_id = self.rng.randrange(7, 141)
+        return MapArtifact(
+            object_class='artifact',
+            artifact_id=artifact_id,
+            **self._base_fields(ObjectType.ARTIFACT, artifact_id),
+        )
+
+    def _event(self) -> MapEvent:
+        return MapEvent(
+            object_class='event',
+            message=self._string(),
+            guards=self._creatures(7, Guard),
+            message_unknown=_zeros(4),
+            experience=self.rng.randrange(10000),
+            mana_diff=self.rng.randrange(-100, 100),
+            morale=self.rng.randrange(-3, 4),
+            luck=self.rng.randrange(-3, 4),
+            resources=self._resources(),
+            primary_skills=PrimarySkills(),
+            creatures=self._creatures(self.rng.randrange(3)),
+            available_for_color='11111111',
+            can_computer_activate=False,
+            remove_after_visit=True,
+            unknown_mid=_zeros(8),
+            unknown_tail=_zeros(4),
+            **self._base_fields(ObjectType.EVENT),
+        )
+
+    def _mine(self) -> MapMineAbandonedMine:
+        return MapMineAbandonedMine(
+            object_class='mine',
+            owner=self._owner(),
+            unknown_tail=_zeros(3),
+            **self._base_fields(ObjectType.MINE, self.rng.randrange(7)),
+        )
+
+    def _creature_generator(self) -> MapCreatureGenerator:
+        return MapCreatureGenerator(
+            object_class='creature_generator1',
+            owner=self._owner(),
+            unknown_tail=_zeros(3),
+            **self._base_fields(ObjectType.CREATURE_GENERATOR1, self.rng.randrange(80)),
+        )
+
+    def _seer_hut(self) -> MapSeerHut:
+        return MapSeerHut(
+            object_class='seer_hut',
+            mission_type='achieve_level',
+            level=self.rng.randrange(2, 30),
+            limit=0xFFFFFFFF,
+            first_visit_text=self._string(),
+            next_visit_text=self._string(),
+            completed_text=self._string(),
+            reward=Reward(type='experience', experience=self.rng.randrange(1, 50000)),
+            unknown_tail=_zeros(2),
+            **self._base_fields(ObjectType.SEER_HUT),
+        )
+
+    def _sign(self) -> MapSign:
+        return MapSign(
+            object_class='sign',
+            message=self._string(),
+            message_tail=_zeros(4),
+            **self._base_fields(ObjectType.SIGN, self.rng.randrange(4)),
+        )
+
+    def _pandora_box(self) -> MapPandoraBox:
+        return MapPandoraBox(
+            object_class='pandora_box',
+            message=self._string(),
+            guards=None,
+            message_unknown=_zeros(4),
+            experience=self.rng.randrange(10000),
+            mana_diff=0,
+            morale_diff=0,
+            luck_diff=0,
+            resources=self._resources(),
+            primary_skills=PrimarySkills(),
+            abilities=[],
+            artifacts=[],
+            spells=[self.rng.randrange(70)],
+            creatures=self._creatures(1),
+            unknown_tail=_zeros(8),
+            **self._base_fields(ObjectType.PANDORA_BOX),
+        )
+
+    def _garrison(self) -> MapGarrison:
+        return MapGarrison(
+            object_class='garrison_horizontal',
+            owner=self._owner(),
+            creatures=self._creatures(7),
+            is_removable=0,
+            unknown_mid=_zeros(3),
+            unknown_tail=_zeros(8),
+            **self._base_fields(ObjectType.GARRISON_HORIZONTAL),
+        )
+
+    def _town(self) -> MapTown:
+        return MapTown(
+            object_class='town',
+            id=self.rng.getrandbits(32),
+            owner=self._owner(),
+            name=self._string(self.string_length // 4 or 1),
+            formation=0,
+            has_fort=True,
+            obligatory_spells='0' * 72,
+            possible_spells=_mask(self.rng, 72),
+            alignment=0xFF,
+            unknown_tail=_zeros(3),
+            **self._base_fields(ObjectType.TOWN, self.rng.randrange(9)),
+        )
+
+    def _hero(self) -> MapHero:
+        return MapHero(
+            object_class='hero',
+            id=self.rng.getrandbits(32),
+            owner=self.rng.randrange(8),
+            hero_sub_id=self.rng.randrange(156),
+            name=self._string(self.string_length // 4 or 1),
+            creatures=self._creatures(7),
+            formation=0,
+            patrol_radius=0xFF,
+            biography=self._string(),
+            sex=0xFF,
+            unknown_tail=_zeros(16),
+            **self._base_fields(ObjectType.HERO, self.rng.randrange(18)),
+        )
+
+    def _players(self) -> list[PlayerAttributes]:
+        players = []
+        for number in range(8):
+            if number >= 2:
+                players.append(
+                    PlayerAttributes(
+                        can_human_play=False, can_computer_play=False, inactive_unknown=_zeros(13)
+                    )
+                )
+                continue
+            players.append(
+                PlayerAttributes(
+                    can_human_play=True,
+                    can_computer_play=True,
+                    computer_playstyle='random',
+                    are_factions_configured=0,
+                    allowed_factions=0x1FF,
+                    is_faction_random=1,
+                    has_random_hero=1,
+                    main_custom_hero_id=0xFF,
+                    hero_section_prefix=_zeros(1),
+                    hero_count=0,
+                    hero_section_suffix=_zeros(3),
+                    heroes=[],
+                )
+            )
+        return players
+
+    def _terrain_level(self) -> list[TerrainTile]:
+        return [
+            TerrainTile(
+                terrain_type=self.rng.randrange(TERRAIN_TYPES),
+                view=self.rng.randrange(24),
+                river_type=0,
+                river_flow=0,
+                road_type=0,
+                road_flow=0,
+                flip_bits=self.rng.randrange(4),
+            )
+            for _ in range(self.size * self.size)
+        ]
+
+    def _timed_event(self) -> MapTimedEvent:
+        return MapTimedEvent(
+            name=self._string(self.string_length // 4 or 1),
+            message=self._string(),
+            resources=self._resources(),
+            players='11111111',
+            is_human_affected=True,
+            is_computer_affected=False,
+            first_occurrence=self.rng.randrange(1, 100),
+            next_occurrence=self.rng.randrange(8),
+            unknown=_zeros(17),
+        )
+
+    def generate(self) -> GameMapStructure:
+        self.rng = random.Random(self.seed)
+        self._defs = []
+        self._def_numbers = {}
+
+        builders = self._object_builders()
+        classes = list(self.object_mix)
+        weights = [self.object_mix[name] for name in classes]
+        objects = [
+            builders[name]()
+            for name in self.rng.choices(classes, weights=weights, k=self.objects_quantity)
+        ]
+
+        return GameMapStructure(
+            header=Header(
+                map_type=MapType.SOD.value,
+                are_any_players=True,
+                height=self.size,
+                width=self.size,
+                has_underground=self.has_underground,
+                map_name=self._string(self.string_length // 4 or 1),
+                map_description=self._string(),
+                map_difficulty=1,
+                hero_level_limit=0,
+            ),
+            players_attributes=self._players(),
+            victory=Victory(special_victory_condition=0xFF),
+            loss=Loss(special_loss_condition=0xFF),
+            teams=Teams(quantity=0),
+            allowed_heroes_info='1' * 156 + '0' * 4,
+            placeholder_heroes=[],
+            configured_heroes=[],
+            heroes_info_unknown=_zeros(31),
+            artifacts='0' * 144,
+            allowed_spells_bytes='0' * 72,
+            allowed_hero_abilities_bytes='0' * 32,
+            rumors=[
+                Rumor(name=self._string(8), text=self._string())
+                for _ in range(self.rumors_quantity)
+            ],
+            predefined_heroes={
+                hero_id: PredefinedHeroNonConfigured()
+                for hero_id in range(PREDEFINED_HEROES_QUANTITY)
+            },
+            terrain=Terrain(
+                surface=self._terrain_level(),
+                underground=self._terrain_level() if self.has_underground else [],
+            ),
+            def_objects=self._defs,
+            objects=objects,
+            events=[self._timed_event() for _ in range(self.events_quantity)],
+        )
+
+    def write_to_file(self, path: str | pathlib.Path) -> GameMapStructure:
+        structure = self.generate()
+        MapWriter(structure, encoding=self.encoding).write_to_file(path)
+        return structure
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Heroes III map')
+    parser.add_argument('output', type=pathlib.Path)
+    parser.add_argument('--size', type=int, default=72)
+    parser.add_argument('--underground', action='store_true')
+    parser.add_argument('--objects', type=int, default=1000)
+    parser.add_argument('--string-length', type=int, default=32)
+    parser.add_argument('--encoding', default='cp1251', choices=sorted(ALPHABETS))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    generator = SyntheticMapGenerator(
+        size=args.size,
+        has_underground=args.underground,
+        objects_quantity=args.objects,
+        string_length=args.string_length,
+        encoding=args.encoding,
+        seed=args.seed,
+    )
+    generator.write_to_file(args.output)
+    logger.info('Synthetic map written to %s', args.output)
+
+
+if __name__ == '__main__':
+    main()
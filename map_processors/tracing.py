@@ -0,0 +1,106 @@
+"""
+Chrome trace-event export (opens in Perfetto or chrome://tracing).
+
+Spans are recorded only while a recorder is active, otherwise `span()` is a no-op:
+
+    with trace_to_file('trace.json'):
+        for path in maps:
+            MapWriter(MapParser(path).get_structured_data()).write_to_file(...)
+
+Worker processes of a batch job trace into their own files (e.g. `trace.<pid>.json`),
+`merge_trace_files()` joins them into a single timeline.
+"""
+
+import contextlib
+import json
+import os
+import pathlib
+import threading
+import time
+
+_active_recorder: 'TraceRecorder | None' = None
+
+
+class TraceRecorder:
+    def __init__(self, process_name: str | None = None) -> None:
+        self.pid = os.getpid()
+        self.events: list[dict] = []
+        # perf_counter is monotonic but per-process, anchor it to the wall clock
+        # so files from different workers line up on one timeline
+        self._epoch_ns = time.time_ns() - time.perf_counter_ns()
+        if process_name:
+            self.events.append(
+                {
+                    'name': 'process_name',
+                    'ph': 'M',
+                    'pid': self.pid,
+                    'tid': 0,
+                    'args': {'name': process_name},
+                }
+            )
+
+    def _timestamp_us(self, perf_counter_ns: int) -> float:
+        return (self._epoch_ns + perf_counter_ns) / 1000
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = 'tolmach', **args):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            self.events.append(
+                {
+                    'name': name,
+                    'cat': category,
+                    'ph': 'X',
+                    'ts': self._timestamp_us(start),
+                    'dur': (end - start) / 1000,
+                    'pid': self.pid,
+                    'tid': threading.get_ident(),
+                    'args': args,
+                }
+            )
+
+    def to_dict(self) -> dict:
+        return {'traceEvents': self.events, 'displayTimeUnit': 'ms'}
+
+    def write(self, path: str | pathlib.Path) -> None:
+        pathlib.Path(path).write_text(json.dumps(self.to_dict()), encoding='utf-8')
+
+
+def get_recorder() -> TraceRecorder | None:
+    return _active_recorder
+
+
+def set_recorder(recorder: TraceRecorder | None) -> TraceRecorder | None:
+    """Activate `recorder` (or disable tracing with None), return the previous one."""
+    global _active_recorder
+    previous, _active_recorder = _active_recorder, recorder
+    return previous
+
+
+def span(name: str, category: str = 'tolmach', **args):
+    if _active_recorder is None:
+        return contextlib.nullcontext()
+    return _active_recorder.span(name, category, **args)
+
+
+@contextlib.contextmanager
+def trace_to_file(path: str | pathlib.Path, process_name: str | None = None):
+    recorder = TraceRecorder(process_name=process_name)
+    previous = set_recorder(recorder)
+    try:
+        yield recorder
+    finally:
+        set_recorder(previous)
+        recorder.write(path)
+
+
+def merge_trace_files(paths: list[str | pathlib.Path], output: str | pathlib.Path) -> None:
+    events = []
+    for path in paths:
+        events.extend(json.loads(pathlib.Path(path).read_text(encoding='utf-8'))['traceEvents'])
+    pathlib.Path(output).write_text(
+        json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}), encoding='utf-8'
+    )
@@ -0,0 +1,242 @@
+"""
+Translation coverage of a map archive, computed incrementally.
+
+Strings come from the extraction cache of `string_index.StringIndex` (only new or changed
+maps are parsed). Translations come from the per-map `<map>_translations.json` written by
+`MapTranslationFileGenerator` and from an optional shared JSON store (text -> translation).
+Per-map results are cached in the same database and recomputed only when the map, its
+translation file or the shared store changed:
+
+    with TranslationCoverage('strings.sqlite') as coverage:
+        report = coverage.compute('maps/', shared='shared_translations.json')
+        report.total.untranslated, report.total.characters_remaining
+
+Usage:
+    python -m map_processors.translation_coverage DATABASE MAP_OR_DIR [...]
+        [--shared STORE] [--workers N] [--output REPORT.json]
+"""
+
+import argparse
+import collections
+import dataclasses
+import json
+import logging
+import os
+import pathlib
+import sys
+
+from map_processors.catalog import file_hash
+from map_processors.string_index import StringIndex
+from map_processors.translations import translations_path
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS coverage (
+    map_id INTEGER PRIMARY KEY REFERENCES maps (id),
+    map_hash TEXT NOT NULL,
+    translations_mtime_ns INTEGER NOT NULL,
+    translations_size INTEGER NOT NULL,
+    shared_hash TEXT NOT NULL,
+    strings INTEGER NOT NULL,
+    unique_strings INTEGER NOT NULL,
+    repeated_strings INTEGER NOT NULL,
+    translated INTEGER NOT NULL,
+    untranslated INTEGER NOT NULL,
+    characters_remaining INTEGER NOT NULL
+);
+"""
+
+COUNTS = (
+    'strings',
+    'unique_strings',
+    'repeated_strings',
+    'translated',
+    'untranslated',
+    'characters_remaining',
+)
+
+
+@dataclasses.dataclass
+class MapCoverage:
+    map: str
+    # occurrences of translatable strings
+    strings: int = 0
+    # distinct texts, and those of them occurring more than once
+    unique_strings: int = 0
+    repeated_strings: int = 0
+    # distinct texts with / without a non-empty translation
+    translated: int = 0
+    untranslated: int = 0
+    characters_remaining: int = 0
+
+    @property
+    def percent(self) -> float:
+        return 100.0 * self.translated / self.unique_strings if self.unique_strings else 100.0
+
+
+@dataclasses.dataclass
+class CoverageReport:
+    maps: list[MapCoverage]
+    # distinct texts of the whole archive, a text shared by maps is translated once
+    archive_unique_strings: int = 0
+    # maps whose coverage was recomputed by this run
+    recomputed: int = 0
+
+    @property
+    def total(self) -> MapCoverage:
+        total = MapCoverage(map='total')
+        for coverage in self.maps:
+            for name in COUNTS:
+                setattr(total, name, getattr(total, name) + getattr(coverage, name))
+        return total
+
+    def as_dict(self) -> dict:
+        return {
+            'maps': [dataclasses.asdict(coverage) for coverage in self.maps],
+            'total': dataclasses.asdict(self.total),
+            'archive_unique_strings': self.archive_unique_strings,
+        }
+
+
+def _load_translations(path: pathlib.Path, encoding: str | None) -> dict[str, str]:
+    # the generator writes the file in the encoding of the map
+    with open(path, encoding=encoding or 'utf-8') as f:
+        return json.load(f)
+
+
+def map_coverage(map_path: str, texts: list[str], *stores: dict[str, str]) -> MapCoverage:
+    """Coverage of `texts`, a text is translated if any of `stores` has a non-empty entry."""
+    counts = collections.Counter(texts)
+    coverage = MapCoverage(
+        map=map_path,
+        strings=len(texts),
+        unique_strings=len(counts),
+        repeated_strings=sum(1 for count in counts.values() if count > 1),
+    )
+    for text in counts:
+        if any(store.get(text) for store in stores):
+            coverage.translated += 1
+        else:
+            coverage.untranslated += 1
+            coverage.characters_remaining += len(text)
+    return coverage
+
+
+class TranslationCoverage:
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.index = StringIndex(path)
+        self.connection = self.index.connection
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> 'TranslationCoverage':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.index.close()
+
+    def compute(
+        self,
+        *paths: str | pathlib.Path,
+        shared: str | pathlib.Path | None = None,
+        workers: int | None = 1,
+    ) -> CoverageReport:
+        """Refresh the string index for `paths`, then the coverage of every indexed map."""
+        self.index.refresh(*paths, workers=workers)
+        shared_hash = file_hash(shared) if shared else ''
+        shared_translations = None
+
+        report = CoverageReport(maps=[])
+        maps = self.connection.execute(
+            'SELECT maps.id, maps.path, maps.hash, maps.encoding, coverage.* FROM maps '
+            'LEFT JOIN coverage ON coverage.map_id = maps.id '
+            'WHERE maps.error IS NULL ORDER BY maps.path'
+        ).fetchall()
+        with self.connection:
+            self.connection.execute(
+                'DELETE FROM coverage WHERE map_id NOT IN (SELECT id FROM maps WHERE error IS NULL)'
+            )
+            for row in maps:
+                translations_file = translations_path(row['path'])
+                try:
+                    stat = translations_file.stat()
+                    translations_key = (stat.st_mtime_ns, stat.st_size)
+                except FileNotFoundError:
+                    translations_key = (-1, -1)
+
+                key = (row['hash'], *translations_key, shared_hash)
+                cached = (
+                    row['map_hash'],
+                    row['translations_mtime_ns'],
+                    row['translations_size'],
+                    row['shared_hash'],
+                )
+                if cached == key:
+                    report.maps.append(MapCoverage(row['path'], *(row[name] for name in COUNTS)))
+                    continue
+
+                if shared_translations is None:
+                    shared_translations = self._load_shared(shared)
+                translations = {}
+                if translations_key[0] >= 0:
+                    translations = _load_translations(translations_file, row['encoding'])
+                texts = [string.text for string in self.index.map_strings(row['path'])]
+                coverage = map_coverage(row['path'], texts, translations, shared_translations)
+                self.connection.execute(
+                    f'INSERT OR REPLACE INTO coverage VALUES ({", ".join("?" * (5 + len(COUNTS)))})',
+                    (row['id'], *key, *(getattr(coverage, name) for name in COUNTS)),
+                )
+                report.maps.append(coverage)
+                report.recomputed += 1
+
+        report.archive_unique_strings = self.connection.execute(
+            'SELECT count(DISTINCT text) FROM strings'
+        ).fetchone()[0]
+        return report
+
+    @staticmethod
+    def _load_shared(shared: str | pathlib.Path | None) -> dict[str, str]:
+        if not shared:
+            return {}
+        with open(shared, encoding='utf-8') as f:
+            return json.load(f)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Report translation coverage of maps')
+    parser.add_argument('database', type=pathlib.Path)
+    parser.add_argument('paths', nargs='+', type=pathlib.Path, help='maps or directories')
+    parser.add_argument('--shared', type=pathlib.Path, help='shared JSON translation store')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--output', type=pathlib.Path, help='write the report as JSON')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    logging.getLogger('map_processors.base').setLevel(logging.CRITICAL)
+
+    with TranslationCoverage(args.database) as coverage:
+        report = coverage.compute(*args.paths, shared=args.shared, workers=args.workers)
+
+    for entry in [*report.maps, report.total]:
+        sys.stdout.write(
+            f'{entry.map}: {entry.translated}/{entry.unique_strings} translated '
+            f'({entry.percent:.1f}%), {entry.strings} strings, '
+            f'{entry.repeated_strings} repeated, {entry.untranslated} untranslated, '
+            f'{entry.characters_remaining} characters remaining\n'
+        )
+    logger.info(
+        '%d maps (%d recomputed), %d unique strings in the archive',
+        len(report.maps),
+        report.recomputed,
+        report.archive_unique_strings,
+    )
+    if args.output:
+        args.output.write_text(json.dumps(report.as_dict(), indent=4, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
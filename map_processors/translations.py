@@ -1,6 +1,186 @@
+import dataclasses
+import functools
 import json
+import pathlib
+from typing import Annotated, Any, get_args, get_origin
+
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
 
 from map_processors.base import MapParser
+from map_processors.schemas import Translatable
+
+
+@dataclasses.dataclass(frozen=True)
+class MapString:
+    """A translatable string and where it is: `objects[12].first_visit_text`."""
+
+    path: str
+    text: str
+    # of the object the string belongs to, None for header, rumors, events...
+    object_class: str | None = None
+    coordinates: tuple[int, int, int] | None = None
+
+
+def _is_translatable(annotation: Any) -> bool:
+    if get_origin(annotation) is Annotated:
+        annotation, *metadata = get_args(annotation)
+        if any(isinstance(item, Translatable) for item in metadata):
+            return True
+    return any(_is_translatable(argument) for argument in get_args(annotation))
+
+
+def _is_translatable_field(field: FieldInfo) -> bool:
+    # pydantic moves the metadata of a top level Annotated to the field
+    return any(isinstance(item, Translatable) for item in field.metadata) or _is_translatable(
+        field.annotation
+    )
+
+
+def _models(annotation: Any) -> list[type[BaseModel]]:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return [annotation]
+    return [model for argument in get_args(annotation) for model in _models(argument)]
+
+
+@functools.cache
+def _plan(model: type[BaseModel]) -> tuple[frozenset[str], frozenset[str]]:
+    """Translatable fields of `model` and fields holding models with translatable strings."""
+    translatable, nested = set(), set()
+    for name, field in model.model_fields.items():
+        if _is_translatable_field(field):
+            translatable.add(name)
+        elif any(_has_strings(inner) for inner in _models(field.annotation)):
+            nested.add(name)
+    return frozenset(translatable), frozenset(nested)
+
+
+def _has_strings(model: type[BaseModel], seen: frozenset = frozenset()) -> bool:
+    if model in seen:
+        return False
+    seen |= {model}
+    for field in model.model_fields.values():
+        if _is_translatable_field(field):
+            return True
+        if any(_has_strings(inner, seen) for inner in _models(field.annotation)):
+            return True
+    return False
+
+
+def extract_strings(structure: BaseModel) -> list[MapString]:
+    """Non-empty `Translatable` fields of a parsed map (or of any model), in map order."""
+    strings = []
+    _collect(structure, '', None, None, strings)
+    return strings
+
+
+def _collect(
+    value: Any,
+    path: str,
+    object_class: str | None,
+    coordinates: tuple | None,
+    strings: list[MapString],
+) -> None:
+    if isinstance(value, BaseModel):
+        if isinstance(getattr(value, 'coordinates', None), tuple):
+            object_class, coordinates = value.object_class, value.coordinates
+        translatable, nested = _plan(type(value))
+        for name, item in value.__dict__.items():
+            item_path = f'{path}.{name}' if path else name
+            if name in translatable:
+                if item:
+                    strings.append(MapString(item_path, item, object_class, coordinates))
+            elif name in nested and item is not None:
+                _collect(item, item_path, object_class, coordinates, strings)
+    elif isinstance(value, list | dict):
+        items = value.items() if isinstance(value, dict) else enumerate(value)
+        for key, item in items:
+            if isinstance(item, BaseModel | list | dict):
+                _collect(item, f'{path}[{key}]', object_class, coordinates, strings)
+
+
+def translations_path(map_path: str | pathlib.Path) -> pathlib.Path:
+    """Per-map translation file, named like `MapTranslationFileGenerator` names it."""
+    base, _ = str(map_path).rsplit('.', maxsplit=1)
+    return pathlib.Path(f'{base}_translations.json')
+
+
+def translate_strings(structure: BaseModel, translations: dict[str, str]) -> int:
+    """
+    Replace `Translatable` fields of `structure` in place with their non-empty entries in
+    `translations` (a `*_translations.json` mapping), return the number replaced.
+    """
+    return _translate(structure, translations)
+
+
+def _translate(value: Any, translations: dict[str, str]) -> int:
+    replaced = 0
+    if isinstance(value, BaseModel):
+        translatable, nested = _plan(type(value))
+        attributes = value.__dict__
+        for name, item in attributes.items():
+            if name in translatable:
+                if item and translations.get(item):
+                    attributes[name] = translations[item]
+                    replaced += 1
+            elif name in nested and item is not None:
+                replaced += _translate(item, translations)
+    elif isinstance(value, list | dict):
+        for item in value.values() if isinstance(value, dict) else value:
+            if isinstance(item, BaseModel | list | dict):
+                replaced += _translate(item, translations)
+    return replaced
+
+
+def translate_copy(structure: BaseModel, translations: dict[str, str]) -> BaseModel:
+    """
+    Like `translate_strings`, but on a copy: models with a replaced string and the models
+    and containers holding them are copied, everything else is shared with `structure`.
+    The shared parts are reused by a `write_cache.WriteCache` between variants.
+    """
+    return _translate_copy(structure, translations)
+
+
+def _translate_copy(value: Any, translations: dict[str, str]) -> Any:
+    if isinstance(value, BaseModel):
+        translatable, nested = _plan(type(value))
+        update = {}
+        for name, item in value.__dict__.items():
+            if name in translatable:
+                translation = translations.get(item) if item else None
+                if translation and translation != item:
+                    update[name] = translation
+            elif name in nested and item is not None:
+                copied = _translate_copy(item, translations)
+                if copied is not item:
+                    update[name] = copied
+        return value.model_copy(update=update) if update else value
+    if isinstance(value, list):
+        copied = [_translate_copy(item, translations) for item in value]
+        return copied if any(new is not old for new, old in zip(copied, value)) else value
+    if isinstance(value, dict):
+        copied = {key: _translate_copy(item, translations) for key, item in value.items()}
+        return copied if any(copied[key] is not item for key, item in value.items()) else value
+    return value
+
+
+class StructureTranslator:
+    """
+    Picklable transform for `pipeline.MapPipeline`: translates a parsed map with a shared
+    mapping, or with the map's own `*_translations.json` when `translations` is None.
+    """
+
+    def __init__(self, translations: dict[str, str] | None = None) -> None:
+        self.translations = translations
+
+    def __call__(self, structure: BaseModel, source: str, encoding: str | None) -> BaseModel:
+        translations = self.translations
+        if translations is None:
+            # written by MapTranslationFileGenerator in the encoding of the map
+            with open(translations_path(source), encoding=encoding) as f:
+                translations = json.load(f)
+        translate_strings(structure, translations)
+        return structure
 
 
 class _MapParserWriter(MapParser):
@@ -11,10 +191,11 @@ class _MapParserWriter(MapParser):
     """
 
     def __init__(
-        self, filename: str, output_filename: str = None, encoding='cp1251', *args, **kwargs
+        self, filename: str, output_filename: str = None, encoding=None, *args, **kwargs
     ) -> None:
-        super().__init__(filename, *args, **kwargs)
-        self.output_data_binary = []
+        super().__init__(filename, encoding, *args, **kwargs)
+        # consumed bytes are appended in place, a list of slices costs an object each
+        self.output_data_binary = bytearray()
 
         if output_filename:
             self.output_filename = output_filename
@@ -22,19 +203,55 @@ class _MapParserWriter(MapParser):
             base, ext = filename.rsplit('.', maxsplit=1)
             self.output_filename = f'{base}_output.{ext}'
 
+    def _record(self, n: int) -> None:
+        self.output_data_binary += self.map_binary[
+            self._cursor_position : self._cursor_position + n
+        ]
+
+    def _detect_encoding_by_header(self):
+        super()._detect_encoding_by_header()
+        # the header is read again from the start by read_header
+        self.output_data_binary.clear()
+
     def process_uint8(self) -> int:
         value = self.map_binary[self._cursor_position]
         self._cursor_position += 1
-        self.output_data_binary.append(value.to_bytes(1, 'little'))
+        self.output_data_binary += value.to_bytes(1, 'little')
         return value
 
+    def process_int16(self) -> int:
+        self._record(2)
+        return super().process_int16()
+
+    def process_int32(self) -> int:
+        self._record(4)
+        return super().process_int32()
+
+    def skip_n_bytes(self, n: int, quiet: bool = True) -> None:
+        self._record(n)
+        super().skip_n_bytes(n, quiet)
+
+    def process_n_bytes_to_mask(self, n: int) -> str:
+        self._record(n)
+        return super().process_n_bytes_to_mask(n)
+
+    def process_n_bytes_to_base64(self, n: int) -> str:
+        self._record(n)
+        return super().process_n_bytes_to_base64(n)
+
+    def read_terrain(self):
+        # tiles are unpacked straight from the map binary, not through process_*
+        start = self._cursor_position
+        super().read_terrain()
+        self.output_data_binary += self.map_binary[start : self._cursor_position]
+
     def process_uint16(self) -> int:
         value = self.bytes_to_int(
             self.map_binary[self._cursor_position : self._cursor_position + 2]
         )
-        self.output_data_binary.append(
-            self.map_binary[self._cursor_position : self._cursor_position + 2]
-        )
+        self.output_data_binary += self.map_binary[
+            self._cursor_position : self._cursor_position + 2
+        ]
         self._cursor_position += 2
         return value
 
@@ -43,17 +260,17 @@ class _MapParserWriter(MapParser):
             self.map_binary[self._cursor_position : self._cursor_position + 4]
         )
         if write_same:
-            self.output_data_binary.append(
-                self.map_binary[self._cursor_position : self._cursor_position + 4]
-            )
+            self.output_data_binary += self.map_binary[
+                self._cursor_position : self._cursor_position + 4
+            ]
         self._cursor_position += 4
         return value
 
     def process_n_bytes(self, n: int) -> bytes:
         result = self.map_binary[self._cursor_position : self._cursor_position + n]
-        self.output_data_binary.append(
-            self.map_binary[self._cursor_position : self._cursor_position + n]
-        )
+        self.output_data_binary += self.map_binary[
+            self._cursor_position : self._cursor_position + n
+        ]
         self._cursor_position += n
         return result
 
@@ -61,7 +278,7 @@ class _MapParserWriter(MapParser):
         string_len = self.process_uint32()
         string_end = self._cursor_position + string_len
         string_from_map = self.map_binary[self._cursor_position : string_end].decode(self.encoding)
-        self.output_data_binary.append(self.map_binary[self._cursor_position : string_end])
+        self.output_data_binary += self.map_binary[self._cursor_position : string_end]
         self._cursor_position = string_end
         return string_from_map
 
@@ -70,7 +287,7 @@ class _MapParserWriter(MapParser):
             # along with map parsing alternative binary data is filled
             self.get_structured_data()
 
-        output_binary = b''.join(self.output_data_binary)
+        output_binary = bytes(self.output_data_binary)
         with open(self.output_filename, 'wb') as f:
             f.write(output_binary)
 
@@ -106,7 +323,7 @@ class MapSimpleTranslator(_MapParserWriter):
         filename: str,
         translations_filename: str = None,
         output_filename: str = None,
-        encoding='cp1251',
+        encoding=None,
         *args,
         **kwargs,
     ) -> None:
@@ -135,8 +352,8 @@ class MapSimpleTranslator(_MapParserWriter):
             string_from_map = self.translations[string_from_map]
             string_len = len(string_from_map)
 
-        self.output_data_binary.append(string_len.to_bytes(4, 'little'))
-        self.output_data_binary.append(string_from_map.encode(self.encoding))
+        self.output_data_binary += string_len.to_bytes(4, 'little')
+        self.output_data_binary += string_from_map.encode(self.encoding)
 
         return string_from_map
 
@@ -144,7 +361,7 @@ class MapSimpleTranslator(_MapParserWriter):
         if not self.data:
             self.get_structured_data()
 
-        output_binary = b''.join(self.output_data_binary)
+        output_binary = bytes(self.output_data_binary)
         with open(self.output_filename, 'wb') as f:
             f.write(output_binary)
 
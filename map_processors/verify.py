@@ -0,0 +1,725 @@
+"""
+Structural verification of a map without parsing it, `MapParser.verify()`.
+
+A skim pass walks every section and object body the way the readers of `MapParser` do,
+but keeps nothing: no strings are decoded and no dicts or models are built. It checks that
+every length fits in the data, that enum values are in range and that only padding
+follows the events, and reports each problem with its offset. Claimed quantities and
+string lengths are checked against the remaining data before anything is skipped, so a
+hostile map cannot make it allocate or loop beyond its own size:
+
+    report = MapParser('upload.h3m').verify()
+    if not report.ok:
+        for problem in report.problems:
+            ...
+
+Usage:
+    python -m map_processors.verify MAP_OR_DIR [...]
+"""
+
+import argparse
+import dataclasses
+import logging
+import pathlib
+import struct
+import sys
+import time
+
+from map_processors.constants import MAP_SECTIONS, PLAYER_COLORS
+from map_processors.enums import (
+    ColorEnum,
+    ComputerPlaystyleEnum,
+    MapType,
+    ObjectType,
+    QuestType,
+    ResourceType,
+    RewardType,
+)
+
+logger = logging.getLogger(__name__)
+
+_UINT16 = struct.Struct('<H')
+_UINT32 = struct.Struct('<I')
+
+COLORS = frozenset(color.value for color in ColorEnum)
+PLAYSTYLES = frozenset(playstyle.value for playstyle in ComputerPlaystyleEnum)
+RESOURCES = frozenset(resource.value for resource in ResourceType)
+QUESTS = frozenset(quest.value for quest in QuestType)
+REWARDS = frozenset(reward.value for reward in RewardType)
+# object ids of the game, `ObjectType` only names those with a body or of interest
+MAX_OBJECT_CLASS = 255
+
+# bytes taken by one entry of a list at least, to check a claimed quantity up front
+RUMOR_MIN_SIZE = 8
+DEF_MIN_SIZE = 4 + 6 + 6 + 2 + 2 + 4 + 4 + 1 + 1 + 16
+OBJECT_MIN_SIZE = 3 + 4 + 5
+EVENT_MIN_SIZE = 4 + 4 + 28 + 1 + 1 + 2 + 1 + 17
+TOWN_EVENT_MIN_SIZE = EVENT_MIN_SIZE + 6 + 14 + 4
+
+
+@dataclasses.dataclass
+class Problem:
+    offset: int
+    section: str
+    message: str
+    # of the object in the objects section, for problems in an object body
+    object_index: int | None = None
+
+    def __str__(self) -> str:
+        where = self.section if self.object_index is None else f'object {self.object_index}'
+        return f'offset {self.offset} ({where}): {self.message}'
+
+
+@dataclasses.dataclass
+class VerifyReport:
+    filename: str
+    size: int = 0
+    map_type: str | None = None
+    problems: list[Problem] = dataclasses.field(default_factory=list)
+    # section -> (start, end) offsets of the sections walked
+    sections: dict[str, tuple[int, int]] = dataclasses.field(default_factory=dict)
+    # False when a problem made the rest of the map unreadable
+    complete: bool = True
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+class _Stop(Exception):
+    """The walk cannot go on, the problem is recorded already."""
+
+
+class MapVerifier:
+    def __init__(self, data: bytes, filename: str | pathlib.Path = '<bytes>') -> None:
+        """`data` is a decompressed map."""
+        self.data = data
+        self.size = len(data)
+        self.position = 0
+        self.report = VerifyReport(filename=str(filename), size=self.size)
+        self.map_type = MapType.SOD
+        self.section = 'header'
+        self.object_index: int | None = None
+        self.def_classes: list[int] = []
+        self.def_subclasses: list[int] = []
+
+    def verify(self) -> VerifyReport:
+        start = time.perf_counter()
+        try:
+            for section in MAP_SECTIONS:
+                self.section, section_start = section, self.position
+                try:
+                    getattr(self, f'_walk_{section}')()
+                except (IndexError, struct.error):
+                    self._fatal('unexpected end of data')
+                self.report.sections[section] = (section_start, self.position)
+        except _Stop:
+            self.report.complete = False
+        self.report.seconds = time.perf_counter() - start
+        return self.report
+
+    def _problem(self, message: str, offset: int | None = None) -> None:
+        self.report.problems.append(
+            Problem(
+                self.position if offset is None else offset,
+                self.section,
+                message,
+                self.object_index,
+            )
+        )
+
+    def _fatal(self, message: str, offset: int | None = None) -> None:
+        self._problem(message, offset)
+        raise _Stop
+
+    def _skip(self, n: int) -> None:
+        if self.position + n > self.size:
+            self._fatal(f'{n} bytes needed, {self.size - self.position} left')
+        self.position += n
+
+    def _uint8(self) -> int:
+        value = self.data[self.position]
+        self.position += 1
+        return value
+
+    def _uint16(self) -> int:
+        value = _UINT16.unpack_from(self.data, self.position)[0]
+        self.position += 2
+        return value
+
+    def _uint32(self) -> int:
+        value = _UINT32.unpack_from(self.data, self.position)[0]
+        self.position += 4
+        return value
+
+    def _string(self) -> None:
+        offset = self.position
+        length = self._uint32()
+        if length > self.size - self.position:
+            self._fatal(
+                f'string of {length} bytes, {self.size - self.position} left', offset=offset
+            )
+        self.position += length
+
+    def _quantity(self, quantity: int, min_size: int, what: str, offset: int) -> None:
+        left = self.size - self.position
+        if quantity * min_size > left:
+            self._fatal(
+                f'{quantity} {what} take at least {quantity * min_size} bytes, {left} left',
+                offset=offset,
+            )
+
+    def _enum(self, value: int, allowed: frozenset, what: str, offset: int) -> None:
+        if value not in allowed:
+            self._problem(f'unknown {what} {value}', offset=offset)
+
+    def _color8(self) -> None:
+        offset = self.position
+        self._enum(self._uint8(), COLORS, 'color', offset)
+
+    def _color32(self) -> None:
+        offset = self.position
+        self._enum(self._uint32(), COLORS, 'color', offset)
+
+    # sections, in the order and layout of the `MapParser.read_<section>` readers
+
+    def _walk_header(self) -> None:
+        offset = self.position
+        map_type = self._uint32()
+        if map_type not in MapType:
+            self._fatal(f'unknown map type {map_type}', offset=offset)
+        self.map_type = MapType(map_type)
+        self.report.map_type = self.map_type.name
+        self._skip(1)
+        self.width = self._uint32()
+        self.has_underground = self._uint8()
+        self._string()
+        self._string()
+        self._skip(1 if self.map_type == MapType.ROE else 2)
+
+    def _walk_players_attributes(self) -> None:
+        for _ in PLAYER_COLORS:
+            can_human_play = self._uint8()
+            can_computer_play = self._uint8()
+            if not can_human_play and not can_computer_play:
+                if self.map_type >= MapType.SOD:
+                    self._skip(13)
+                elif self.map_type == MapType.AB:
+                    self._skip(12)
+                else:
+                    self._skip(6)
+                continue
+
+            offset = self.position
+            self._enum(self._uint8(), PLAYSTYLES, 'computer playstyle', offset)
+            if self.map_type >= MapType.SOD:
+                self._skip(1)
+            self._skip(1 if self.map_type == MapType.ROE else 2)
+            self._skip(1)
+            if self._uint8():
+                self._skip(3 if self.map_type == MapType.ROE else 5)
+            self._skip(1)
+            if self._uint8() != 0xFF:
+                self._skip(1)
+                self._string()
+            if self.map_type != MapType.ROE:
+                self._skip(1)
+                hero_count = self._uint8()
+                self._skip(3)
+                for _ in range(hero_count):
+                    self._skip(1)
+                    self._string()
+
+    def _walk_victory_conditions(self) -> None:
+        offset = self.position
+        condition = self._uint8()
+        if condition == 0xFF:
+            return
+        self._skip(2)
+        artifact_size = 1 if self.map_type == MapType.ROE else 2
+        sizes = {
+            0: artifact_size,
+            1: artifact_size + 4,
+            2: 5,
+            3: 5,
+            4: 3,
+            5: 3,
+            6: 3,
+            7: 3,
+            8: 0,
+            9: 0,
+            10: 4,
+        }
+        if condition not in sizes:
+            self._fatal(f'unknown victory condition {condition}', offset=offset)
+        self._skip(sizes[condition])
+
+    def _walk_loss_conditions(self) -> None:
+        offset = self.position
+        condition = self._uint8()
+        sizes = {0: 3, 1: 3, 2: 2, 0xFF: 0}
+        if condition not in sizes:
+            self._fatal(f'unknown loss condition {condition}', offset=offset)
+        self._skip(sizes[condition])
+
+    def _walk_teams(self) -> None:
+        if self._uint8():
+            self._skip(8)
+
+    def _walk_heroes_info(self) -> None:
+        self._skip(16 if self.map_type == MapType.ROE else 20)
+        if self.map_type >= MapType.AB:
+            offset = self.position
+            placeholders = self._uint32()
+            self._quantity(placeholders, 1, 'placeholder heroes', offset)
+            self._skip(placeholders)
+        if self.map_type >= MapType.SOD:
+            for _ in range(self._uint8()):
+                self._skip(2)
+                self._string()
+                self._skip(1)
+        self._skip(31)
+
+    def _walk_artifacts(self) -> None:
+        if self.map_type == MapType.AB:
+            self._skip(17)
+        elif self.map_type >= MapType.SOD:
+            self._skip(18)
+
+    def _walk_spells(self) -> None:
+        if self.map_type >= MapType.SOD:
+            self._skip(9)
+
+    def _walk_abilities(self) -> None:
+        if self.map_type >= MapType.SOD:
+            self._skip(4)
+
+    def _walk_rumors(self) -> None:
+        offset = self.position
+        rumors = self._uint32()
+        self._quantity(rumors, RUMOR_MIN_SIZE, 'rumors', offset)
+        for _ in range(rumors):
+            self._string()
+            self._string()
+
+    def _walk_predefined_heroes(self) -> None:
+        if self.map_type <= MapType.AB:
+            return
+        for _ in range(156):
+            if not self._uint8():
+                continue
+            if self._uint8():
+                self._skip(4)
+            if self._uint8():
+                self._abilities(self._uint32_quantity(2, 'abilities'))
+            self._hero_artifacts()
+            if self._uint8():
+                self._string()
+            self._skip(1)
+            if self._uint8():
+                self._skip(9)
+            if self._uint8():
+                self._skip(4)
+
+    def _walk_terrain(self) -> None:
+        levels = 2 if self.has_underground else 1
+        size = 7 * self.width * self.width * levels
+        if size > self.size - self.position:
+            self._fatal(
+                f'{levels} levels of {self.width}x{self.width} tiles take {size} bytes, '
+                f'{self.size - self.position} left'
+            )
+        self.position += size
+
+    def _walk_def_info(self) -> None:
+        offset = self.position
+        defs = self._uint32()
+        self._quantity(defs, DEF_MIN_SIZE, 'defs', offset)
+        for _ in range(defs):
+            self._string()
+            self._skip(16)
+            offset = self.position
+            object_class = self._uint32()
+            if object_class > MAX_OBJECT_CLASS:
+                self._problem(f'unknown object class {object_class}', offset=offset)
+            self.def_classes.append(object_class)
+            self.def_subclasses.append(self._uint32())
+            self._skip(18)
+
+    def _walk_objects(self) -> None:
+        offset = self.position
+        objects = self._uint32()
+        self._quantity(objects, OBJECT_MIN_SIZE, 'objects', offset)
+        bodies = _BODIES
+        for index in range(objects):
+            self.object_index = index
+            self._skip(3)
+            offset = self.position
+            def_number = self._uint32()
+            if def_number >= len(self.def_classes):
+                self._fatal(f'def {def_number} of {len(self.def_classes)} defs', offset=offset)
+            self._skip(5)
+            body = bodies.get(self.def_classes[def_number])
+            if body is not None:
+                body(self, self.def_subclasses[def_number])
+        self.object_index = None
+
+    def _walk_events(self) -> None:
+        offset = self.position
+        events = self._uint32()
+        self._quantity(events, EVENT_MIN_SIZE, 'events', offset)
+        for _ in range(events):
+            self._timed_event()
+
+    def _walk_trailing_unknown(self) -> None:
+        trailing = self.data[self.position :]
+        if trailing.count(0) != len(trailing):
+            self._problem(f'{len(trailing)} bytes after the events are not padding')
+        self.position = self.size
+
+    # parts of sections and object bodies
+
+    def _uint32_quantity(self, min_size: int, what: str) -> int:
+        offset = self.position
+        quantity = self._uint32()
+        self._quantity(quantity, min_size, what, offset)
+        return quantity
+
+    def _abilities(self, quantity: int) -> None:
+        self._skip(2 * quantity)
+
+    def _artifact_size(self) -> int:
+        return 1 if self.map_type == MapType.ROE else 2
+
+    def _hero_artifacts(self) -> None:
+        if not self._uint8():
+            return
+        slots = 16 + (1 if self.map_type >= MapType.SOD else 0) + 2
+        self._skip(slots * self._artifact_size())
+        self._skip(self._uint16() * self._artifact_size())
+
+    def _creature_set(self, quantity: int) -> None:
+        self._skip(quantity * (4 if self.map_type >= MapType.AB else 3))
+
+    def _message_and_guards(self) -> None:
+        if self._uint8():
+            self._string()
+            if self._uint8():
+                self._creature_set(7)
+            self._skip(4)
+
+    def _timed_event(self, town: bool = False) -> None:
+        self._string()
+        self._string()
+        self._skip(28 + 1)
+        if self.map_type >= MapType.SOD:
+            self._skip(1)
+        self._skip(1 + 2 + 1 + 17)
+        if town:
+            self._skip(6 + 14 + 4)
+
+    def _rewards(self) -> None:
+        # abilities, artifacts, spells and creatures of events and pandora boxes
+        self._abilities(self._uint8())
+        self._skip(self._uint8() * self._artifact_size())
+        self._skip(self._uint8())
+        self._creature_set(self._uint8())
+
+    def _quest(self) -> None:
+        offset = self.position
+        mission_type = self._uint8()
+        if mission_type not in QUESTS:
+            self._fatal(f'unknown quest type {mission_type}', offset=offset)
+        mission = QuestType(mission_type)
+        if mission == QuestType.EMPTY:
+            return
+        if mission in (
+            QuestType.ACHIEVE_LEVEL,
+            QuestType.DEFEAT_HERO,
+            QuestType.DEFEAT_MONSTER,
+            QuestType.ACHIEVE_PRIMARY_SKILL_LEVEL,
+        ):
+            self._skip(4)
+        elif mission == QuestType.BRING_ARTEFACT:
+            self._skip(2 * self._uint8())
+        elif mission == QuestType.BRING_CREATURES:
+            self._skip(4 * self._uint8())
+        elif mission == QuestType.BRING_RESOURCES:
+            self._skip(28)
+        elif mission == QuestType.BE_SPECIFIC_HERO:
+            self._skip(1)
+        elif mission == QuestType.BE_SPECIFIC_COLOR:
+            self._color8()
+        self._skip(4)
+        self._string()
+        self._string()
+        self._string()
+
+    def _event_body(self, subclass: int) -> None:
+        self._message_and_guards()
+        self._skip(4 + 4 + 1 + 1 + 28 + 4)
+        self._rewards()
+        self._skip(8 + 1 + 1 + 1 + 4)
+
+    def _sign_body(self, subclass: int) -> None:
+        self._string()
+        self._skip(4)
+
+    def _hero_body(self, subclass: int) -> None:
+        if self.map_type >= MapType.AB:
+            self._skip(4)
+        self._skip(2)
+        if self._uint8():
+            self._string()
+        if self.map_type < MapType.SOD or self._uint8():
+            self._skip(4)
+        if self._uint8():
+            self._skip(1)
+        if self._uint8():
+            self._abilities(self._uint32_quantity(2, 'abilities'))
+        if self._uint8():
+            self._creature_set(7)
+        self._skip(1)
+        self._hero_artifacts()
+        self._skip(1)
+        if self.map_type >= MapType.AB:
+            if self._uint8():
+                self._string()
+            self._skip(1)
+        if self.map_type >= MapType.SOD:
+            if self._uint8():
+                self._skip(9)
+        elif self.map_type == MapType.AB:
+            self._skip(8)
+        if self.map_type >= MapType.SOD and self._uint8():
+            self._skip(4)
+        self._skip(16)
+
+    def _monster_body(self, subclass: int) -> None:
+        if self.map_type >= MapType.AB:
+            self._skip(4)
+        self._skip(3)
+        if self._uint8():
+            self._string()
+            self._skip(28 + self._artifact_size())
+        self._skip(4)
+
+    def _seer_hut_body(self, subclass: int) -> None:
+        if self.map_type >= MapType.AB:
+            self._quest()
+        else:
+            self._skip(1)
+        offset = self.position
+        reward = self._uint8()
+        if reward not in REWARDS:
+            self._fatal(f'unknown reward type {reward}', offset=offset)
+        reward = RewardType(reward)
+        if reward in (RewardType.EXPERIENCE, RewardType.MANA_POINTS):
+            self._skip(4)
+        elif reward in (RewardType.MORALE_BONUS, RewardType.LUCK_BONUS, RewardType.SPELL):
+            self._skip(1)
+        elif reward == RewardType.RESOURCES:
+            offset = self.position
+            self._enum(self._uint8(), RESOURCES, 'resource', offset)
+            self._skip(4)
+        elif reward in (RewardType.PRIMARY_SKILL, RewardType.ABILITY):
+            self._skip(2)
+        elif reward == RewardType.ARTIFACT:
+            self._skip(self._artifact_size())
+        elif reward == RewardType.CREATURE:
+            self._skip(self._artifact_size() + 2)
+        self._skip(2)
+
+    def _witch_hut_body(self, subclass: int) -> None:
+        if self.map_type >= MapType.AB:
+            self._skip(4)
+
+    def _scholar_body(self, subclass: int) -> None:
+        self._skip(8)
+
+    def _garrison_body(self, subclass: int) -> None:
+        self._color8()
+        self._skip(3)
+        self._creature_set(7)
+        if self.map_type >= MapType.AB:
+            self._skip(1)
+        self._skip(8)
+
+    def _spell_scroll_body(self, subclass: int) -> None:
+        self._message_and_guards()
+        self._skip(4)
+
+    def _artifact_body(self, subclass: int) -> None:
+        self._message_and_guards()
+
+    def _resource_body(self, subclass: int) -> None:
+        self._message_and_guards()
+        self._skip(8)
+
+    def _resource_with_type_body(self, subclass: int) -> None:
+        self._enum(subclass, RESOURCES, 'resource', self.position)
+        self._resource_body(subclass)
+
+    def _town_body(self, subclass: int) -> None:
+        if self.map_type >= MapType.AB:
+            self._skip(4)
+        self._color8()
+        if self._uint8():
+            self._string()
+        if self._uint8():
+            self._creature_set(7)
+        self._skip(1)
+        self._skip(12 if self._uint8() else 1)
+        self._skip(18 if self.map_type >= MapType.AB else 9)
+        for _ in range(self._uint32_quantity(TOWN_EVENT_MIN_SIZE, 'town events')):
+            self._timed_event(town=True)
+        self._skip(4 if self.map_type >= MapType.SOD else 3)
+
+    def _mine_body(self, subclass: int) -> None:
+        if subclass == 7:
+            self._abandoned_mine_body(subclass)
+            return
+        self._owner_body(subclass)
+
+    def _abandoned_mine_body(self, subclass: int) -> None:
+        self._skip(4)
+
+    def _owner_body(self, subclass: int) -> None:
+        # mines and creature generators
+        self._color8()
+        self._skip(3)
+
+    def _shrine_body(self, subclass: int) -> None:
+        self._skip(4)
+
+    def _pandora_box_body(self, subclass: int) -> None:
+        self._message_and_guards()
+        self._skip(4 + 4 + 1 + 1 + 28 + 4)
+        self._rewards()
+        self._skip(8)
+
+    def _grail_body(self, subclass: int) -> None:
+        self._skip(4)
+
+    def _random_dwelling_body(self, subclass: int) -> None:
+        self._random_dwelling_lvl_body(subclass)
+        self._skip(2)
+
+    def _random_dwelling_lvl_body(self, subclass: int) -> None:
+        self._color32()
+        if not self._uint32():
+            self._skip(2)
+
+    def _random_dwelling_faction_body(self, subclass: int) -> None:
+        self._color32()
+        self._skip(2)
+
+    def _quest_guard_body(self, subclass: int) -> None:
+        self._quest()
+
+    def _color32_body(self, subclass: int) -> None:
+        # shipyards and lighthouses
+        self._color32()
+
+    def _hero_placeholder_body(self, subclass: int) -> None:
+        self._color8()
+        if self._uint8() == 0xFF:
+            self._skip(1)
+
+
+def _bodies() -> dict:
+    """Walker of the object body per object class, the branches of `MapParser.read_object`."""
+    walker = MapVerifier
+    groups = {
+        walker._event_body: (ObjectType.EVENT,),
+        walker._sign_body: (ObjectType.SIGN, ObjectType.OCEAN_BOTTLE),
+        walker._hero_body: (ObjectType.HERO, ObjectType.RANDOM_HERO, ObjectType.PRISON),
+        walker._monster_body: (
+            ObjectType.MONSTER,
+            ObjectType.RANDOM_MONSTER,
+            ObjectType.RANDOM_MONSTER_L1,
+            ObjectType.RANDOM_MONSTER_L2,
+            ObjectType.RANDOM_MONSTER_L3,
+            ObjectType.RANDOM_MONSTER_L4,
+            ObjectType.RANDOM_MONSTER_L5,
+            ObjectType.RANDOM_MONSTER_L6,
+            ObjectType.RANDOM_MONSTER_L7,
+        ),
+        walker._seer_hut_body: (ObjectType.SEER_HUT,),
+        walker._witch_hut_body: (ObjectType.WITCH_HUT,),
+        walker._scholar_body: (ObjectType.SCHOLAR,),
+        walker._garrison_body: (ObjectType.GARRISON_HORIZONTAL, ObjectType.GARRISON_VERTICAL),
+        walker._spell_scroll_body: (ObjectType.SPELL_SCROLL,),
+        walker._artifact_body: (
+            ObjectType.ARTIFACT,
+            ObjectType.RANDOM_ART,
+            ObjectType.RANDOM_TREASURE_ART,
+            ObjectType.RANDOM_MINOR_ART,
+            ObjectType.RANDOM_MAJOR_ART,
+            ObjectType.RANDOM_RELIC_ART,
+        ),
+        walker._resource_with_type_body: (ObjectType.RESOURCE,),
+        walker._resource_body: (ObjectType.RANDOM_RESOURCE,),
+        walker._town_body: (ObjectType.TOWN, ObjectType.RANDOM_TOWN),
+        walker._abandoned_mine_body: (ObjectType.ABANDONED_MINE,),
+        walker._mine_body: (ObjectType.MINE,),
+        walker._owner_body: (
+            ObjectType.CREATURE_GENERATOR1,
+            ObjectType.CREATURE_GENERATOR2,
+            ObjectType.CREATURE_GENERATOR3,
+            ObjectType.CREATURE_GENERATOR4,
+        ),
+        walker._shrine_body: (
+            ObjectType.SHRINE_OF_MAGIC_INCANTATION,
+            ObjectType.SHRINE_OF_MAGIC_GESTURE,
+            ObjectType.SHRINE_OF_MAGIC_THOUGHT,
+        ),
+        walker._pandora_box_body: (ObjectType.PANDORA_BOX,),
+        walker._grail_body: (ObjectType.GRAIL,),
+        walker._random_dwelling_body: (ObjectType.RANDOM_DWELLING,),
+        walker._random_dwelling_lvl_body: (ObjectType.RANDOM_DWELLING_LVL,),
+        walker._random_dwelling_faction_body: (ObjectType.RANDOM_DWELLING_FACTION,),
+        walker._quest_guard_body: (ObjectType.QUEST_GUARD,),
+        walker._color32_body: (ObjectType.SHIPYARD, ObjectType.LIGHTHOUSE),
+        walker._hero_placeholder_body: (ObjectType.HERO_PLACEHOLDER,),
+    }
+    return {int(object_type): body for body, types in groups.items() for object_type in types}
+
+
+_BODIES = _bodies()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Check the structure of maps without parsing')
+    parser.add_argument('paths', nargs='+', type=pathlib.Path, help='maps or directories')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    from map_processors.base import MapParser
+
+    paths = []
+    for path in args.paths:
+        paths.extend(sorted(path.rglob('*.h3m')) if path.is_dir() else [path])
+
+    failed = 0
+    for path in paths:
+        try:
+            report = MapParser(path).verify()
+        except (OSError, EOFError) as e:
+            failed += 1
+            sys.stdout.write(f'{path}: {type(e).__name__}: {e}\n')
+            continue
+        if report.ok:
+            sys.stdout.write(f'{path}: ok ({report.seconds * 1000:.1f} ms)\n')
+            continue
+        failed += 1
+        for problem in report.problems:
+            sys.stdout.write(f'{path}: {problem}\n')
+    logger.info('%d of %d maps have problems', failed, len(paths))
+    return 0 if not failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Opt-in cache of serialized sections and objects for writing several variants of one map.
+
+Enabled with `MapWriter(..., cache=WriteCache())`, the same cache passed to the writer of
+every variant. A section is looked up by the identity of the structure fields it is
+written from (`SECTION_FIELDS`), an object by its own identity; both also by the encoding
+and map type of the writer. Only what changed is serialized again:
+
+    cache = WriteCache()
+    for language, translations in variants.items():
+        translated = translate_copy(structure, translations)
+        MapWriter(translated, encoding, cache=cache).write_to_file(f'{language}.h3m')
+
+Entries are keyed by identity, so models must not be modified in place once written:
+`translations.translate_copy` copies the changed models and shares the others. The cache
+keeps the models it was written from alive, drop it when the variants are written.
+"""
+
+import dataclasses
+import operator
+
+# structure fields (or attribute paths) each section of `MAP_SECTIONS` is written from
+SECTION_FIELDS = {
+    'header': ('header',),
+    'players_attributes': ('players_attributes',),
+    'victory_conditions': ('victory',),
+    'loss_conditions': ('loss',),
+    'teams': ('teams',),
+    'heroes_info': (
+        'allowed_heroes_info',
+        'placeholder_heroes',
+        'configured_heroes',
+        'heroes_info_unknown',
+    ),
+    'artifacts': ('artifacts',),
+    'spells': ('allowed_spells_bytes',),
+    'abilities': ('allowed_hero_abilities_bytes',),
+    'rumors': ('rumors',),
+    'predefined_heroes': ('predefined_heroes',),
+    # not the whole header: it changes with a translated map name
+    'terrain': ('header.has_underground', 'terrain'),
+    'def_info': ('def_objects',),
+    'objects': ('objects',),
+    'events': ('events',),
+    'trailing_unknown': ('trailing_unknown',),
+}
+
+SECTION_SOURCES = {
+    section: tuple(map(operator.attrgetter, fields)) for section, fields in SECTION_FIELDS.items()
+}
+
+_IMMUTABLE = (str, int, float, bool, bytes, type(None))
+
+
+def source_key(sources: tuple) -> tuple:
+    """Equal scalars are interchangeable, containers and models only when identical."""
+    return tuple(value if isinstance(value, _IMMUTABLE) else id(value) for value in sources)
+
+
+@dataclasses.dataclass
+class CachedChunk:
+    # the values the bytes were written from
+    sources: tuple
+    data: bytes
+    strings: int = 0
+    string_fallbacks: int = 0
+
+    def written_from(self, sources: tuple) -> bool:
+        # an id is reused once its object is gone, keeping the sources rules that out
+        return all(
+            kept is value or isinstance(value, _IMMUTABLE)
+            for kept, value in zip(self.sources, sources)
+        )
+
+
+class WriteCache:
+    def __init__(self) -> None:
+        self._tables: dict[tuple, dict] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(len(chunks) for chunks in self._tables.values())
+
+    def table(self, *kind) -> dict:
+        """Chunks of one kind ('section', 'object') written with one encoding and map type."""
+        return self._tables.setdefault(kind, {})
+
+    def clear(self) -> None:
+        self._tables.clear()
@@ -1,8 +1,13 @@
 import base64
+import collections
 import gzip
 import logging
 import pathlib
+import time
 
+from map_processors import tracing
+from map_processors.compact import CompactModel
+from map_processors.constants import MAP_SECTIONS
 from map_processors.enums import (
     ColorEnum,
     ComputerPlaystyleEnum,
@@ -12,7 +17,10 @@ from map_processors.enums import (
     RewardType,
 )
 from map_processors.exceptions import H3MapWriterException
+from map_processors.layout import MapLayout
 from map_processors.schemas import GameMapStructure, PredefinedHeroNonConfigured
+from map_processors.stats import ParseStats, SectionStats
+from map_processors.write_cache import SECTION_SOURCES, CachedChunk, WriteCache, source_key
 
 logger = logging.getLogger(__name__)
 
@@ -23,11 +31,22 @@ class MapWriter:
         structure: GameMapStructure,
         encoding: str = 'cp1251',
         fallback_encoding: str | None = 'cp1251',
+        collect_stats: bool = False,
+        record_layout: bool = False,
+        cache: WriteCache | None = None,
     ) -> None:
         self.structure = structure
         self.encoding = encoding
         self.fallback_encoding = fallback_encoding
         self._buffer = bytearray()
+        self.string_count = 0
+        self.string_fallback_count = 0
+        self.collect_stats = collect_stats
+        self.stats: ParseStats | None = None
+        self.record_layout = record_layout
+        self.layout: MapLayout | None = None
+        # shared by the writers of several variants of one map, see write_cache
+        self.cache = cache
 
         map_type_value = structure.header.map_type
         if map_type_value == MapType.ROE.value:
@@ -94,10 +113,12 @@ class MapWriter:
         self._buffer += decoded
 
     def write_string(self, value: str) -> None:
+        self.string_count += 1
         try:
             encoded = value.encode(self.encoding)
         except UnicodeEncodeError:
             if self.fallback_encoding and self.fallback_encoding != self.encoding:
+                self.string_fallback_count += 1
                 encoded = value.encode(self.fallback_encoding)
             else:
                 raise
@@ -353,11 +374,21 @@ class MapWriter:
 
     def write_objects(self) -> None:
         self.write_uint32(len(self.structure.objects))
+        chunks = None if self.cache is None else self._cache_table('object')
         for obj in self.structure.objects:
-            self.write_coordinates(obj.coordinates)
-            self.write_uint32(obj.object_number)
-            self._write_unknown(obj.pre_body_unknown, 5)
-            self._dispatch_object_body(obj)
+            object_start = len(self._buffer)
+            if chunks is None:
+                self._write_object(obj)
+            else:
+                self._write_cached(chunks, id(obj), (obj,), lambda: self._write_object(obj))
+            if self.layout is not None:
+                self.layout.add_object(object_start, len(self._buffer))
+
+    def _write_object(self, obj) -> None:
+        self.write_coordinates(obj.coordinates)
+        self.write_uint32(obj.object_number)
+        self._write_unknown(obj.pre_body_unknown, 5)
+        self._dispatch_object_body(obj)
 
     def _dispatch_object_body(self, obj) -> None:
         oc = obj.object_class
@@ -929,31 +960,135 @@ class MapWriter:
             self.write_uint8(event.next_occurrence)
             self.write_base64_bytes(event.unknown, 17)
 
-    def write(self) -> bytes:
-        self._buffer = bytearray()
-        self.write_header()
-        self.write_players_attributes()
-        self.write_victory_conditions()
-        self.write_loss_conditions()
-        self.write_teams()
-        self.write_heroes_info()
-        self.write_artifacts()
-        self.write_spells()
-        self.write_abilities()
-        self.write_rumors()
-        self.write_predefined_heroes()
-        self.write_terrain()
-        self.write_def_info()
-        self.write_objects()
-        self.write_events()
+    def write_trailing_unknown(self) -> None:
         if self.structure.trailing_unknown:
             self._buffer += base64.b64decode(self.structure.trailing_unknown)
-        return bytes(self._buffer)
+
+    def _write_section(self, section: str) -> None:
+        start_size = len(self._buffer)
+        write = getattr(self, f'write_{section}')
+        with tracing.span(section, 'section'):
+            # a cached objects section has no object offsets, write it object by object
+            if self.cache is None or (section == 'objects' and self.layout is not None):
+                write()
+            else:
+                sources = tuple(source(self.structure) for source in SECTION_SOURCES[section])
+                chunks = self._cache_table('section')
+                self._write_cached(chunks, (section, *source_key(sources)), sources, write)
+        if self.layout is not None:
+            self.layout.add_section(section, start_size, len(self._buffer))
+
+    def _cache_table(self, kind: str) -> dict:
+        return self.cache.table(kind, self.encoding, self.fallback_encoding, self.map_type)
+
+    def _write_cached(self, chunks: dict, key, sources: tuple, write) -> None:
+        """Append the cached bytes written from `sources`, or `write()` them and cache them."""
+        chunk = chunks.get(key)
+        if chunk is not None and chunk.written_from(sources):
+            self.cache.hits += 1
+            self._buffer += chunk.data
+            self.string_count += chunk.strings
+            self.string_fallback_count += chunk.string_fallbacks
+            return
+        self.cache.misses += 1
+        start_size = len(self._buffer)
+        start_strings = self.string_count
+        start_fallbacks = self.string_fallback_count
+        write()
+        chunks[key] = CachedChunk(
+            sources,
+            bytes(self._buffer[start_size:]),
+            self.string_count - start_strings,
+            self.string_fallback_count - start_fallbacks,
+        )
+
+    def _write_section_with_stats(self, section: str) -> None:
+        start_size = len(self._buffer)
+        start_strings = self.string_count
+        start_fallbacks = self.string_fallback_count
+        start = time.perf_counter()
+
+        self._write_section(section)
+
+        section_stats = SectionStats(
+            name=section,
+            seconds=time.perf_counter() - start,
+            bytes=len(self._buffer) - start_size,
+            strings=self.string_count - start_strings,
+            string_fallbacks=self.string_fallback_count - start_fallbacks,
+            string_errors=None,
+        )
+        if section == 'objects':
+            by_class = collections.Counter(obj.object_class for obj in self.structure.objects)
+            section_stats.by_class = dict(by_class.most_common())
+        section_stats.items = self._section_items_quantity(section)
+        self.stats.add(section_stats)
+
+    def _section_items_quantity(self, section: str) -> int:
+        structure = self.structure
+        if section == 'terrain':
+            tiles = len(structure.terrain.surface)
+            if structure.header.has_underground:
+                tiles += len(structure.terrain.underground)
+            return tiles
+        if section == 'def_info':
+            return len(structure.def_objects)
+        if section == 'heroes_info':
+            return len(structure.configured_heroes)
+        if section == 'predefined_heroes':
+            return sum(
+                1 for hero in structure.predefined_heroes.values() if not _is_empty_predefined(hero)
+            )
+        if section == 'players_attributes':
+            return sum(
+                1
+                for player in structure.players_attributes
+                if player.can_human_play or player.can_computer_play
+            )
+        if section in ('rumors', 'objects', 'events'):
+            return len(getattr(structure, section))
+        return 0
+
+    def write(self) -> bytes:
+        self._buffer = bytearray()
+        self.layout = MapLayout() if self.record_layout else None
+        with tracing.span('write', 'stage'):
+            if self.collect_stats:
+                self.stats = ParseStats(direction='write')
+                for section in MAP_SECTIONS:
+                    self._write_section_with_stats(section)
+                self.stats.log(logger, logging.DEBUG)
+            else:
+                for section in MAP_SECTIONS:
+                    self._write_section(section)
+            data = bytes(self._buffer)
+            if self.layout is not None:
+                self.layout.compute_digests(data)
+            return data
+
+    def section_bytes(self, section: str) -> bytes:
+        """Serialized `section` of `MAP_SECTIONS` alone, as it is written in the map."""
+        return self._write_detached(getattr(self, f'write_{section}'))
+
+    def object_bytes(self, obj) -> bytes:
+        """Serialized `obj` alone, as it is written in the objects section."""
+        return self._write_detached(lambda: self._write_object(obj))
+
+    def _write_detached(self, write) -> bytes:
+        buffer, self._buffer = self._buffer, bytearray()
+        try:
+            write()
+            return bytes(self._buffer)
+        finally:
+            self._buffer = buffer
 
     def write_to_file(self, path: str | pathlib.Path) -> None:
-        data = self.write()
-        with gzip.open(path, 'wb') as f:
-            f.write(data)
+        with tracing.span('write_to_file', 'map', filename=str(path)):
+            data = self.write()
+            if self.stats is not None:
+                self.stats.filename = str(path)
+            with tracing.span('gzip', 'stage'), gzip.open(path, 'wb') as f:
+                f.write(data)
 
 
 def _playstyle_to_value(name: str | None) -> int:
@@ -963,4 +1098,6 @@ def _playstyle_to_value(name: str | None) -> int:
 
 
 def _is_empty_predefined(hero) -> bool:
+    if isinstance(hero, CompactModel):
+        return hero.__model__ is PredefinedHeroNonConfigured
     return isinstance(hero, PredefinedHeroNonConfigured)
@@ -0,0 +1,42 @@
+import collections
+import gzip
+
+import pytest
+
+from map_processors.base import MapParser
+from map_processors.constants import MAP_SECTIONS
+from map_processors.exceptions import H3MapParserException
+from map_processors.schemas import GameMapStructure, TerrainTile
+
+
+def test_structure_equals_validated_raw_data(test_map, test_map_path):
+    structure, _ = test_map
+    parser = MapParser(str(test_map_path))
+    parser.detect_encoding_by_header()
+    parser.data = collections.OrderedDict()
+    for section in MAP_SECTIONS:
+        parser._read_section(section)
+
+    assert isinstance(parser.data['terrain']['surface'][0], dict)
+    validated = GameMapStructure.model_validate(parser.data)
+    assert structure == validated
+    assert structure.model_dump() == validated.model_dump()
+    assert type(structure.terrain.surface[0]) is TerrainTile
+    assert structure.terrain.model_dump(exclude_unset=True) == validated.terrain.model_dump(
+        exclude_unset=True
+    )
+    assert [type(obj) for obj in structure.objects] == [type(obj) for obj in validated.objects]
+
+
+def test_truncated_terrain_raises_parser_exception(test_map_path):
+    with gzip.open(test_map_path, 'rb') as f:
+        data = f.read()
+    parser = MapParser(str(test_map_path))
+    parser.detect_encoding_by_header()
+    parser.data = collections.OrderedDict()
+    for section in MAP_SECTIONS[: MAP_SECTIONS.index('terrain')]:
+        parser._read_section(section)
+
+    truncated = MapParser.from_bytes(data[: parser._cursor_position + 100], test_map_path)
+    with pytest.raises(H3MapParserException, match='terrain'):
+        truncated.get_structured_data()
@@ -0,0 +1,42 @@
+from map_processors.benchmark import compare_with_baseline
+
+
+def _results(median: float, peak_bytes: int) -> dict:
+    return {
+        'maps': {
+            'map.h3m': {
+                'parse.terrain': {'min': median, 'median': median, 'max': median},
+                'memory.parse': {'peak_bytes': peak_bytes},
+            }
+        }
+    }
+
+
+def test_compare_with_baseline_within_threshold():
+    baseline = _results(median=1.0, peak_bytes=1000)
+    current = _results(median=1.1, peak_bytes=1100)
+
+    regressions = compare_with_baseline(current, baseline, threshold=0.15)
+
+    assert regressions == []
+
+
+def test_compare_with_baseline_reports_slower_and_hungrier_cases():
+    baseline = _results(median=1.0, peak_bytes=1000)
+    current = _results(median=1.5, peak_bytes=2000)
+
+    regressions = compare_with_baseline(current, baseline, threshold=0.15)
+
+    assert {(r['case'], r['metric']) for r in regressions} == {
+        ('parse.terrain', 'median'),
+        ('memory.parse', 'peak_bytes'),
+    }
+
+
+def test_compare_with_baseline_ignores_unknown_cases():
+    baseline = {'maps': {}}
+    current = _results(median=1.5, peak_bytes=2000)
+
+    regressions = compare_with_baseline(current, baseline)
+
+    assert regressions == []
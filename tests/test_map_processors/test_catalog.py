@@ -0,0 +1,60 @@
+import gzip
+import os
+import shutil
+
+from map_processors.catalog import MapCatalog, RefreshResult
+
+
+def test_catalog_refresh_is_incremental(test_map_path, tmp_path, monkeypatch):
+    maps = tmp_path / 'maps'
+    (maps / 'nested').mkdir(parents=True)
+    shutil.copy(test_map_path, maps / 'a.h3m')
+    shutil.copy(test_map_path, maps / 'nested' / 'b.h3m')
+    (maps / 'broken.h3m').write_bytes(gzip.compress(b'\x00' * 16))
+
+    with MapCatalog(tmp_path / 'catalog.sqlite') as catalog:
+        assert catalog.refresh(maps) == RefreshResult(added=2, failed=1)
+        entry = catalog.get(maps / 'a.h3m')
+        assert (entry['encoding'], entry['size'], entry['map_type']) == ('GB18030', 144, 'SOD')
+        assert entry['players'] == 8
+        assert catalog.get(maps / 'broken.h3m')['error'].startswith('H3MapParserException')
+
+        read = []
+        monkeypatch.setattr('map_processors.catalog.read_map_header', read.append)
+        stat = (maps / 'a.h3m').stat()
+        os.utime(maps / 'a.h3m', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        (maps / 'nested' / 'b.h3m').unlink()
+
+        assert catalog.refresh(maps) == RefreshResult(unchanged=2, removed=1)
+        assert read == []
+        assert len(catalog) == 2
+
+
+def test_catalog_search(test_map_path, tmp_path):
+    shutil.copy(test_map_path, tmp_path / 'a.h3m')
+
+    with MapCatalog(tmp_path / 'catalog.sqlite') as catalog:
+        catalog.refresh(tmp_path / 'a.h3m')
+
+        assert [entry['path'] for entry in catalog.search('英雄', size=144)] == [
+            str(tmp_path / 'a.h3m')
+        ]
+        assert catalog.search(has_underground=False) == []
+        assert catalog.search(min_players=9) == []
+        assert catalog.search('100%') == []
+
+
+def test_catalog_records_unreadable_files(test_map_path, tmp_path):
+    maps = tmp_path / 'maps'
+    maps.mkdir()
+    shutil.copy(test_map_path, maps / 'a.h3m')
+    (maps / 'not_gzip.h3m').write_bytes(b'not a gzip file at all')
+    (maps / 'truncated.h3m').write_bytes(test_map_path.read_bytes()[:200])
+    # listed by the scan, fails when hashed
+    (maps / 'directory.h3m').mkdir()
+
+    with MapCatalog(tmp_path / 'catalog.sqlite') as catalog:
+        assert catalog.refresh(maps) == RefreshResult(added=1, failed=3)
+        assert catalog.get(maps / 'not_gzip.h3m')['error'].startswith('BadGzipFile')
+        assert catalog.get(maps / 'truncated.h3m')['error'].startswith('EOFError')
+        assert catalog.get(maps / 'directory.h3m')['error'].startswith('IsADirectoryError')
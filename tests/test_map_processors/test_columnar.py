@@ -0,0 +1,60 @@
+import collections
+
+import pytest
+
+from map_processors.base import MapParser
+from map_processors.columnar import COLUMNS, ObjectTable
+
+
+@pytest.fixture(scope='module')
+def object_table(test_map):
+    structure, _ = test_map
+    return ObjectTable.from_structure(structure)
+
+
+def test_parser_builds_same_table_as_structure(test_map_path, object_table):
+    parser = MapParser(str(test_map_path))
+    table = parser.get_object_table()
+
+    # terrain is skipped and objects go straight into the columns
+    assert list(parser.data) == ['header', 'def']
+    assert len(table) == 17401
+    assert table.classes == object_table.classes
+    assert all(getattr(table, column) == getattr(object_table, column) for column in COLUMNS)
+
+
+def test_select_matches_model_attributes(test_map, object_table):
+    structure, _ = test_map
+
+    red_towns = object_table.select(object_class='town', owner='red')
+    big_stacks = object_table.select(
+        object_class='monster', quantity=lambda quantity: quantity > 100
+    )
+
+    assert list(red_towns) == [
+        index
+        for index, map_object in enumerate(structure.objects)
+        if map_object.object_class == 'town' and map_object.owner == 'red'
+    ]
+    assert list(big_stacks) == [
+        index
+        for index, map_object in enumerate(structure.objects)
+        if map_object.object_class == 'monster' and map_object.quantity > 100
+    ]
+
+
+def test_count_by(test_map, object_table):
+    structure, _ = test_map
+    towns = object_table.select(object_class={'town'})
+
+    assert object_table.count_by('object_class') == collections.Counter(
+        map_object.object_class for map_object in structure.objects
+    )
+    assert object_table.count_by('owner', rows=towns) == collections.Counter(
+        structure.objects[index].owner for index in towns
+    )
+
+
+def test_select_rejects_unknown_column(object_table):
+    with pytest.raises(ValueError):
+        object_table.select(colour='red')
@@ -0,0 +1,70 @@
+import pickle
+
+import pytest
+
+from map_processors.base import MapParser
+from map_processors.compact import CompactModel, compact_class, from_raw, to_compact
+from map_processors.schemas import MapTown, Resources, TerrainTile
+from map_processors.writer import MapWriter
+
+
+@pytest.fixture(scope='module')
+def compact_map(test_map_path):
+    parser = MapParser(str(test_map_path))
+    return parser.get_compact_data(), parser
+
+
+def test_compact_records_have_slots_only():
+    tile = compact_class(TerrainTile)
+
+    assert tile.__slots__ == tuple(TerrainTile.model_fields)
+    assert not hasattr(object.__new__(tile), '__dict__')
+
+
+def test_compact_data_converts_to_parsed_model(test_map, compact_map):
+    structure, _ = test_map
+    compact, _ = compact_map
+
+    assert compact.to_model() == structure
+    assert to_compact(structure) == compact
+
+
+def test_writer_accepts_compact_data(compact_map):
+    compact, parser = compact_map
+
+    assert MapWriter(compact, encoding=parser.encoding).write() == bytes(parser.map_binary)
+
+
+def test_compact_records_pickle(compact_map):
+    compact, _ = compact_map
+
+    assert pickle.loads(pickle.dumps(compact)) == compact
+
+
+def test_defaults_are_not_shared():
+    first = from_raw(MapTown, _town())
+    second = from_raw(MapTown, _town())
+
+    first.events.append('event')
+
+    assert second.events == []
+    assert first.garrison is None
+
+
+def test_from_raw_fills_nested_defaults():
+    resources = from_raw(Resources, {'gold': 5})
+
+    assert isinstance(resources, CompactModel)
+    assert (resources.gold, resources.wood) == (5, 0)
+
+
+def _town() -> dict:
+    return {
+        'object_class': 'town',
+        'object_subclass': 0,
+        'object_number': 0,
+        'coordinates': [1, 2, 0],
+        'owner': 'red',
+        'formation': 0,
+        'possible_spells': '0' * 72,
+    }
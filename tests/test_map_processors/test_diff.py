@@ -0,0 +1,77 @@
+import pytest
+
+from map_processors.diff import diff
+
+
+@pytest.fixture
+def modified_map(test_map):
+    structure, _ = test_map
+    return structure.model_copy(deep=True)
+
+
+def test_diff_of_identical_maps_is_empty(test_map, modified_map):
+    structure, _ = test_map
+
+    assert not diff(structure, modified_map)
+
+
+def test_diff_reports_header_terrain_and_event_changes(test_map, modified_map):
+    structure, _ = test_map
+    width = structure.header.width
+    modified_map.header.map_name = 'Renamed'
+    for index in (width + 3, width + 4, 5 * width):
+        modified_map.terrain.surface[index].terrain_type ^= 1
+    modified_map.events[0].message = 'Changed'
+
+    map_diff = diff(structure, modified_map)
+
+    assert [(change.path, change.new) for change in map_diff.fields] == [
+        ('header.map_name', 'Renamed')
+    ]
+    assert len(map_diff.terrain) == 1
+    assert map_diff.terrain[0].changed_tiles == 3
+    assert map_diff.terrain[0].masks == {1: 0b11000, 5: 0b1}
+    assert map_diff.terrain[0].runs == [(1, 3, 5), (5, 0, 1)]
+    assert [change.path for change in map_diff.events] == ['events[0].message']
+    assert not map_diff.objects_modified
+
+
+def test_diff_terrain_with_values_out_of_byte_range_and_missing_tiles(test_map, modified_map):
+    structure, _ = test_map
+    width = structure.header.width
+    underground = modified_map.terrain.underground
+    underground[2].view = 1000
+    del underground[-2:]
+
+    (change,) = diff(structure, modified_map).terrain
+
+    assert change.level == 'underground'
+    assert change.changed_tiles == 3
+    assert change.masks == {0: 0b100, width - 1: 0b11 << width - 2}
+    assert change.runs == [(0, 2, 3), (width - 1, width - 2, width)]
+
+
+def test_diff_matches_objects_by_coordinates_and_def(test_map, modified_map):
+    structure, _ = test_map
+    x, y, z = modified_map.objects[10].coordinates
+    modified_map.objects[10].coordinates = (x, y + 1, z)
+    del modified_map.objects[30]
+    modified_map.objects[40].pre_body_unknown = 'AQEBAQE='
+
+    map_diff = diff(structure, modified_map)
+
+    assert [change.old_index for change in map_diff.objects_removed] == [10, 30]
+    assert [change.coordinates for change in map_diff.objects_added] == [(x, y + 1, z)]
+    # shifted by the removed object
+    assert [change.old_index for change in map_diff.objects_modified] == [41]
+    assert [field.path for field in map_diff.objects_modified[0].changes] == ['pre_body_unknown']
+
+
+def test_diff_ignores_reordered_defs(test_map, modified_map):
+    structure, _ = test_map
+    defs_quantity = len(modified_map.def_objects)
+    modified_map.def_objects.reverse()
+    for map_object in modified_map.objects:
+        map_object.object_number = defs_quantity - 1 - map_object.object_number
+
+    assert not diff(structure, modified_map)
@@ -0,0 +1,57 @@
+import gzip
+
+from map_processors.base import MapParser
+from map_processors.editing import EditableMap
+from map_processors.writer import MapWriter
+
+
+def _assert_matches_full_write(editable: EditableMap) -> None:
+    writer = MapWriter(editable.structure, encoding=editable.encoding, record_layout=True)
+    assert editable.binary == writer.write()
+    assert editable.layout.size == writer.layout.size
+    spliced = [*editable.layout.sections.values(), *editable.layout.objects]
+    written = [*writer.layout.sections.values(), *writer.layout.objects]
+    assert [(span.start, span.end) for span in spliced] == [
+        (span.start, span.end) for span in written
+    ]
+    # digests of ranges around a spliced one are dropped, the others are kept
+    assert all(span.digest in ('', other.digest) for span, other in zip(spliced, written))
+
+
+def test_saving_edits_splices_dirty_objects(test_map_path, tmp_path):
+    editable = EditableMap.open(test_map_path)
+    objects = editable.structure.objects
+    monster = next(index for index, obj in enumerate(objects) if obj.object_class == 'monster')
+    town = next(index for index, obj in enumerate(objects) if obj.object_class == 'town')
+
+    objects[monster] = objects[monster].model_copy(update={'quantity': 1234})
+    objects[town].name = 'A much longer town name than the original one'
+    editable.mark_dirty(town)
+    assert editable.dirty_objects() == sorted((monster, town))
+    editable.save(tmp_path / 'edited.h3m')
+
+    _assert_matches_full_write(editable)
+    assert editable.dirty_objects() == []
+    with gzip.open(tmp_path / 'edited.h3m') as f:
+        assert f.read() == editable.binary
+    edited = MapParser(tmp_path / 'edited.h3m').get_structured_data()
+    assert edited.objects[monster].quantity == 1234
+    assert edited.objects[town].name == 'A much longer town name than the original one'
+
+    # the spliced map and layout are the base of the next save
+    editable.structure.header.map_name = 'Renamed'
+    editable.mark_section_dirty('header')
+    objects[-1] = objects[-1].model_copy()
+    editable.to_bytes()
+    _assert_matches_full_write(editable)
+
+
+def test_added_object_falls_back_to_full_write(test_map_path):
+    editable = EditableMap.open(test_map_path)
+    objects = editable.structure.objects
+    objects.append(objects[0].model_copy())
+
+    data = editable.to_bytes()
+
+    assert data == MapWriter(editable.structure, encoding=editable.encoding).write()
+    assert len(editable.layout.objects) == len(objects)
@@ -0,0 +1,43 @@
+import json
+
+from map_processors.fuzz import Fuzzer, synthetic_seeds
+from map_processors.verify import MapVerifier
+
+
+def test_fuzzing_is_reproducible_from_seed(tmp_path):
+    seeds = synthetic_seeds(1, seed=3)
+    runs = []
+    for corpus in (tmp_path / 'first', tmp_path / 'second'):
+        # slow inputs depend on the machine, not on the seed
+        fuzzer = Fuzzer(corpus, seeds, seed=5, slow_factor=float('inf'))
+        stats = fuzzer.run(60)
+        runs.append(fuzzer)
+
+        assert stats.iterations == 60
+        assert stats.passed + stats.rejected + stats.crashes <= 60 + len(seeds)
+        assert stats.lines > 0
+        assert stats.queue == len(list((corpus / 'queue').glob('*.h3m'))) + len(seeds)
+
+    first, second = runs
+    assert [entry.data for entry in first.queue] == [entry.data for entry in second.queue]
+    assert [(f.kind, f.mutation, f.message) for f in first.findings] == [
+        (f.kind, f.mutation, f.message) for f in second.findings
+    ]
+    # the saved queue is loaded again as seeds
+    assert len(Fuzzer(tmp_path / 'first', seeds).queue) == len(first.queue)
+
+
+def test_crashes_are_recorded_once_per_signature(tmp_path):
+    data = bytearray(synthetic_seeds(1)[0])
+    players = MapVerifier(bytes(data)).verify().sections['players_attributes'][0]
+    # computer playstyle of the first player, an active one
+    data[players + 2] = 0x42
+    fuzzer = Fuzzer(tmp_path, [bytes(data), bytes(data)])
+
+    fuzzer.run(0)
+
+    assert [(f.kind, f.mutation) for f in fuzzer.findings] == [('crash', 'seed')]
+    assert 'ComputerPlaystyleEnum' in fuzzer.findings[0].message
+    assert len(list((tmp_path / 'crashes').glob('*.h3m'))) == 1
+    lines = (tmp_path / 'findings.jsonl').read_text().splitlines()
+    assert [json.loads(line)['kind'] for line in lines] == ['crash']
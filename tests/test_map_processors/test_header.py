@@ -0,0 +1,61 @@
+import gzip
+import io
+
+import pytest
+
+from map_processors.base import MapParser
+from map_processors.header import MapHeaderParser, PartialGzipBuffer, read_map_header
+
+
+def test_header_matches_full_parse(test_map_path):
+    parser = MapParser(str(test_map_path))
+    structure = parser.get_structured_data()
+
+    info = read_map_header(test_map_path, conditions=True)
+
+    assert {key: info[key] for key in parser.map_stats()} == parser.map_stats()
+    assert len(info['players']) == len(structure.players_attributes)
+    assert info['victory']['special_victory_condition'] == (
+        structure.victory.special_victory_condition
+    )
+    assert info['loss']['special_loss_condition'] == structure.loss.special_loss_condition
+    assert info['teams']['quantity'] == structure.teams.quantity
+
+
+def test_only_the_start_is_decompressed(test_map_path):
+    parser = MapHeaderParser(test_map_path, encoding='GB18030')
+
+    parser.read_map_header(conditions=True)
+
+    full_size = len(MapParser(str(test_map_path)).map_binary)
+    assert parser.map_binary.decompressed < full_size // 100
+    assert parser.map_binary._file.closed
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096])
+def test_partial_buffer_behaves_like_bytes(chunk_size):
+    data = bytes(range(256)) * 50
+    buffer = PartialGzipBuffer(io.BytesIO(gzip.compress(data)), chunk_size=chunk_size)
+
+    assert buffer[3] == data[3]
+    assert buffer[10:20] == data[10:20]
+    assert buffer[-5:] == data[-5:]
+    assert len(buffer) == len(data)
+    assert bytes(buffer) == data
+    assert buffer[len(data) - 1 : len(data) + 10] == data[-1:]
+    with pytest.raises(IndexError):
+        buffer[len(data)]
+
+
+@pytest.mark.parametrize(
+    ('data', 'error'),
+    [
+        (b'not gzip at all', gzip.BadGzipFile),
+        (gzip.compress(bytes(range(256)) * 50)[:-40], EOFError),
+    ],
+)
+def test_partial_buffer_raises_like_gzip_open(data, error):
+    with pytest.raises(error), gzip.open(io.BytesIO(data)) as f:
+        f.read()
+    with pytest.raises(error):
+        len(PartialGzipBuffer(io.BytesIO(data)))
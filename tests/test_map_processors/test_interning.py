@@ -0,0 +1,93 @@
+import collections
+import gc
+import tracemalloc
+
+import pytest
+from pydantic import ValidationError
+
+from map_processors.base import MapParser
+from map_processors.interning import Interner
+
+
+def _resident_size(parser: MapParser) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        structure = parser.get_structured_data()
+        del parser
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del structure
+    return size
+
+
+def test_interned_structure_equals_parsed_structure(test_map, test_map_path):
+    structure, _ = test_map
+    parser = MapParser(str(test_map_path), intern_values=True)
+
+    interned = parser.get_structured_data()
+
+    assert interned == structure
+    surface = interned.terrain.surface
+    shared = [tile for tile in surface if tile == surface[0]]
+    assert all(tile is surface[0] for tile in shared)
+    sprites = {}
+    for def_file in interned.def_objects:
+        assert sprites.setdefault(def_file.sprite_filename, def_file.sprite_filename) is (
+            def_file.sprite_filename
+        )
+    assert parser.interner.stats['TerrainTile'].unique < len(surface)
+
+
+def test_interning_reduces_resident_memory(test_map_path):
+    plain = _resident_size(MapParser(str(test_map_path)))
+    interned = _resident_size(MapParser(str(test_map_path), intern_values=True))
+
+    assert interned < plain * 0.5
+
+
+def test_interner_is_shared_between_parsers(test_map_path):
+    interner = Interner()
+    first = MapParser(str(test_map_path), intern_values=interner).get_structured_data()
+    unique_strings = interner.stats['str'].unique
+
+    second = MapParser(str(test_map_path), intern_values=interner).get_structured_data()
+
+    assert interner.stats['str'].unique == unique_strings
+    assert first.header.map_description is second.header.map_description
+    assert interner.report()[-1].startswith('total')
+
+
+def test_shared_value_objects_cannot_be_modified(test_map_path):
+    interned = MapParser(str(test_map_path), intern_values=True).get_structured_data()
+    surface = interned.terrain.surface
+    shares = collections.Counter(map(id, surface))
+    tile = next(tile for tile in surface if shares[id(tile)] > 1)
+    shared = shares[id(tile)]
+    assert shared > 1
+
+    with pytest.raises(ValidationError, match='frozen'):
+        tile.terrain_type = tile.terrain_type + 1
+
+    index = surface.index(tile)
+    surface[index] = tile.model_copy(update={'terrain_type': tile.terrain_type + 1})
+    assert sum(other is tile for other in surface) == shared - 1
+    surface[index].view = 1
+    assert surface[index].view == 1
+
+
+def test_value_objects_of_a_plain_parse_are_mutable(test_map_path):
+    structure = MapParser(str(test_map_path)).get_structured_data()
+    tile = structure.terrain.surface[0]
+    creature = next(
+        obj.creatures[0] for obj in structure.objects if getattr(obj, 'creatures', None)
+    )
+
+    terrain_type, quantity = tile.terrain_type, creature.quantity
+
+    tile.terrain_type += 1
+    creature.quantity += 1
+
+    assert (tile.terrain_type, creature.quantity) == (terrain_type + 1, quantity + 1)
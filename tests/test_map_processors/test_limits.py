@@ -0,0 +1,57 @@
+import gzip
+import struct
+
+import pytest
+
+from map_processors.base import MapParser
+from map_processors.exceptions import H3MapParserException
+from map_processors.limits import ParseLimits
+
+
+def _map_data(path) -> bytes:
+    with gzip.open(path) as f:
+        return f.read()
+
+
+def _replace_uint32(data: bytes, offset: int, value: int) -> bytes:
+    return data[:offset] + struct.pack('<I', value) + data[offset + 4 :]
+
+
+def test_default_limits_parse_the_sample_map(test_map, test_map_path):
+    structure, _ = test_map
+
+    assert MapParser(test_map_path, limits=ParseLimits()).get_structured_data() == structure
+
+
+@pytest.mark.parametrize('section', ['rumors', 'def_info', 'objects', 'events'])
+def test_quantities_beyond_the_data_are_rejected_up_front(test_map_path, section):
+    data = _map_data(test_map_path)
+    start = MapParser.from_bytes(data).verify().sections[section][0]
+    corrupted = _replace_uint32(data, start, 0x00FFFFFF)
+    limits = ParseLimits(max_rumors=0xFFFFFFFF, max_defs=0xFFFFFFFF, max_objects=0xFFFFFFFF)
+
+    with pytest.raises(H3MapParserException, match=f'at offset {start}$'):
+        MapParser.from_bytes(corrupted, limits=limits).get_structured_data()
+    with pytest.raises(H3MapParserException, match='the limit is'):
+        MapParser.from_bytes(corrupted, limits=ParseLimits()).get_structured_data()
+
+
+def test_strings_and_quantities_over_the_limits_are_rejected(test_map_path):
+    data = _map_data(test_map_path)
+    # map type, are any players, width and has underground, then the map name
+    corrupted = _replace_uint32(data, 10, 1 << 30)
+
+    with pytest.raises(H3MapParserException, match='String of 1073741824 bytes'):
+        MapParser.from_bytes(corrupted, limits=ParseLimits()).get_structured_data()
+    with pytest.raises(H3MapParserException, match='17401 objects, the limit is 100'):
+        MapParser(test_map_path, limits=ParseLimits(max_objects=100)).get_structured_data()
+
+
+def test_decompressed_size_and_time_are_limited(test_map_path, tmp_path):
+    bomb = tmp_path / 'bomb.h3m'
+    bomb.write_bytes(gzip.compress(bytes(4 << 20)))
+
+    with pytest.raises(H3MapParserException, match='exceeds 1048576 bytes'):
+        MapParser(bomb, limits=ParseLimits(max_decompressed_size=1 << 20)).get_structured_data()
+    with pytest.raises(H3MapParserException, match='more than 0 seconds'):
+        MapParser(test_map_path, limits=ParseLimits(max_seconds=0)).get_structured_data()
@@ -0,0 +1,50 @@
+import gc
+import tracemalloc
+
+import pytest
+
+from map_processors.base import MapParser
+
+# measured: peak ~1.01x the parsed structure, ~1.27x without low_memory
+PEAK_TO_STRUCTURE_RATIO = 1.15
+
+
+def _parse(parser: MapParser) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        structure = parser.get_structured_data()
+        peak = tracemalloc.get_traced_memory()[1]
+        del parser
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return structure, peak, retained
+
+
+def test_low_memory_parse_equals_regular_parse(test_map, test_map_path):
+    structure, _ = test_map
+    parser = MapParser(str(test_map_path), low_memory=True, record_layout=True)
+
+    assert parser.get_structured_data() == structure
+    assert 'map_binary' not in parser.__dict__
+    assert list(parser.data) == ['header']
+    assert parser.map_stats()['map_name'] == structure.header.map_name
+    assert parser.layout.sections['objects'].size > 0
+
+
+def test_low_memory_peak_stays_close_to_structure_size(test_map_path):
+    # validators are built on first use, keep them out of the measurement
+    MapParser(str(test_map_path), encoding='GB18030', low_memory=True).get_structured_data()
+
+    _, peak, retained = _parse(MapParser(str(test_map_path), encoding='GB18030', low_memory=True))
+    _, regular_peak, _ = _parse(MapParser(str(test_map_path), encoding='GB18030'))
+
+    assert peak < retained * PEAK_TO_STRUCTURE_RATIO
+    assert peak < regular_peak
+
+
+def test_low_memory_cannot_collect_stats(test_map_path):
+    with pytest.raises(ValueError, match='cannot be combined'):
+        MapParser(str(test_map_path), collect_stats=True, low_memory=True)
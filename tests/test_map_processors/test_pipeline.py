@@ -0,0 +1,62 @@
+import gzip
+import shutil
+import threading
+
+from map_processors.base import MapParser
+from map_processors.pipeline import MapPipeline
+from map_processors.synthetic import SyntheticMapGenerator
+from map_processors.translations import StructureTranslator, translate_strings
+
+
+def test_pipeline_rewrites_maps_and_reports_failures(test_map_path, tmp_path):
+    shutil.copy(test_map_path, tmp_path / 'a.h3m')
+    (tmp_path / 'broken.h3m').write_bytes(b'not gzip')
+    jobs = [(tmp_path / name, tmp_path / 'out' / name) for name in ('a.h3m', 'broken.h3m')]
+
+    results = MapPipeline(workers=2, queue_size=1).run(jobs)
+
+    assert [result.error is None for result in results] == [True, False]
+    assert results[0].encoding == 'GB18030'
+    with gzip.open(tmp_path / 'out' / 'a.h3m') as rewritten, gzip.open(test_map_path) as original:
+        assert rewritten.read() == original.read()
+
+
+def test_pipeline_applies_translation_transform(test_map, test_map_path, tmp_path):
+    structure, _ = test_map
+    translations = {structure.header.map_name: '6424 Legend', structure.events[0].message: 'Hi'}
+
+    (result,) = MapPipeline(transform=StructureTranslator(translations), workers=1).run(
+        [(test_map_path, tmp_path / 'translated.h3m')]
+    )
+
+    assert result.error is None
+    translated = MapParser(str(tmp_path / 'translated.h3m'), encoding='GB18030')
+    translated = translated.get_structured_data()
+    expected = structure.model_copy(deep=True)
+    assert translate_strings(expected, translations) >= 2
+    assert translated == expected
+    assert translated.header.map_name == '6424 Legend'
+
+
+def test_pipeline_raises_when_the_transform_cannot_be_sent(tmp_path):
+    jobs = []
+    for index in range(6):
+        path = tmp_path / f'{index}.h3m'
+        SyntheticMapGenerator(size=8, objects_quantity=10, seed=index).write_to_file(path)
+        jobs.append((path, tmp_path / 'out' / path.name))
+    pipeline = MapPipeline(transform=lambda structure, *args: structure, workers=1, queue_size=1)
+    errors = []
+
+    def run() -> None:
+        try:
+            pipeline.run(jobs)
+        except Exception as e:
+            errors.append(e)
+
+    # a thread, so a regression fails the test instead of hanging the run
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=60)
+
+    assert not thread.is_alive()
+    assert len(errors) == 1
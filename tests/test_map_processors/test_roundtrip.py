@@ -0,0 +1,85 @@
+from map_processors.base import MapParser
+from map_processors.constants import MAP_SECTIONS
+from map_processors.layout import MapLayout
+from map_processors.roundtrip import (
+    find_first_divergence,
+    first_difference,
+    verify_archive,
+    verify_round_trip,
+)
+from map_processors.writer import MapWriter
+
+
+def test_parser_layout_covers_every_byte_of_the_map(test_map_path):
+    parser = MapParser(str(test_map_path), record_layout=True)
+
+    parser.get_structured_data()
+    layout = parser.layout
+
+    assert list(layout.sections) == list(MAP_SECTIONS)
+    assert layout.sections['header'].start == 0
+    assert layout.sections['trailing_unknown'].end == len(parser.map_binary)
+    ranges = list(layout.sections.values())
+    assert all(left.end == right.start for left, right in zip(ranges, ranges[1:], strict=False))
+    assert len(layout.objects) == 17401
+    assert layout.objects[0].start > layout.sections['objects'].start
+    assert layout.objects[-1].end == layout.sections['objects'].end
+
+
+def test_writer_layout_matches_parser_layout(test_map, test_map_path):
+    structure, encoding = test_map
+    parser = MapParser(str(test_map_path), record_layout=True)
+    parser.get_structured_data()
+    writer = MapWriter(structure, encoding=encoding, record_layout=True)
+
+    writer.write()
+
+    assert writer.layout == parser.layout
+    assert MapLayout.from_dict(writer.layout.as_dict()) == writer.layout
+
+
+def test_verify_round_trip_of_test_map(test_map_path):
+    report = verify_round_trip(test_map_path)
+
+    assert report.ok
+    assert report.original_size == report.written_size == 652594
+
+
+def test_verify_archive_reports_unreadable_maps(test_map_path, tmp_path):
+    (tmp_path / 'not_gzip.h3m').write_bytes(b'not a gzip file')
+    (tmp_path / 'truncated.h3m').write_bytes(test_map_path.read_bytes()[:1000])
+    paths = [test_map_path, tmp_path / 'not_gzip.h3m', tmp_path / 'truncated.h3m']
+
+    reports = verify_archive(paths, workers=2)
+
+    assert [report.ok for report in reports] == [True, False, False]
+    assert reports[1].error.startswith('BadGzipFile')
+    assert reports[2].error.startswith('EOFError')
+
+
+def test_first_divergence_points_to_modified_object(test_map, test_map_path):
+    structure, encoding = test_map
+    parser = MapParser(str(test_map_path), record_layout=True)
+    parser.get_structured_data()
+    modified = structure.model_copy(deep=True)
+    x, y, z = modified.objects[1000].coordinates
+    modified.objects[1000].coordinates = (x, y + 1, z)
+    writer = MapWriter(modified, encoding=encoding, record_layout=True)
+    written_binary = writer.write()
+
+    divergence = find_first_divergence(
+        parser.layout, parser.map_binary, writer.layout, written_binary
+    )
+
+    assert divergence.section == 'objects'
+    assert divergence.object_index == 1000
+    # coordinates are x, y, z bytes at the start of the object
+    assert divergence.object_offset == 1
+    assert divergence.original_offset == parser.layout.objects[1000].start + 1
+
+
+def test_first_difference():
+    assert first_difference(b'abcdef', b'abcxef') == 3
+    assert first_difference(b'abc', b'abcdef') == 3
+    assert first_difference(b'', b'a') == 0
+    assert first_difference(b'abc', b'abc') == 3
@@ -0,0 +1,62 @@
+import math
+
+import pytest
+
+from map_processors.spatial import SpatialIndex, footprint_offsets
+
+
+@pytest.fixture(scope='module')
+def spatial_map(test_map):
+    structure, _ = test_map
+    structure = structure.model_copy(deep=True)
+    return structure, SpatialIndex.from_structure(structure)
+
+
+def _brute_force(structure, index, predicate):
+    return [
+        map_object
+        for map_object in structure.objects
+        if any(predicate(*tile) for tile in index.footprint(map_object))
+    ]
+
+
+def test_footprint_offsets_of_single_tile_def():
+    assert footprint_offsets('1' * 40 + '01111111', '0' * 40 + '10000000') == ((0, 0),)
+
+
+def test_point_query_finds_town_by_its_footprint(spatial_map):
+    structure, index = spatial_map
+    town = next(map_object for map_object in structure.objects if map_object.object_class == 'town')
+    x, y, z = town.coordinates
+
+    # the entrance of a town is two tiles left of its anchor
+    assert town in index.at(x - 2, y, z)
+    assert town not in index.at(x + 1, y, z)
+
+
+def test_rect_and_radius_queries_match_linear_scan(spatial_map):
+    structure, index = spatial_map
+
+    assert index.in_rect(20, 30, 50, 45, 1) == _brute_force(
+        structure, index, lambda x, y, z: z == 1 and 20 <= x <= 50 and 30 <= y <= 45
+    )
+    assert index.within_radius((70, 70, 0), 9.5) == _brute_force(
+        structure, index, lambda x, y, z: z == 0 and math.hypot(x - 70, y - 70) <= 9.5
+    )
+
+
+def test_update_and_remove(spatial_map):
+    structure, index = spatial_map
+    map_object = structure.objects[100]
+    x, y, z = map_object.coordinates
+
+    map_object.coordinates = (x, y, 1 - z)
+    index.update(map_object)
+
+    assert map_object not in index.at(x, y, z)
+    assert map_object in index.at(x, y, 1 - z)
+
+    index.remove(map_object)
+
+    assert map_object not in index
+    assert len(index) == len(structure.objects) - 1
@@ -0,0 +1,69 @@
+import collections
+import shutil
+import sqlite3
+
+from map_processors.enums import ColorEnum
+from map_processors.sqlite_export import SqliteExporter, main
+
+
+def test_export_fills_normalized_tables(test_map, tmp_path):
+    structure, encoding = test_map
+    database = tmp_path / 'maps.sqlite'
+
+    with SqliteExporter(database) as exporter:
+        first, second = exporter.export_many(
+            [(structure, 'a.h3m', encoding), (structure, 'b.h3m', encoding)]
+        )
+
+    connection = sqlite3.connect(database)
+    assert connection.execute('SELECT id, filename FROM maps ORDER BY id').fetchall() == [
+        (first, 'a.h3m'),
+        (second, 'b.h3m'),
+    ]
+    counts = dict(
+        connection.execute('SELECT map_id, count(*) FROM objects GROUP BY map_id').fetchall()
+    )
+    assert counts == {first: 17401, second: 17401}
+    assert connection.execute(
+        'SELECT count(*) FROM defs WHERE map_id = ?', (first,)
+    ).fetchone() == (965,)
+    towns = connection.execute(
+        'SELECT t.owner, count(*) FROM towns t JOIN objects o USING (map_id, object_index) '
+        "WHERE t.map_id = ? AND o.object_class = 'town' GROUP BY t.owner",
+        (first,),
+    ).fetchall()
+    assert dict(towns) == collections.Counter(
+        map_object.owner for map_object in structure.objects if map_object.object_class == 'town'
+    )
+    players = connection.execute(
+        'SELECT color FROM players WHERE map_id = ? ORDER BY rowid', (first,)
+    ).fetchall()
+    assert [color for (color,) in players] == [color.name.lower() for color in ColorEnum][:8]
+    # every owned object joins a player row of the same colour name
+    owners = connection.execute(
+        'SELECT o.owner, count(p.color) FROM objects o LEFT JOIN players p '
+        'ON p.map_id = o.map_id AND p.color = o.owner '
+        "WHERE o.map_id = ? AND o.owner IS NOT NULL AND o.owner != 'neutral' GROUP BY o.owner",
+        (first,),
+    ).fetchall()
+    assert owners
+    assert all(joined for _, joined in owners)
+    assert 'brown' in dict(owners)
+    index_names = {
+        row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    assert 'objects_class' in index_names
+
+
+def test_cli_skips_unreadable_files(test_map_path, tmp_path):
+    maps = tmp_path / 'maps'
+    maps.mkdir()
+    shutil.copy(test_map_path, maps / 'a.h3m')
+    (maps / 'b.h3m').write_bytes(b'not a gzip file')
+    (maps / 'c.h3m').write_bytes(test_map_path.read_bytes()[:1000])
+    database = tmp_path / 'maps.sqlite'
+
+    assert main([str(database), str(maps), '--workers', '1']) == 1
+
+    connection = sqlite3.connect(database)
+    assert connection.execute('SELECT filename FROM maps').fetchall() == [(str(maps / 'a.h3m'),)]
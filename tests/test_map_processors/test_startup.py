@@ -0,0 +1,48 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[2]
+
+# measured at ~0.03s, generous enough for slow CI machines
+IMPORT_BUDGET_SECONDS = 0.3
+
+
+def _run(code: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_parser_import_is_within_budget_and_lazy():
+    result = _run(
+        'import json, sys, time\n'
+        'start = time.perf_counter()\n'
+        'import map_processors.base\n'
+        'elapsed = time.perf_counter() - start\n'
+        'print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))\n'
+    )
+
+    assert 'chardet' not in result['modules']
+    assert 'pydantic' not in result['modules']
+    assert 'map_processors.schemas' not in result['modules']
+    assert result['elapsed'] < IMPORT_BUDGET_SECONDS
+
+
+def test_schemas_are_built_on_first_validation(test_map_path):
+    result = _run(
+        'import json\n'
+        'from map_processors.base import MapParser\n'
+        'from map_processors.schemas import GameMapStructure\n'
+        'deferred = not GameMapStructure.__pydantic_complete__\n'
+        f'MapParser({str(test_map_path)!r}).get_structured_data()\n'
+        'print(json.dumps([deferred, GameMapStructure.__pydantic_complete__]))\n'
+    )
+
+    assert result == [True, True]
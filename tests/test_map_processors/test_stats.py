@@ -0,0 +1,52 @@
+from map_processors.base import MapParser
+from map_processors.constants import MAP_SECTIONS
+from map_processors.writer import MapWriter
+
+
+def test_stats_are_not_collected_by_default(test_map_path):
+    parser = MapParser(str(test_map_path))
+
+    parser.get_structured_data()
+
+    assert parser.stats is None
+
+
+def test_parse_stats_cover_every_byte_of_the_map(test_map_path):
+    parser = MapParser(str(test_map_path), collect_stats=True)
+
+    parser.get_structured_data()
+    stats = parser.stats
+
+    assert list(stats.sections) == list(MAP_SECTIONS)
+    assert stats.total_bytes == len(parser.map_binary)
+    assert stats.sections['terrain'].items == 2 * 144 * 144
+    assert stats.sections['objects'].items == 17401
+    assert sum(stats.sections['objects'].by_class.values()) == 17401
+    assert sum(section.strings for section in stats.sections.values()) == parser.string_count
+
+
+def test_write_stats_match_parse_stats_per_section(test_map, test_map_path):
+    structure, encoding = test_map
+    parser = MapParser(str(test_map_path), collect_stats=True)
+    parser.get_structured_data()
+    writer = MapWriter(structure, encoding=encoding, collect_stats=True)
+
+    writer.write()
+
+    parse_bytes = {name: section.bytes for name, section in parser.stats.sections.items()}
+    write_bytes = {name: section.bytes for name, section in writer.stats.sections.items()}
+    assert write_bytes == parse_bytes
+    assert writer.stats.sections['objects'].by_class == parser.stats.sections['objects'].by_class
+
+
+def test_write_stats_name_the_output_file_and_have_no_string_errors(test_map, tmp_path):
+    structure, encoding = test_map
+    writer = MapWriter(structure, encoding=encoding, collect_stats=True)
+
+    writer.write()
+    assert writer.stats.filename is None
+    writer.write_to_file(tmp_path / 'out.h3m')
+
+    assert writer.stats.filename == str(tmp_path / 'out.h3m')
+    assert {section.string_errors for section in writer.stats.sections.values()} == {None}
+    assert writer.stats.sections['header'].strings == 2
@@ -0,0 +1,57 @@
+import collections
+import tracemalloc
+
+from map_processors.base import MapParser, MapVisitor
+from map_processors.constants import MAP_SECTIONS
+
+
+class RecordingVisitor(MapVisitor):
+    def __init__(self) -> None:
+        self.sections = {}
+        self.object_classes = collections.Counter()
+
+    def visit_section(self, section: str, data: dict) -> None:
+        self.sections[section] = data
+
+    def visit_object(self, index: int, map_object) -> None:
+        self.object_classes[map_object.object_class] += 1
+
+
+def test_iter_objects_yields_parsed_objects(test_map, test_map_path):
+    structure, _ = test_map
+    parser = MapParser(str(test_map_path))
+
+    objects = list(parser.iter_objects(as_model=True))
+
+    assert objects == structure.objects
+    assert 'objects' not in parser.data
+
+
+def test_iter_objects_memory_does_not_grow_with_objects(test_map_path):
+    parser = MapParser(str(test_map_path))
+    parser.map_binary
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        counts = collections.Counter(obj['object_class'] for obj in parser.iter_objects())
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    assert counts.total() == 17401
+    # def info and a handful of objects, a full object list takes tens of megabytes
+    assert peak < 5 * 1024 * 1024
+
+
+def test_visitor_covers_every_section(test_map, test_map_path):
+    structure, _ = test_map
+    visitor = RecordingVisitor()
+
+    MapParser(str(test_map_path)).visit(visitor, as_model=True)
+
+    assert list(visitor.sections) == [section for section in MAP_SECTIONS if section != 'objects']
+    assert visitor.sections['def_info'].keys() == {'def'}
+    assert len(visitor.sections['events']['events']) == len(structure.events)
+    assert visitor.object_classes == collections.Counter(
+        map_object.object_class for map_object in structure.objects
+    )
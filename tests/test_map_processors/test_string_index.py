@@ -0,0 +1,33 @@
+import gzip
+import shutil
+
+from map_processors.catalog import RefreshResult
+from map_processors.string_index import StringIndex
+
+
+def test_index_search_and_incremental_refresh(test_map_path, tmp_path):
+    maps = tmp_path / 'maps'
+    maps.mkdir()
+    shutil.copy(test_map_path, maps / 'a.h3m')
+
+    with StringIndex(tmp_path / 'strings.sqlite') as index:
+        assert index.refresh(maps) == RefreshResult(added=1)
+        strings = index.map_strings(maps / 'a.h3m')
+        assert strings[0].path == 'header.map_name'
+
+        monster = next(string for string in strings if string.object_class == 'monster')
+        matches = index.search(monster.text[5:20])
+        assert {match['map'] for match in matches} == {str(maps / 'a.h3m')}
+        assert any(
+            (match['path'], match['coordinates']) == (monster.path, monster.coordinates)
+            for match in matches
+        )
+        assert index.search(monster.text[:2])
+        assert index.search('no such phrase') == []
+
+        assert index.refresh(maps) == RefreshResult(unchanged=1)
+
+        (maps / 'a.h3m').write_bytes(gzip.compress(b'\x00' * 16))
+        assert index.refresh(maps) == RefreshResult(failed=1)
+        assert index.map_strings(maps / 'a.h3m') == []
+        assert index.search(monster.text[5:20]) == []
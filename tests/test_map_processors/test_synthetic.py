@@ -0,0 +1,43 @@
+import pytest
+
+from map_processors.base import MapParser
+from map_processors.synthetic import SyntheticMapGenerator
+
+
+@pytest.mark.parametrize('encoding', ['cp1251', 'GB18030'])
+def test_synthetic_map_round_trips_through_parser(encoding, tmp_path):
+    generator = SyntheticMapGenerator(
+        size=36, has_underground=True, objects_quantity=300, encoding=encoding, seed=7
+    )
+    path = tmp_path / 'synthetic.h3m'
+
+    structure = generator.write_to_file(path)
+    parser = MapParser(str(path))
+    restored = parser.get_structured_data()
+
+    assert parser.encoding == encoding
+    assert restored == structure
+    assert len(restored.objects) == 300
+    assert len(restored.terrain.underground) == 36 * 36
+
+
+def test_synthetic_map_is_reproducible_from_seed():
+    first = SyntheticMapGenerator(size=8, objects_quantity=50, seed=1).generate()
+    second = SyntheticMapGenerator(size=8, objects_quantity=50, seed=1).generate()
+    other = SyntheticMapGenerator(size=8, objects_quantity=50, seed=2).generate()
+
+    assert first == second
+    assert first != other
+
+
+def test_synthetic_map_respects_object_mix():
+    structure = SyntheticMapGenerator(
+        size=8, objects_quantity=20, object_mix={'town': 1}, seed=0
+    ).generate()
+
+    assert {obj.object_class for obj in structure.objects} == {'town'}
+
+
+def test_synthetic_map_rejects_oversized_map():
+    with pytest.raises(ValueError):
+        SyntheticMapGenerator(size=253)
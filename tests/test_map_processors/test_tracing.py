@@ -0,0 +1,53 @@
+import json
+import os
+
+from map_processors import tracing
+from map_processors.base import MapParser
+from map_processors.constants import MAP_SECTIONS
+from map_processors.writer import MapWriter
+
+
+def _load_events(path) -> list[dict]:
+    return json.loads(path.read_text(encoding='utf-8'))['traceEvents']
+
+
+def test_trace_to_file_records_map_stage_and_section_spans(test_map_path, tmp_path):
+    trace_path = tmp_path / 'trace.json'
+
+    with tracing.trace_to_file(trace_path, process_name='worker-0'):
+        parser = MapParser(str(test_map_path))
+        structure = parser.get_structured_data()
+        MapWriter(structure, encoding=parser.encoding).write_to_file(tmp_path / 'out.h3m')
+
+    events = _load_events(trace_path)
+    spans = [event for event in events if event['ph'] == 'X']
+    names = [event['name'] for event in spans]
+    assert {'parse', 'decompress', 'detect_encoding', 'validate', 'write', 'gzip'} <= set(names)
+    assert names.count('objects') == 2
+    assert set(MAP_SECTIONS) <= set(names)
+    assert all(event['pid'] == os.getpid() and event['dur'] >= 0 for event in spans)
+    assert events[0]['args'] == {'name': 'worker-0'}
+
+
+def test_span_is_noop_without_recorder():
+    assert tracing.get_recorder() is None
+
+    with tracing.span('anything'):
+        pass
+
+    assert tracing.get_recorder() is None
+
+
+def test_merge_trace_files_joins_events(tmp_path):
+    paths = []
+    for number in range(2):
+        path = tmp_path / f'trace.{number}.json'
+        with tracing.trace_to_file(path):
+            with tracing.span('map', 'map', number=number):
+                pass
+        paths.append(path)
+
+    tracing.merge_trace_files(paths, tmp_path / 'merged.json')
+
+    events = _load_events(tmp_path / 'merged.json')
+    assert [event['args']['number'] for event in events] == [0, 1]
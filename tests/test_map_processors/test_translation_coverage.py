@@ -0,0 +1,40 @@
+import json
+import shutil
+
+from map_processors.translation_coverage import TranslationCoverage
+from map_processors.translations import translations_path
+
+
+def test_coverage_is_recomputed_for_changed_translations(test_map_path, tmp_path):
+    map_path = tmp_path / 'a.h3m'
+    shutil.copy(test_map_path, map_path)
+    shared = tmp_path / 'shared.json'
+    shared.write_text('{}', encoding='utf-8')
+
+    with TranslationCoverage(tmp_path / 'strings.sqlite') as coverage:
+        report = coverage.compute(map_path, shared=shared)
+        (untouched,) = report.maps
+        assert report.recomputed == 1
+        assert untouched.translated == 0
+        assert untouched.untranslated == untouched.unique_strings == 114
+        assert untouched.strings > untouched.unique_strings > untouched.repeated_strings > 0
+
+        texts = [string.text for string in coverage.index.map_strings(map_path)]
+        translations = {texts[0]: 'Heroic tale', texts[1]: '', texts[2]: ''}
+        translations_path(map_path).write_text(
+            json.dumps(translations, ensure_ascii=False), encoding='GB18030'
+        )
+        shared.write_text(json.dumps({texts[2]: 'Shared'}), encoding='utf-8')
+
+        report = coverage.compute(map_path, shared=shared)
+        (translated,) = report.maps
+        assert report.recomputed == 1
+        assert translated.translated == 2
+        assert translated.characters_remaining == (
+            untouched.characters_remaining - len(texts[0]) - len(texts[2])
+        )
+
+        report = coverage.compute(map_path, shared=shared)
+        assert report.recomputed == 0
+        assert report.maps == [translated]
+        assert report.total.translated == 2
@@ -1,6 +1,13 @@
+import gzip
+import shutil
+
 from map_processors.base import MapParser
 from map_processors.schemas import GameMapStructure
-from map_processors.translations import MapTranslationFileGenerator
+from map_processors.translations import (
+    MapSimpleTranslator,
+    MapTranslationFileGenerator,
+    extract_strings,
+)
 
 
 def test_write_output_file():
@@ -43,3 +50,32 @@ def test_round_trip_json():
     assert restored.def_objects == original.def_objects
     assert restored.objects == original.objects
     assert restored.events == original.events
+
+
+def test_extract_strings_covers_translation_file_strings(test_map):
+    structure, _ = test_map
+    generator = MapTranslationFileGenerator('6424.h3m', output_filename='6424.json')
+    generator.get_structured_data()
+
+    strings = extract_strings(structure)
+
+    assert {string.text for string in strings} == set(generator.strings_to_translate) - {''}
+    assert strings[0].path == 'header.map_name'
+    town_event = next(string for string in strings if '.events[' in string.path)
+    assert town_event.object_class == 'town'
+    assert (
+        town_event.coordinates
+        == structure.objects[int(town_event.path[8:].split(']')[0])].coordinates
+    )
+
+
+def test_simple_translator_without_translations_reproduces_the_map(test_map_path, tmp_path):
+    path = tmp_path / '6424.h3m'
+    shutil.copy(test_map_path, path)
+    (tmp_path / '6424_translations.json').write_text('{}')
+
+    translator = MapSimpleTranslator(str(path))
+    translator.write_output_file()
+
+    with gzip.open(test_map_path) as f:
+        assert (tmp_path / '6424_translated.h3m').read_bytes() == f.read()
@@ -0,0 +1,96 @@
+import gzip
+import struct
+import time
+
+from map_processors.base import MapParser
+from map_processors.synthetic import SyntheticMapGenerator
+
+
+def _map_data(path) -> bytes:
+    with gzip.open(path) as f:
+        return f.read()
+
+
+def test_verify_walks_every_section_of_a_valid_map(test_map_path, tmp_path):
+    parser = MapParser(test_map_path, record_layout=True)
+    report = parser.verify()
+    parser.get_structured_data()
+
+    assert report.ok and report.complete
+    assert report.map_type == 'SOD'
+    assert report.sections == {
+        section: (span.start, span.end) for section, span in parser.layout.sections.items()
+    }
+
+    path = tmp_path / 'synthetic.h3m'
+    SyntheticMapGenerator(
+        size=36, has_underground=True, objects_quantity=300, seed=3
+    ).write_to_file(path)
+    assert MapParser(path).verify().ok
+
+
+def test_verify_reports_problems_with_offsets(test_map_path):
+    data = _map_data(test_map_path)
+    parser = MapParser(test_map_path, record_layout=True)
+    structure = parser.get_structured_data()
+    town = next(index for index, obj in enumerate(structure.objects) if obj.object_class == 'town')
+    # coordinates, def number and unknown bytes, then the town id of a SOD map
+    owner = parser.layout.objects[town].start + 12 + 4
+
+    corrupted = bytearray(data)
+    corrupted[owner] = 42
+    corrupted[-1] = 1
+    report = MapParser.from_bytes(bytes(corrupted)).verify()
+
+    assert report.complete
+    assert [(problem.offset, problem.object_index) for problem in report.problems] == [
+        (owner, town),
+        (parser.layout.sections['trailing_unknown'].start, None),
+    ]
+    assert 'color 42' in report.problems[0].message
+
+    # the objects cannot fit in what is left, the walk stops at their quantity
+    truncated = MapParser.from_bytes(data[:owner]).verify()
+    assert not truncated.complete
+    assert [(problem.offset, problem.section) for problem in truncated.problems] == [
+        (parser.layout.sections['objects'].start, 'objects')
+    ]
+
+    def_number = parser.layout.objects[town].start + 3
+    corrupted = data[:def_number] + struct.pack('<I', 100_000) + data[def_number + 4 :]
+    report = MapParser.from_bytes(corrupted).verify()
+    assert not report.complete
+    assert [(problem.offset, problem.object_index) for problem in report.problems] == [
+        (def_number, town)
+    ]
+
+
+def test_verify_rejects_huge_claimed_quantities_up_front(test_map_path):
+    data = _map_data(test_map_path)
+    report = MapParser.from_bytes(data).verify()
+
+    for section in ('rumors', 'def_info', 'objects', 'events'):
+        start = report.sections[section][0]
+        corrupted = data[:start] + struct.pack('<I', 0xFFFFFFFF) + data[start + 4 :]
+
+        begin = time.perf_counter()
+        corrupted_report = MapParser.from_bytes(corrupted).verify()
+
+        assert time.perf_counter() - begin < 0.1
+        assert not corrupted_report.complete
+        assert corrupted_report.problems[-1].offset == start
+        assert corrupted_report.problems[-1].section == section
+
+
+def test_verify_is_faster_than_parsing(test_map_path):
+    parser = MapParser(test_map_path)
+    parser.map_binary
+
+    begin = time.perf_counter()
+    parser.verify()
+    verified = time.perf_counter() - begin
+    begin = time.perf_counter()
+    parser.get_structured_data()
+    parsed = time.perf_counter() - begin
+
+    assert verified * 4 < parsed
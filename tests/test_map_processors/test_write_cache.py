@@ -0,0 +1,51 @@
+from map_processors.translations import extract_strings, translate_copy
+from map_processors.write_cache import WriteCache
+from map_processors.writer import MapWriter
+
+
+def _variant_translations(structure, suffix: str) -> dict[str, str]:
+    texts = sorted({string.text for string in extract_strings(structure)})
+    return {text: f'{text} {suffix}' for text in texts[:10]}
+
+
+def test_variants_written_with_cache_equal_plain_writes(test_map):
+    structure, encoding = test_map
+    original = MapWriter(structure, encoding=encoding).write()
+    cache = WriteCache()
+
+    assert MapWriter(structure, encoding=encoding, cache=cache).write() == original
+    assert MapWriter(structure, encoding=encoding, cache=cache).write() == original
+    for suffix in ('(en)', '(ru)'):
+        translated = translate_copy(structure, _variant_translations(structure, suffix))
+        misses = cache.misses
+        data = MapWriter(translated, encoding=encoding, cache=cache).write()
+
+        assert data == MapWriter(translated, encoding=encoding).write()
+        assert data != original
+        # the sections and objects holding the ten translated texts
+        assert cache.misses - misses < 50
+
+
+def test_translate_copy_shares_unchanged_models(test_map):
+    structure, _ = test_map
+    translations = _variant_translations(structure, '(en)')
+
+    translated = translate_copy(structure, translations)
+
+    assert translated is not structure
+    assert translated.terrain is structure.terrain
+    assert translated.def_objects is structure.def_objects
+    shared = sum(new is old for new, old in zip(translated.objects, structure.objects))
+    assert len(structure.objects) - shared < 50
+    assert translate_copy(structure, {}) is structure
+    assert {string.text for string in extract_strings(translated)} & set(translations) == set()
+
+
+def test_cache_is_keyed_by_encoding(test_map):
+    structure, encoding = test_map
+    cache = WriteCache()
+    MapWriter(structure, encoding=encoding, cache=cache).write()
+
+    data = MapWriter(structure, encoding='utf-8', cache=cache).write()
+
+    assert data == MapWriter(structure, encoding='utf-8').write()